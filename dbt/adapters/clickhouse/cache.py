@@ -1,6 +1,7 @@
 import threading
 from collections import namedtuple
 from copy import deepcopy
+from dataclasses import replace
 from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 from dbt.adapters.events.types import CacheAction, CacheDumpGraph
@@ -153,6 +154,10 @@ class ClickHouseRelationsCache:
 
     def __init__(self, log_cache_events: bool = False) -> None:
         self.relations: Dict[ReferenceKey, CachedRelation] = {}
+        # Materialized views write to their `TO` target by name. The views of a name without a
+        # cached relation, e.g. after the target was renamed or dropped, wait here for the next
+        # relation taking that name.
+        self.unbound_mvs: Dict[ReferenceKey, List[Dict[str, str]]] = {}
         self.lock = threading.RLock()
         self.schemas: Set[Optional[str]] = set()
         self.log_cache_events = log_cache_events
@@ -226,6 +231,8 @@ class ClickHouseRelationsCache:
         """
         self.add_schema(None, relation.schema)
         key = relation.key()
+        if key not in self.relations:
+            relation.inner = self._bind_mvs(key, relation.inner)
         return self.relations.setdefault(key, relation)
 
     def add(self, relation):
@@ -286,7 +293,10 @@ class ClickHouseRelationsCache:
                     action="drop_cascade", ref_key=dropped_key_msg, ref_list=consequence_msgs
                 )
             )
+            for key in consequences:
+                self._unbind_mvs(key, self.relations[key].inner)
             self._remove_refs(consequences)
+            self._release_mv_targets(consequences)
 
     def _rename_relation(self, old_key, new_relation):
         """Rename a relation named old_key to new_key, updating references.
@@ -375,6 +385,9 @@ class ClickHouseRelationsCache:
         with self.lock:
             if self._check_rename_constraints(old_key, new_key):
                 self._rename_relation(old_key, CachedRelation(new))
+                # The views of the old name don't follow the renamed relation
+                renamed = self.relations[new_key]
+                renamed.inner = self._bind_mvs(new_key, self._unbind_mvs(old_key, renamed.inner))
             else:
                 self._setdefault(CachedRelation(new))
 
@@ -383,6 +396,145 @@ class ClickHouseRelationsCache:
             lambda: CacheDumpGraph(before_after="after", action="rename", dump=self.dump_graph()),
         )
 
+    def exchange(self, relation_a, relation_b):
+        """Swap the cached state of two relations after `EXCHANGE TABLES a AND b`.
+
+        The objects trade names, so each key gets the other relation's inner
+        relation. Materialized views write to their `TO` target by name, so
+        `mvs_pointing_to_it` stays with the key, as it does for `rename`. A relation missing from the
+        cache (e.g. a staging table created in this run) lives in the same
+        database as the other one, so it takes over the other one's flags.
+
+        :param BaseRelation relation_a: The first exchanged relation.
+        :param BaseRelation relation_b: The second exchanged relation.
+        """
+        key_a = _make_ref_key(relation_a)
+        key_b = _make_ref_key(relation_b)
+        fire_event(
+            CacheAction(
+                action="rename_relation",
+                ref_key=key_a._asdict(),
+                ref_key_2=key_b._asdict(),
+            )
+        )
+        with self.lock:
+            cached_a = self.relations.get(key_a)
+            cached_b = self.relations.get(key_b)
+            inner_a = cached_a.inner if cached_a else None
+            inner_b = cached_b.inner if cached_b else None
+            inner_a = inner_a or inner_b or relation_a
+            inner_b = inner_b or inner_a
+            mvs_a = _mvs_of(cached_a.inner) if cached_a else self.unbound_mvs.pop(key_a, [])
+            mvs_b = _mvs_of(cached_b.inner) if cached_b else self.unbound_mvs.pop(key_b, [])
+            self._replace_inner(key_a, _exchanged(inner_b, key_a, mvs_a))
+            self._replace_inner(key_b, _exchanged(inner_a, key_b, mvs_b))
+
+    def replace(self, relation):
+        """Add the relation, or overwrite the cached one with the same key, e.g. after
+        `CREATE OR REPLACE`. Materialized views pointing to it are kept.
+
+        :param BaseRelation relation: The underlying relation.
+        """
+        key = _make_ref_key(relation)
+        fire_event(CacheAction(action="add_relation", ref_key=_make_ref_key_dict(relation)))
+        with self.lock:
+            existing = self.relations.get(key)
+            if existing is not None:
+                relation = _with_mvs(relation, _mvs_of(existing.inner))
+            else:
+                relation = self._bind_mvs(key, relation)
+            self._replace_inner(key, relation)
+
+    def add_mv(self, mv_relation, target_relation, sql: str):
+        """Cache a materialized view and register it in the `mvs_pointing_to_it` of
+        its `TO` target, as the next relation listing would.
+
+        :param BaseRelation mv_relation: The materialized view.
+        :param BaseRelation target_relation: The target table of the view.
+        :param str sql: The SELECT query of the view.
+        """
+        self.replace(mv_relation)
+        mv = {'schema': mv_relation.schema, 'name': mv_relation.identifier, 'sql': sql}
+        target_key = _make_ref_key(target_relation)
+        with self.lock:
+            self._release_mv_targets([_make_ref_key(mv_relation)])
+            target = self.relations.get(target_key)
+            if target is not None:
+                target.inner = _with_mvs(target.inner, _mvs_of(target.inner) + [mv])
+            else:
+                self.unbound_mvs.setdefault(target_key, []).append(mv)
+
+    def update_mv_query(self, mv_relation, sql: str):
+        """Record the new SELECT query of a materialized view after `MODIFY QUERY`.
+
+        :param BaseRelation mv_relation: The materialized view.
+        :param str sql: The new SELECT query of the view.
+        """
+        mv_key = _make_ref_key(mv_relation)
+        with self.lock:
+            for cached in self.relations.values():
+                mvs = _mvs_of(cached.inner)
+                if any(_mv_key(mv) == mv_key for mv in mvs):
+                    updated = [{**mv, 'sql': sql} if _mv_key(mv) == mv_key else mv for mv in mvs]
+                    cached.inner = _with_mvs(cached.inner, updated)
+
+    def mv_target(self, mv_relation) -> Optional[ReferenceKey]:
+        """Return the key of the cached relation whose `mvs_pointing_to_it` lists the
+        materialized view, or None if the target isn't cached.
+
+        :param BaseRelation mv_relation: The materialized view.
+        """
+        mv_key = _make_ref_key(mv_relation)
+        with self.lock:
+            for key, cached in self.relations.items():
+                if any(_mv_key(mv) == mv_key for mv in _mvs_of(cached.inner)):
+                    return key
+        return None
+
+    def _replace_inner(self, key: ReferenceKey, relation):
+        """Store relation under key, keeping the references of an existing entry.
+        Callers should hold the lock."""
+        cached = CachedRelation(relation)
+        existing = self.relations.get(key)
+        if existing is not None:
+            cached.referenced_by = existing.referenced_by
+        self.add_schema(None, key.schema)
+        self.relations[key] = cached
+
+    def _release_mv_targets(self, keys: Iterable[ReferenceKey]):
+        """Remove the given materialized views from the `mvs_pointing_to_it` of every
+        cached relation. Callers should hold the lock."""
+        keys = set(keys)
+        for cached in self.relations.values():
+            mvs = _mvs_of(cached.inner)
+            remaining = [mv for mv in mvs if _mv_key(mv) not in keys]
+            if len(remaining) != len(mvs):
+                cached.inner = _with_mvs(cached.inner, remaining)
+        for name, mvs in list(self.unbound_mvs.items()):
+            remaining = [mv for mv in mvs if _mv_key(mv) not in keys]
+            if remaining:
+                self.unbound_mvs[name] = remaining
+            else:
+                del self.unbound_mvs[name]
+
+    def _unbind_mvs(self, key: ReferenceKey, relation):
+        """Keep the materialized views of relation under its former name key, and return
+        relation without them. Callers should hold the lock."""
+        mvs = _mvs_of(relation)
+        if mvs:
+            self.unbound_mvs[key] = mvs
+        return _with_mvs(relation, [])
+
+    def _bind_mvs(self, key: ReferenceKey, relation):
+        """Return relation with the materialized views waiting for its name key. Callers
+        should hold the lock."""
+        if key not in self.unbound_mvs or not hasattr(relation, 'mvs_pointing_to_it'):
+            return relation
+        mvs = _mvs_of(relation)
+        known = {_mv_key(mv) for mv in mvs}
+        waiting = [mv for mv in self.unbound_mvs.pop(key) if _mv_key(mv) not in known]
+        return _with_mvs(relation, mvs + waiting)
+
     def get_relations(self, _database: Optional[str], schema: Optional[str]) -> List[Any]:
         """Yield all relations matching the given schema (ClickHouse database)."""
         with self.lock:
@@ -396,6 +548,7 @@ class ClickHouseRelationsCache:
         """Clear the cache"""
         with self.lock:
             self.relations.clear()
+            self.unbound_mvs.clear()
             self.schemas.clear()
 
     def _list_relations_in_schema(self, schema: Optional[str]) -> List[CachedRelation]:
@@ -428,3 +581,24 @@ def _make_ref_key_dict(relation: Any):
         "schema": relation.schema,
         "identifier": relation.identifier,
     }
+
+
+def _mv_key(mv: Dict[str, str]) -> ReferenceKey:
+    return ReferenceKey(mv.get('schema'), mv.get('name'))
+
+
+def _mvs_of(relation: Any) -> List[Dict[str, str]]:
+    return list(getattr(relation, 'mvs_pointing_to_it', None) or [])
+
+
+def _with_mvs(relation: Any, mvs: List[Dict[str, str]]) -> Any:
+    if not hasattr(relation, 'mvs_pointing_to_it'):
+        return relation
+    # `incorporate` deep-merges (appends to) lists, so replace the field directly
+    return replace(relation, mvs_pointing_to_it=mvs)
+
+
+def _exchanged(relation: Any, key: ReferenceKey, mvs: List[Dict[str, str]]) -> Any:
+    """Return relation moved to key, with the materialized views that point to that name."""
+    moved = relation.incorporate(path={"schema": key.schema, "identifier": key.identifier})
+    return _with_mvs(moved, mvs)
@@ -0,0 +1,238 @@
+import threading
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Mapping, Optional, Set, Tuple, Union
+
+from dbt.adapters.clickhouse.dbclient import ChClientWrapper
+from dbt.adapters.clickhouse.logger import logger
+from dbt.adapters.clickhouse.query import escape_str, quote_identifier
+from dbt.adapters.clickhouse.relation import ClickHouseRelation
+from dbt.adapters.clickhouse.util import bookkeeping_engine, cluster_clause
+from dbt_common.exceptions import DbtRuntimeError
+
+PROGRESS_SUFFIX = '__dbt_catchup'
+# Chunk key used when the catch-up is not chunked, so each view is backfilled in one insert
+WHOLE_VIEW = ''
+
+ChunkTask = Tuple[str, str]
+
+
+@dataclass(frozen=True)
+class CatchupConfig:
+    """
+    Options of a chunked materialized view catch-up, given as a mapping in the `catchup` config:
+
+        catchup:
+          chunk_by: toYYYYMM(event_date)
+          max_memory_usage: 10000000000
+          threads: 4
+    """
+
+    chunk_by: Optional[str] = None
+    max_memory_usage: Optional[Union[int, str]] = None
+    threads: Optional[int] = None
+
+    @classmethod
+    def from_config(cls, catchup: Mapping[str, Any]) -> 'CatchupConfig':
+        unknown = set(catchup) - set(cls.__dataclass_fields__)
+        if unknown:
+            raise DbtRuntimeError(
+                f'Unknown catchup option(s) {", ".join(sorted(unknown))}. '
+                f'Supported options are chunk_by, max_memory_usage and threads'
+            )
+        threads = catchup.get('threads')
+        if threads is not None and (not isinstance(threads, int) or threads < 1):
+            raise DbtRuntimeError('The catchup `threads` option must be a positive integer')
+        return cls(**catchup)
+
+
+def chunk_literal(value: Any) -> str:
+    """
+    Render a chunk value returned by the server as a SQL literal. Dates and naive times are
+    rendered as strings, which ClickHouse converts when they are compared with the chunk
+    expression. Times with a timezone (the timezone of their column) are rendered as the same
+    instant in UTC, since ClickHouse doesn't parse a UTC offset in a DateTime string.
+    """
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, (int, float, Decimal)):
+        return str(value)
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        utc = value.astimezone(timezone.utc)
+        if utc.microsecond:
+            return f"toDateTime64('{utc:%Y-%m-%d %H:%M:%S.%f}', 6, 'UTC')"
+        return f"toDateTime('{utc:%Y-%m-%d %H:%M:%S}', 'UTC')"
+    return f"'{escape_str(str(value))}'"
+
+
+class MvCatchup:
+    """
+    Backfill the target table of one or more materialized views from the views' queries.
+
+    Every view is split into chunks on the distinct values of the `chunk_by` expression, and each
+    (view, chunk) pair is inserted separately with the configured `max_memory_usage`, so the
+    memory of a single insert is bounded by the size of a chunk. Inserts run concurrently, each
+    worker on its own connection. Started and finished chunks are recorded in a progress table
+    next to the target, which is dropped once the catch-up completes. A failed catch-up can
+    therefore be resumed: finished chunks are skipped, and chunks that were left half written
+    are deleted from the target and inserted again for every view. With a cluster, the progress
+    table is replicated, as the workers' connections may land on other replicas.
+    """
+
+    def __init__(
+        self,
+        handle: ChClientWrapper,
+        client_factory: Callable[[], ChClientWrapper],
+        target: ClickHouseRelation,
+        views: Dict[str, str],
+        config: CatchupConfig,
+        query_settings: Optional[Dict[str, Any]] = None,
+        cluster: str = '',
+    ):
+        self.handle = handle
+        self.cluster = cluster
+        self.client_factory = client_factory
+        self.target = target
+        self.progress = target.incorporate(
+            path={'identifier': f'{target.identifier}{PROGRESS_SUFFIX}'}
+        )
+        self.views = views
+        self.config = config
+        self.settings = dict(query_settings or {})
+        if config.max_memory_usage is not None:
+            self.settings['max_memory_usage'] = config.max_memory_usage
+        self._local = threading.local()
+        self._clients: List[ChClientWrapper] = []
+        self._clients_lock = threading.Lock()
+
+    def run(self, resume: bool = False) -> int:
+        """
+        Run the catch-up and return the number of chunk inserts executed. With `resume`, only an
+        interrupted catch-up (one whose progress table still exists) is continued.
+        """
+        done: Set[ChunkTask] = set()
+        if resume:
+            if not self._progress_exists():
+                return 0
+            logger.info(f'Resuming interrupted catch-up of {self.target}')
+            done, dirty = self._read_progress()
+        else:
+            self._drop_progress()
+            self.handle.command(
+                f'CREATE TABLE {self.progress} {cluster_clause(self.cluster)}'
+                '(view String, chunk String, finished UInt8) '
+                f'ENGINE = {bookkeeping_engine("MergeTree", self.cluster)} ORDER BY (view, chunk)'
+            )
+            dirty = set()
+
+        chunks = {view: self._view_chunks(view_sql) for view, view_sql in self.views.items()}
+        for chunk in sorted(dirty):
+            self._clear_chunk(chunk)
+            done -= {(view, chunk) for view in self.views}
+
+        tasks = [
+            (view, chunk)
+            for view, view_chunks in chunks.items()
+            for chunk in view_chunks
+            if (view, chunk) not in done
+        ]
+        columns = {
+            view: ', '.join(quote_identifier(column.name) for column in self._columns(view_sql))
+            for view, view_sql in self.views.items()
+        }
+        try:
+            self._run_tasks(tasks, columns)
+        finally:
+            self._close_clients()
+        self._drop_progress()
+        return len(tasks)
+
+    def _drop_progress(self) -> None:
+        on_cluster = f' {cluster_clause(self.cluster)}SYNC' if self.cluster else ''
+        self.handle.command(f'DROP TABLE IF EXISTS {self.progress}{on_cluster}')
+
+    def _progress_exists(self) -> bool:
+        return bool(int(self.handle.command(f'EXISTS TABLE {self.progress}')))
+
+    def _read_progress(self) -> Tuple[Set[ChunkTask], Set[str]]:
+        rows = self.handle.query(
+            f'SELECT view, chunk, max(finished) FROM {self.progress} GROUP BY view, chunk'
+        ).result_set
+        done = {(view, chunk) for view, chunk, finished in rows if finished}
+        dirty = {chunk for _, chunk, finished in rows if not finished}
+        return done, dirty
+
+    def _view_chunks(self, view_sql: str) -> List[str]:
+        if not self.config.chunk_by:
+            return [WHOLE_VIEW]
+        rows = self.handle.query(
+            f'SELECT DISTINCT ({self.config.chunk_by}) AS chunk FROM ( \n{view_sql} \n) '
+            'ORDER BY chunk',
+            settings=self.settings,
+        ).result_set
+        return [chunk_literal(row[0]) for row in rows]
+
+    def _columns(self, view_sql: str):
+        return self.handle.columns_in_query(view_sql, settings=self.settings)
+
+    def _chunk_condition(self, chunk: str) -> str:
+        if chunk == 'NULL':
+            return f'({self.config.chunk_by}) IS NULL'
+        return f'({self.config.chunk_by}) = {chunk}'
+
+    def _clear_chunk(self, chunk: str) -> None:
+        # Rows of a chunk can't be told apart by view, so a half written chunk is removed
+        # as a whole and then inserted again for every view
+        if chunk == WHOLE_VIEW:
+            self.handle.command(f'TRUNCATE TABLE {self.target}')
+        else:
+            self.handle.command(
+                f'ALTER TABLE {self.target} DELETE WHERE {self._chunk_condition(chunk)}'
+            )
+
+    def _run_tasks(self, tasks: List[ChunkTask], columns: Dict[str, str]) -> None:
+        threads = min(self.config.threads or len(self.views), len(tasks))
+        if threads <= 1:
+            for view, chunk in tasks:
+                self._insert_chunk(self.handle, view, chunk, columns[view])
+            return
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            futures = [
+                executor.submit(self._worker_insert_chunk, view, chunk, columns[view])
+                for view, chunk in tasks
+            ]
+            finished, _ = wait(futures, return_when=FIRST_EXCEPTION)
+            for future in futures:
+                future.cancel()
+            for future in finished:
+                future.result()
+
+    def _worker_insert_chunk(self, view: str, chunk: str, columns: str) -> None:
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self.client_factory()
+            self._local.client = client
+            with self._clients_lock:
+                self._clients.append(client)
+        self._insert_chunk(client, view, chunk, columns)
+
+    def _insert_chunk(self, client: ChClientWrapper, view: str, chunk: str, columns: str) -> None:
+        record = f"INSERT INTO {self.progress} VALUES ('{escape_str(view)}', '{escape_str(chunk)}'"
+        client.command(f'{record}, 0)')
+        where = f' WHERE {self._chunk_condition(chunk)}' if chunk != WHOLE_VIEW else ''
+        client.command(
+            f'INSERT INTO {self.target} ({columns}) SELECT {columns} '
+            f'FROM ( \n{self.views[view]} \n){where}',
+            settings=self.settings,
+        )
+        client.command(f'{record}, 1)')
+        logger.debug(f'Catch-up of view {view} into {self.target} finished chunk {chunk or "*"}')
+
+    def _close_clients(self) -> None:
+        for client in self._clients:
+            client.close()
+        self._clients.clear()
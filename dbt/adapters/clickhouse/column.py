@@ -1,13 +1,43 @@
-import re
 from dataclasses import dataclass, field
-from typing import Any, List, Literal, TypeVar
+from functools import lru_cache
+from typing import Any, List, Literal, NamedTuple, Optional, TypeVar
 
 from dbt.adapters.base.column import Column
+from dbt.adapters.clickhouse.column_type import parse_type
 from dbt_common.exceptions import DbtRuntimeError
 
 Self = TypeVar('Self', bound='ClickHouseColumn')
 
 
+class _ColumnTypeInfo(NamedTuple):
+    dtype: str
+    is_low_cardinality: bool
+    is_nullable: bool
+    char_size: Optional[int]
+    numeric_precision: Optional[int]
+    numeric_scale: Optional[int]
+
+
+@lru_cache(maxsize=4096)
+def _column_type_info(dtype: str) -> _ColumnTypeInfo:
+    ch_type = parse_type(dtype)
+    is_low_cardinality = ch_type.is_low_cardinality and len(ch_type.type_params) == 1
+    if is_low_cardinality:
+        ch_type = ch_type.inner
+    is_nullable = ch_type.is_nullable and len(ch_type.type_params) == 1
+    if is_nullable:
+        ch_type = ch_type.inner
+
+    char_size = None
+    if ch_type.name.lower() == 'fixedstring' and ch_type.literal_params:
+        char_size = int(ch_type.literal_params[0])
+
+    numeric_precision, numeric_scale = ch_type.precision_scale or (None, None)
+    return _ColumnTypeInfo(
+        str(ch_type), is_low_cardinality, is_nullable, char_size, numeric_precision, numeric_scale
+    )
+
+
 @dataclass
 class ClickHouseColumn(Column):
     TYPE_LABELS = {
@@ -18,32 +48,18 @@ class ClickHouseColumn(Column):
     }
     is_nullable: bool = False
     is_low_cardinality: bool = False
-    _low_card_regex = re.compile(r'^LowCardinality\((.*)\)$')
-    _nullable_regex = re.compile(r'^Nullable\((.*)\)$')
-    _fix_size_regex = re.compile(r'FixedString\((.*?)\)')
-    _decimal_regex = re.compile(r'Decimal\((\d+), (\d+)\)')
 
     def __init__(self, column: str, dtype: str) -> None:
-        char_size = None
-        numeric_precision = None
-        numeric_scale = None
-
-        dtype = self._inner_dtype(dtype)
-
-        if dtype.lower().startswith('fixedstring'):
-            match_sized = self._fix_size_regex.search(dtype)
-            if match_sized:
-                char_size = int(match_sized.group(1))
-
-        if dtype.lower().startswith('decimal'):
-            match_dec = self._decimal_regex.search(dtype)
-            numeric_precision = 0
-            numeric_scale = 0
-            if match_dec:
-                numeric_precision = int(match_dec.group(1))
-                numeric_scale = int(match_dec.group(2))
-
-        super().__init__(column, dtype, char_size, numeric_precision, numeric_scale)
+        type_info = _column_type_info(dtype)
+        self.is_low_cardinality = type_info.is_low_cardinality
+        self.is_nullable = type_info.is_nullable
+        super().__init__(
+            column,
+            type_info.dtype,
+            type_info.char_size,
+            type_info.numeric_precision,
+            type_info.numeric_scale,
+        )
 
     def __repr__(self) -> str:
         return f'<ClickhouseColumn {self.name} ({self.data_type}, is nullable: {self.is_nullable})>'
@@ -54,6 +70,22 @@ class ClickHouseColumn(Column):
 
     @property
     def data_type(self) -> str:
+        # Cached per instance, keyed on the fields it is derived from in case they are reassigned
+        key = (
+            self.dtype,
+            self.char_size,
+            self.numeric_precision,
+            self.numeric_scale,
+            self.is_low_cardinality,
+            self.is_nullable,
+        )
+        cached = self.__dict__.get('_data_type_cache')
+        if cached is None or cached[0] != key:
+            cached = (key, self._build_data_type())
+            self.__dict__['_data_type_cache'] = cached
+        return cached[1]
+
+    def _build_data_type(self) -> str:
         if self.is_string():
             data_t = self.string_type(self.string_size())
         elif self.is_numeric():
@@ -126,19 +158,6 @@ class ClickHouseColumn(Column):
 
         return other_column.string_size() > self.string_size()
 
-    def _inner_dtype(self, dtype) -> str:
-        inner_dtype = dtype.strip()
-
-        if low_card_match := self._low_card_regex.search(inner_dtype):
-            self.is_low_cardinality = True
-            inner_dtype = low_card_match.group(1)
-
-        if null_match := self._nullable_regex.search(inner_dtype):
-            self.is_nullable = True
-            inner_dtype = null_match.group(1)
-
-        return inner_dtype
-
 
 @dataclass(frozen=True)
 class ClickHouseColumnChanges:
@@ -146,6 +165,8 @@ class ClickHouseColumnChanges:
     columns_to_add: List[Column] = field(default_factory=list)
     columns_to_drop: List[Column] = field(default_factory=list)
     columns_to_modify: List[Column] = field(default_factory=list)
+    # Subset of columns_to_modify whose existing values all fit the new type
+    columns_to_widen: List[Column] = field(default_factory=list)
 
     def __bool__(self) -> bool:
         return bool(self.columns_to_add or self.columns_to_drop or self.columns_to_modify)
@@ -158,11 +179,21 @@ class ClickHouseColumnChanges:
     def has_sync_changes(self) -> bool:
         return bool(self.columns_to_drop or self.columns_to_modify)
 
+    @property
+    def has_incompatible_changes(self) -> bool:
+        return bool(self.columns_to_drop) or any(
+            column not in self.columns_to_widen for column in self.columns_to_modify
+        )
+
     @property
     def has_conflicting_changes(self) -> bool:
         if self.on_schema_change == 'fail' and self.has_schema_changes:
             return True
 
+        # Widening type changes are applied in place alongside the new columns
+        if self.on_schema_change == 'append_new_columns':
+            return self.has_incompatible_changes
+
         if self.on_schema_change != 'sync_all_columns' and self.has_sync_changes:
             return True
 
@@ -0,0 +1,191 @@
+import re
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+from typing import Iterator, List, Optional, Tuple, Union
+
+# Literal parameters (numbers, quoted strings, enum values, key=value settings) are
+# kept as their rendered source text, type parameters as nested ClickHouseType objects
+TypeParam = Union['ClickHouseType', str]
+
+_token_regex = re.compile(
+    r"""\s*(?:
+        (?P<string>'(?:[^'\\]|\\.|'')*')
+        |(?P<number>[-+]?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)
+        |(?P<ident>[A-Za-z_][A-Za-z0-9_.]*|`(?:[^`\\]|\\.)*`)
+        |(?P<punct>[(),=])
+    )""",
+    re.VERBOSE,
+)
+
+_decimal_precisions = {'decimal32': 9, 'decimal64': 18, 'decimal128': 38, 'decimal256': 76}
+
+
+class TypeParseError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class ClickHouseType:
+    """
+    Immutable parsed ClickHouse type expression, e.g. `Array(Nullable(String))`
+    """
+
+    name: str
+    params: Tuple[TypeParam, ...] = ()
+    field_name: Optional[str] = None
+
+    def __str__(self) -> str:
+        return self.rendered
+
+    @cached_property
+    def rendered(self) -> str:
+        rendered = self.name
+        if self.params:
+            rendered += f"({', '.join(str(param) for param in self.params)})"
+        if self.field_name:
+            rendered = f'{self.field_name} {rendered}'
+        return rendered
+
+    @property
+    def type_params(self) -> List['ClickHouseType']:
+        return [param for param in self.params if isinstance(param, ClickHouseType)]
+
+    @property
+    def literal_params(self) -> List[str]:
+        return [param for param in self.params if isinstance(param, str)]
+
+    @property
+    def is_nullable(self) -> bool:
+        return self.name == 'Nullable'
+
+    @property
+    def is_low_cardinality(self) -> bool:
+        return self.name == 'LowCardinality'
+
+    @property
+    def inner(self) -> 'ClickHouseType':
+        """
+        The wrapped type of a single-argument wrapper such as Nullable or LowCardinality
+        """
+        if len(self.params) != 1 or not isinstance(self.params[0], ClickHouseType):
+            raise TypeParseError(f'{self} is not a wrapper type')
+        return self.params[0]
+
+    @property
+    def precision_scale(self) -> Optional[Tuple[int, int]]:
+        """
+        Precision and scale of any Decimal flavour, None for other types
+        """
+        name = self.name.lower()
+        args = [int(param) for param in self.literal_params if param.isdigit()]
+        if name == 'decimal':
+            precision = args[0] if args else 10
+            return precision, args[1] if len(args) > 1 else 0
+        if name in _decimal_precisions:
+            return _decimal_precisions[name], args[0] if args else 0
+        return None
+
+
+def _tokenize(type_str: str) -> Iterator[Tuple[str, str]]:
+    pos = 0
+    end = len(type_str.rstrip())
+    while pos < end:
+        match = _token_regex.match(type_str, pos)
+        if not match or match.end() == pos:
+            raise TypeParseError(f'Unexpected character at {pos} in type {type_str!r}')
+        kind = match.lastgroup
+        assert kind is not None
+        yield kind, match.group(kind)
+        pos = match.end()
+
+
+class _TypeParser:
+    """
+    Recursive descent parser for type expressions:
+
+        type  := IDENT [ '(' [ param { ',' param } ] ')' ]
+        param := STRING [ '=' NUMBER ] | NUMBER | IDENT '=' value | [ IDENT ] type
+    """
+
+    def __init__(self, type_str: str) -> None:
+        self.type_str = type_str
+        self.tokens = list(_tokenize(type_str))
+        self.pos = 0
+
+    def parse(self) -> ClickHouseType:
+        parsed = self._type()
+        if self.pos != len(self.tokens):
+            self._fail()
+        return parsed
+
+    def _peek(self, offset: int = 0) -> Tuple[Optional[str], Optional[str]]:
+        if self.pos + offset < len(self.tokens):
+            return self.tokens[self.pos + offset]
+        return None, None
+
+    def _next(self, *kinds: str) -> str:
+        kind, value = self._peek()
+        if kind not in kinds:
+            self._fail()
+        self.pos += 1
+        assert value is not None
+        return value
+
+    def _accept(self, punct: str) -> bool:
+        if self._peek() == ('punct', punct):
+            self.pos += 1
+            return True
+        return False
+
+    def _expect(self, punct: str) -> None:
+        if not self._accept(punct):
+            self._fail()
+
+    def _fail(self):
+        raise TypeParseError(f'Unable to parse ClickHouse type {self.type_str!r}')
+
+    def _type(self, field_name: Optional[str] = None) -> ClickHouseType:
+        name = self._next('ident')
+        params: List[TypeParam] = []
+        if self._accept('('):
+            if not self._accept(')'):
+                params.append(self._param())
+                while self._accept(','):
+                    params.append(self._param())
+                self._expect(')')
+        return ClickHouseType(name, tuple(params), field_name)
+
+    def _param(self) -> TypeParam:
+        kind, value = self._peek()
+        if kind == 'string':
+            self.pos += 1
+            if self._accept('='):
+                return f"{value} = {self._next('number')}"
+            assert value is not None
+            return value
+        if kind == 'number':
+            self.pos += 1
+            assert value is not None
+            return value
+        next_kind, next_value = self._peek(1)
+        if next_kind == 'punct' and next_value == '=':
+            self.pos += 2
+            return f"{value}={self._next('number', 'string', 'ident')}"
+        if next_kind == 'ident':
+            # Named element of a Tuple or Nested type, e.g. `Tuple(id UInt64, name String)`
+            return self._type(self._next('ident'))
+        return self._type()
+
+
+@lru_cache(maxsize=4096)
+def parse_type(type_str: str) -> ClickHouseType:
+    """
+    Parse a ClickHouse type expression into an immutable ClickHouseType. Results are memoized,
+    so repeated column types (the common case for catalogs and schema checks) are parsed once.
+    Expressions that cannot be parsed are returned as an opaque type named after the stripped
+    input so callers can still round trip them.
+    """
+    try:
+        return _TypeParser(type_str).parse()
+    except TypeParseError:
+        return ClickHouseType(type_str.strip())
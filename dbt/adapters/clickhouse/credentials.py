@@ -33,6 +33,8 @@ class ClickHouseCredentials(Credentials):
     compression: str = ''
     check_exchange: bool = True
     custom_settings: Optional[Dict[str, Any]] = None
+    # Overrides of the settings applied to each kind of statement, see dbclient.STATEMENT_SETTINGS
+    statement_settings: Optional[Dict[str, Dict[str, Any]]] = None
     use_lw_deletes: bool = False
     local_suffix: str = 'local'
     local_db_prefix: str = ''
@@ -88,6 +90,7 @@ class ClickHouseCredentials(Credentials):
             'compression',
             'check_exchange',
             'custom_settings',
+            'statement_settings',
             'use_lw_deletes',
             'allow_automatic_deduplication',
             'tcp_keepalive',
@@ -1,9 +1,11 @@
 import copy
+import re
 import threading
 import uuid
 from abc import ABC, abstractmethod
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+from dbt.adapters.clickhouse.column import ClickHouseColumn
 from dbt.adapters.clickhouse.credentials import ClickHouseCredentials
 from dbt.adapters.clickhouse.errors import (
     nd_mutations_not_enabled_error,
@@ -30,7 +32,14 @@ _ensured_databases: set = set()
 _nd_mutation_lock = threading.Lock()
 _nd_mutation_probe: Optional[tuple] = None
 
+# Server-side `max_threads`, probed once per process for a `max_insert_threads: auto` bulk
+# insert setting and guarded by `_max_threads_lock`.
+_max_threads_lock = threading.Lock()
+_max_threads_probe: Optional[int] = None
+
 ND_MUTATION_SETTING = 'allow_nondeterministic_mutations'
+SCHEMA_SPLIT_COLUMN = '__dbt_schema_split'
+TARGET_ALIAS = '__dbt_target'
 DEDUP_WINDOW_SETTING = 'replicated_deduplication_window'
 DEDUP_WINDOW_SETTING_SUPPORTED_MATERIALIZATION = [
     "table",
@@ -39,6 +48,59 @@ DEDUP_WINDOW_SETTING_SUPPORTED_MATERIALIZATION = [
     "materialized_view",
 ]
 
+# Settings applied to statements by kind (see `statement_kind`), unless the connection's
+# `custom_settings` or the statement's own SETTINGS clause already sets them. They can be
+# changed with the `statement_settings` profile option. `max_insert_threads: auto` is replaced
+# by the server's `max_threads`, so bulk inserts use all cores. Insert block sizes are left at
+# the server defaults, since every insert thread buffers a block.
+STATEMENT_SETTINGS: Dict[str, Dict[str, Any]] = {
+    'bulk_insert': {
+        'max_insert_threads': 'auto',
+    },
+    'metadata': {
+        'max_threads': '1',
+    },
+}
+
+_leading_comments_re = re.compile(r'^(?:\s+|/\*.*?\*/|--[^\n]*(?:\n|$))*', re.DOTALL)
+_insert_re = re.compile(r'^INSERT\s+INTO\b', re.IGNORECASE)
+_insert_data_re = re.compile(r'\b(VALUES|FORMAT|SELECT|WITH)\b', re.IGNORECASE)
+_create_table_re = re.compile(
+    r'^CREATE\s+(?:OR\s+REPLACE\s+)?(?:TEMPORARY\s+)?TABLE\b', re.IGNORECASE
+)
+_as_select_re = re.compile(r'\b(EMPTY\s+)?AS\s*\(?\s*(?:SELECT|WITH)\b', re.IGNORECASE)
+_metadata_re = re.compile(r'^(?:DESCRIBE|DESC|EXISTS|SHOW)\b', re.IGNORECASE)
+_select_re = re.compile(r'^SELECT\b', re.IGNORECASE)
+_from_re = re.compile(r'\bFROM\s+', re.IGNORECASE)
+_system_table_re = re.compile(r'(?:clusterAllReplicas\s*\([^,]*,\s*)?system\.', re.IGNORECASE)
+_settings_clause_re = re.compile(r'\bSETTINGS\s+(.*)$', re.IGNORECASE | re.DOTALL)
+_setting_name_re = re.compile(r'\b(\w+)\s*=')
+
+
+def statement_kind(sql: str) -> Optional[str]:
+    """
+    The kind of a statement for `STATEMENT_SETTINGS`: `bulk_insert` for INSERT ... SELECT and
+    CREATE TABLE ... AS SELECT, `metadata` for DESCRIBE, EXISTS, SHOW and reads of system
+    tables, None for anything else
+    """
+    sql = _leading_comments_re.sub('', sql, count=1)
+    if _insert_re.match(sql):
+        data = _insert_data_re.search(sql)
+        if data and data.group(1).upper() in ('SELECT', 'WITH'):
+            return 'bulk_insert'
+        return None
+    if _create_table_re.match(sql):
+        as_select = _as_select_re.search(sql)
+        return 'bulk_insert' if as_select and not as_select.group(1) else None
+    if _metadata_re.match(sql):
+        return 'metadata'
+    if _select_re.match(sql):
+        # Only the first FROM counts, a user query may use system tables in a subquery
+        first_from = _from_re.search(sql)
+        if first_from and _system_table_re.match(sql, first_from.end()):
+            return 'metadata'
+    return None
+
 
 def get_db_client(credentials: ClickHouseCredentials):
     driver = credentials.driver
@@ -98,6 +160,7 @@ class ChClientWrapper(ABC):
         self._conn_settings.setdefault('mutations_sync', '3')
         self._conn_settings.setdefault('alter_sync', '3')
         self._conn_settings.setdefault('insert_distributed_sync', '1')
+        self._statement_settings = self._merge_statement_settings(credentials.statement_settings)
         self._client = self._create_client(credentials)
         check_exchange = credentials.check_exchange and not credentials.cluster_mode
         try:
@@ -107,6 +170,10 @@ class ChClientWrapper(ABC):
                 credentials.use_lw_deletes
             )
             self.atomic_exchange = not check_exchange or self._check_atomic_exchange()
+            bulk_insert = self._statement_settings['bulk_insert']
+            if str(bulk_insert.get('max_insert_threads')).lower() == 'auto':
+                max_threads = self._check_max_threads()
+                bulk_insert['max_insert_threads'] = str(max_threads) if max_threads else None
         except Exception as ex:
             self.close()
             raise ex
@@ -128,6 +195,39 @@ class ChClientWrapper(ABC):
             for materialization in DEDUP_WINDOW_SETTING_SUPPORTED_MATERIALIZATION:
                 self._model_settings[materialization][DEDUP_WINDOW_SETTING] = '0'
 
+    @staticmethod
+    def _merge_statement_settings(
+        overrides: Optional[Dict[str, Dict[str, Any]]],
+    ) -> Dict[str, Dict[str, Any]]:
+        overrides = overrides or {}
+        unknown = overrides.keys() - STATEMENT_SETTINGS.keys()
+        if unknown:
+            raise DbtConfigError(
+                f'Unknown statement_settings kinds {", ".join(sorted(unknown))}, '
+                f'expected one of: {", ".join(STATEMENT_SETTINGS)}'
+            )
+        # A null value disables a built in setting
+        return {
+            kind: {**defaults, **(overrides.get(kind) or {})}
+            for kind, defaults in STATEMENT_SETTINGS.items()
+        }
+
+    def _apply_statement_settings(self, sql: str, kwargs: Dict[str, Any]) -> None:
+        """Add the settings of the kind of `sql` to the `settings` of a query or command"""
+        kind = statement_kind(sql)
+        if not kind:
+            return
+        # Settings of the statement's own SETTINGS clause, e.g. a model's `query_settings`
+        clause = _settings_clause_re.search(sql)
+        own_settings = set(_setting_name_re.findall(clause.group(1))) if clause else set()
+        defaults = {
+            key: value
+            for key, value in self._statement_settings[kind].items()
+            if value is not None and key not in self._conn_settings and key not in own_settings
+        }
+        # A new dict, the caller's settings may be shared with other statements and threads
+        kwargs['settings'] = {**defaults, **(kwargs.get('settings') or {})}
+
     @abstractmethod
     def query(self, sql: str, **kwargs):
         pass
@@ -137,8 +237,42 @@ class ChClientWrapper(ABC):
         pass
 
     @abstractmethod
-    def columns_in_query(self, sql: str, **kwargs):
-        pass
+    def _column_types(self, sql: str, **kwargs) -> List[Tuple[str, str]]:
+        """
+        Run sql and return the (name, type) pairs of its result columns
+        """
+
+    def columns_in_query(self, sql: str, **kwargs) -> List[ClickHouseColumn]:
+        return [
+            ClickHouseColumn.create(name, ch_type)
+            for name, ch_type in self._column_types(
+                f"SELECT * FROM ( \n{sql} \n) LIMIT 0", **kwargs
+            )
+        ]
+
+    def columns_in_query_and_relation(
+        self, sql: str, relation: str, **kwargs
+    ) -> Tuple[List[ClickHouseColumn], List[ClickHouseColumn]]:
+        """
+        Columns of an existing relation and of a query in a single round trip. Both sides are
+        read from the result metadata of an empty cross join, split by a marker column.
+        """
+        column_types = self._column_types(
+            f"SELECT __dbt_source.*, 0 AS {SCHEMA_SPLIT_COLUMN}, {TARGET_ALIAS}.* "
+            f"FROM (SELECT * FROM {relation} LIMIT 0) AS __dbt_source "
+            f"CROSS JOIN (SELECT * FROM ( \n{sql} \n) LIMIT 0) AS {TARGET_ALIAS}",
+            **kwargs,
+        )
+        names = [name for name, _ in column_types]
+        split = names.index(SCHEMA_SPLIT_COLUMN)
+        source = [ClickHouseColumn.create(name, ch_type) for name, ch_type in column_types[:split]]
+        # Target columns sharing a name with a source column may come back qualified
+        target_prefix = f'{TARGET_ALIAS}.'
+        target = [
+            ClickHouseColumn.create(name.removeprefix(target_prefix), ch_type)
+            for name, ch_type in column_types[split + 1 :]
+        ]
+        return source, target
 
     @abstractmethod
     def get_ch_setting(self, setting_name):
@@ -206,6 +340,16 @@ class ChClientWrapper(ABC):
             return True, requested
         return False, False
 
+    def _check_max_threads(self) -> Optional[int]:
+        global _max_threads_probe
+        with _max_threads_lock:
+            if _max_threads_probe is None:
+                # The value is a number or, by default, `'auto(<cores>)'`
+                value = (self.get_ch_setting('max_threads') or (None, 0))[0]
+                digits = re.search(r'\d+', str(value)) if value is not None else None
+                _max_threads_probe = int(digits.group(0)) if digits else 0
+            return _max_threads_probe
+
     def _ensure_database(self, database_engine, cluster_name) -> None:
         if not self.database:
             return
@@ -0,0 +1,190 @@
+import re
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from dbt.adapters.clickhouse.dbclient import ChClientWrapper
+from dbt.adapters.clickhouse.query import escape_str, quote_identifier
+from dbt.adapters.clickhouse.relation import ClickHouseRelation
+from dbt.adapters.clickhouse.util import poll_with_backoff
+from dbt.adapters.contracts.connection import AdapterResponse
+from dbt_common.exceptions import DbtRuntimeError
+
+# Statuses of system.dictionaries while a load is in progress
+LOADING_STATUSES = ('LOADING', 'LOADED_AND_RELOADING', 'FAILED_AND_RELOADING')
+
+
+@dataclass
+class DictionaryStats:
+    status: str
+    element_count: int
+    bytes_allocated: int
+    loading_duration: float
+
+    def __str__(self) -> str:
+        return (
+            f'{self.status} {self.element_count} elements, '
+            f'{self.bytes_allocated / 1048576:.1f} MiB in {self.loading_duration:.2f}s'
+        )
+
+
+@dataclass
+class DictionaryLoadResponse(AdapterResponse):
+    """
+    Adapter response of a dictionary model, so the size of the loaded dictionary ends up in
+    run_results.json
+    """
+
+    bytes_allocated: Optional[int] = None
+    loading_duration: Optional[float] = None
+
+    @classmethod
+    def from_stats(cls, stats: DictionaryStats) -> 'DictionaryLoadResponse':
+        return cls(
+            _message=str(stats),
+            code=stats.status,
+            rows_affected=stats.element_count,
+            bytes_allocated=stats.bytes_allocated,
+            loading_duration=stats.loading_duration,
+        )
+
+
+def dictionary_status(handle: ChClientWrapper, relation: ClickHouseRelation) -> Sequence:
+    """
+    The status, element_count, bytes_allocated, loading_duration and last_exception of a
+    dictionary in system.dictionaries
+    """
+    rows = handle.query(
+        'SELECT status, element_count, bytes_allocated, loading_duration, last_exception '
+        'FROM system.dictionaries '
+        f"WHERE database = '{escape_str(relation.schema)}' "
+        f"AND name = '{escape_str(relation.identifier)}'"
+    ).result_set
+    if not rows:
+        raise DbtRuntimeError(f'Dictionary {relation} does not exist')
+    return rows[0]
+
+
+def wait_for_dictionary(
+    handle: ChClientWrapper,
+    relation: ClickHouseRelation,
+    timeout: Optional[float] = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> DictionaryStats:
+    """
+    Wait until a dictionary has finished loading and return its load statistics. A dictionary
+    that failed to load raises with the exception of the last load.
+    """
+
+    def loaded_state():
+        row = dictionary_status(handle, relation)
+        return None if str(row[0]) in LOADING_STATUSES else row
+
+    status, element_count, bytes_allocated, loading_duration, exception = poll_with_backoff(
+        loaded_state, f'dictionary {relation} to load', timeout, sleep
+    )
+    status = str(status)
+    if status != 'LOADED':
+        raise DbtRuntimeError(
+            f'Dictionary {relation} is {status}' + (f': {exception}' if exception else '')
+        )
+    return DictionaryStats(status, int(element_count), int(bytes_allocated), loading_duration)
+
+
+# Largest key of a FLAT dictionary without a MAX_ARRAY_SIZE (the ClickHouse default)
+FLAT_DEFAULT_MAX_ARRAY_SIZE = 500000
+# Sources with at least this many rows are loaded into a sharded hash table in parallel
+SHARDED_ROWS = 10_000_000
+SHARDS = 16
+# Memory per element relative to the payload of each hashed layout (load factor/overhead)
+_HASHED_OVERHEAD = {'HASHED': 2.0, 'SPARSE_HASHED': 1.25}
+# FLAT and HASHED simple key layouts only take UInt64 keys, others need COMPLEX_KEY_ layouts
+_simple_key_regex = re.compile(r'^UInt64$')
+_attribute_options_regex = re.compile(
+    r'\s+(DEFAULT|EXPRESSION|HIERARCHICAL|INJECTIVE|IS_OBJECT_ID)\b.*$', re.IGNORECASE | re.DOTALL
+)
+
+
+@dataclass(frozen=True)
+class SourceProfile:
+    rows: int
+    unique_keys: int
+    min_key: Optional[int]
+    max_key: Optional[int]
+    key_bytes: float
+    value_bytes: float
+
+
+@dataclass(frozen=True)
+class LayoutAdvice:
+    layout: str
+    estimated_bytes: int
+
+
+def _field_type(data_type: str) -> str:
+    return _attribute_options_regex.sub('', data_type.strip())
+
+
+def dictionary_keys(fields: Sequence[Sequence[str]], primary_key: str) -> Tuple[List[str], bool]:
+    """
+    The key columns of a dictionary and whether it has a simple key, i.e. a single UInt64 column
+    """
+    keys = [key.strip() for key in primary_key.split(',') if key.strip()]
+    types = {name: _field_type(data_type) for name, data_type in fields}
+    simple = len(keys) == 1 and bool(_simple_key_regex.match(types.get(keys[0], '')))
+    return keys, simple
+
+
+def profile_query(source_sql: str, keys: List[str], attributes: List[str], simple: bool) -> str:
+    quoted_keys = ', '.join(quote_identifier(key) for key in keys)
+    key_range = f'min({quoted_keys}), max({quoted_keys})' if simple else 'NULL, NULL'
+    value_bytes = (
+        f"avg(byteSize({', '.join(quote_identifier(name) for name in attributes)}))"
+        if attributes
+        else '0'
+    )
+    return (
+        f'SELECT count(), uniq({quoted_keys}), {key_range}, avg(byteSize({quoted_keys})), '
+        f'{value_bytes} FROM ( \n{source_sql} \n)'
+    )
+
+
+def advise_layout(
+    simple_key: bool, attribute_count: int, profile: SourceProfile, ranged: bool = False
+) -> LayoutAdvice:
+    """
+    Choose the dictionary layout with the smallest expected memory footprint:
+
+    * RANGE_HASHED for dictionaries with a RANGE, the only layout that accepts one
+    * FLAT for simple keys whose range is small or dense enough that an array indexed by the
+      key is cheaper than a hash table
+    * HASHED_ARRAY for several attributes, since it stores each attribute in a plain array
+    * HASHED for small and SPARSE_HASHED for large sources with a single attribute, sharded for
+      parallel loading once the source is large
+    """
+    rows = max(profile.rows, profile.unique_keys)
+    key_bytes = profile.key_bytes or 8
+    value_bytes = profile.value_bytes
+    prefix = '' if simple_key else 'COMPLEX_KEY_'
+
+    if ranged:
+        estimate = rows * (key_bytes + value_bytes) * _HASHED_OVERHEAD['HASHED']
+        return LayoutAdvice(f'{prefix}RANGE_HASHED()', int(estimate))
+
+    if attribute_count > 1:
+        layout = 'HASHED_ARRAY'
+        estimate = rows * (key_bytes + 8) * 2.0 + rows * value_bytes
+    else:
+        layout = 'SPARSE_HASHED' if rows >= SHARDED_ROWS else 'HASHED'
+        estimate = rows * (key_bytes + value_bytes) * _HASHED_OVERHEAD[layout]
+    params = f'SHARDS {SHARDS}' if rows >= SHARDED_ROWS and layout != 'HASHED_ARRAY' else ''
+
+    if simple_key and profile.max_key is not None and (profile.min_key or 0) >= 0:
+        array_size = profile.max_key + 1
+        flat_estimate = array_size * max(value_bytes, 1)
+        if array_size <= FLAT_DEFAULT_MAX_ARRAY_SIZE:
+            return LayoutAdvice('FLAT()', int(flat_estimate))
+        if flat_estimate <= estimate:
+            return LayoutAdvice(f'FLAT(MAX_ARRAY_SIZE {array_size})', int(flat_estimate))
+
+    return LayoutAdvice(f'{prefix}{layout}({params})', int(estimate))
@@ -0,0 +1,117 @@
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from dbt.adapters.clickhouse.dbclient import ChClientWrapper
+from dbt.adapters.clickhouse.logger import logger
+from dbt.adapters.clickhouse.query import escape_str
+from dbt.adapters.clickhouse.relation import ClickHouseRelation
+
+# The sharding key of a distributed_table model without a `sharding_key`
+RANDOM_SHARDING = 'rand()'
+
+
+@dataclass(frozen=True)
+class DistributedEngine:
+    cluster: str
+    database: str
+    table: str
+    sharding_key: Optional[str]
+
+
+def split_args(args: str) -> List[str]:
+    """Split engine arguments on the commas outside of quotes and parentheses"""
+    parts, current, depth, quote = [], [], 0, ''
+    escaped = False
+    for char in args:
+        if quote:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == quote:
+                quote = ''
+        elif char in '\'"`':
+            quote = char
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            parts.append(''.join(current).strip())
+            current = []
+            continue
+        current.append(char)
+    parts.append(''.join(current).strip())
+    return parts
+
+
+def _unquote(value: str) -> str:
+    if len(value) > 1 and value[0] == value[-1] and value[0] in '\'"`':
+        return value[1:-1]
+    return value
+
+
+def _normalized_expression(expression: Optional[str]) -> str:
+    expression = (expression or '').strip() or RANDOM_SHARDING
+    return ''.join(char for char in expression if char not in ' \t\n`"')
+
+
+def parse_distributed_engine(engine_full: str) -> Optional[DistributedEngine]:
+    """The arguments of a `Distributed(cluster, database, table[, sharding_key, ...])` engine"""
+    prefix = 'Distributed('
+    if not engine_full.startswith(prefix):
+        return None
+    depth, end = 0, -1
+    for position, char in enumerate(engine_full):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+            if depth == 0:
+                end = position
+                break
+    args = split_args(engine_full[len(prefix) : end])
+    if end < 0 or len(args) < 3:
+        return None
+    return DistributedEngine(
+        cluster=_unquote(args[0]),
+        database=_unquote(args[1]),
+        table=_unquote(args[2]),
+        sharding_key=args[3] if len(args) > 3 else None,
+    )
+
+
+def parallel_insert_source(
+    handle: ChClientWrapper,
+    relations: Sequence[ClickHouseRelation],
+    cluster: str,
+    sharding_key: Optional[str],
+) -> Optional[DistributedEngine]:
+    """
+    The Distributed source of a distributed_table model that can be inserted with
+    `parallel_distributed_insert_select=2`: each shard then inserts the rows of its own part of
+    the source into its part of the target, without sending them through the initiator.
+
+    That only keeps every row on the shard the target's sharding key puts it on when the model
+    reads from a single Distributed table of the same cluster sharded by the same expression, or
+    when the target is sharded randomly anyway.
+    """
+    if len(relations) != 1 or not cluster:
+        return None
+    relation = relations[0]
+    rows = handle.query(
+        'SELECT engine_full FROM system.tables '
+        f"WHERE database = '{escape_str(relation.schema)}' "
+        f"AND name = '{escape_str(relation.identifier)}'"
+    ).result_set
+    source = parse_distributed_engine(str(rows[0][0])) if rows else None
+    if source is None or source.cluster != cluster:
+        logger.debug(f'{relation} is not a Distributed table of cluster {cluster}')
+        return None
+    target_key = _normalized_expression(sharding_key)
+    if target_key != _normalized_expression(RANDOM_SHARDING) and target_key != (
+        _normalized_expression(source.sharding_key) if source.sharding_key else None
+    ):
+        logger.debug(f'{relation} is sharded by {source.sharding_key}, not {sharding_key}')
+        return None
+    return source
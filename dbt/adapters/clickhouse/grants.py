@@ -0,0 +1,129 @@
+import threading
+from collections import defaultdict
+from typing import Dict, FrozenSet, List, Sequence, Set, Tuple
+
+from dbt.adapters.clickhouse.dbclient import ChClientWrapper
+from dbt.adapters.clickhouse.query import escape_str
+from dbt.adapters.clickhouse.relation import ClickHouseRelation
+
+# privilege -> grantees, as configured in the `grants` config of a model
+Grants = Dict[str, List[str]]
+# A relation to apply grants to, with the ON CLUSTER clause of its DCL statements
+GrantTarget = Tuple[ClickHouseRelation, str]
+
+
+def _normalized(grants: Grants) -> Dict[str, Set[str]]:
+    normalized: Dict[str, Set[str]] = defaultdict(set)
+    for privilege, grantees in grants.items():
+        normalized[privilege.lower()].update(grantees)
+    return normalized
+
+
+def diff_grants(desired: Grants, current: Grants) -> Grants:
+    """The grants of `desired` missing from `current`, comparing privileges case insensitively
+    like dbt's `diff_of_two_dicts`"""
+    present = _normalized(current)
+    missing: Grants = {}
+    for privilege, grantees in desired.items():
+        absent = [grantee for grantee in grantees if grantee not in present[privilege.lower()]]
+        if absent:
+            missing[privilege] = absent
+    return missing
+
+
+class GrantsCache:
+    """
+    Table level grants of the schemas touched by an invocation. The grants of a schema are read
+    from system.grants once, with a single query, and kept up to date with the grants and
+    revokes dbt issues afterwards. Grants are bound to the name of a table, so they stay valid
+    when dbt replaces the table itself.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.schemas: Dict[str, Dict[str, Dict[str, Set[str]]]] = {}
+
+    def _load(self, handle: ChClientWrapper, schemas: Set[str]) -> None:
+        missing = schemas - self.schemas.keys()
+        if not missing:
+            return
+        databases = ', '.join(f"'{escape_str(schema)}'" for schema in sorted(missing))
+        rows = handle.query(
+            'SELECT database, table, access_type, COALESCE(user_name, role_name) '
+            f'FROM system.grants WHERE database IN ({databases}) '
+            'AND table IS NOT NULL AND NOT is_partial_revoke'
+        ).result_set
+        for schema in missing:
+            self.schemas[schema] = {}
+        for schema, table, privilege, grantee in rows:
+            tables = self.schemas[schema]
+            tables.setdefault(table, defaultdict(set))[str(privilege).lower()].add(grantee)
+
+    def get(self, handle: ChClientWrapper, relation: ClickHouseRelation) -> Grants:
+        with self.lock:
+            self._load(handle, {relation.schema})
+            grants = self.schemas[relation.schema].get(relation.identifier, {})
+            return {privilege: sorted(grantees) for privilege, grantees in grants.items()}
+
+    def update(self, relation: ClickHouseRelation, granted: Grants, revoked: Grants) -> None:
+        with self.lock:
+            tables = self.schemas.setdefault(relation.schema, {})
+            grants = tables.setdefault(relation.identifier, defaultdict(set))
+            for privilege, grantees in granted.items():
+                grants[privilege.lower()].update(grantees)
+            for privilege, grantees in revoked.items():
+                grants[privilege.lower()].difference_update(grantees)
+
+
+def dcl_statements(verb: str, changes: Sequence[Tuple[GrantTarget, Grants]]) -> List[str]:
+    """
+    Combine the grants (or revokes) of several relations into as few statements as possible.
+    A single GRANT can grant several `privileges ON relation` elements to several grantees, so
+    the grantees receiving exactly the same elements share one statement. Relations with
+    different ON CLUSTER clauses need separate statements.
+    """
+    preposition = 'to' if verb == 'grant' else 'from'
+    # Elements are (position of the relation, relation, privilege) to keep the relations in order
+    by_grantee: Dict[Tuple[str, str], Set[Tuple[int, str, str]]] = defaultdict(set)
+    for position, ((relation, on_cluster), grants) in enumerate(changes):
+        for privilege, grantees in grants.items():
+            for grantee in grantees:
+                by_grantee[(on_cluster, grantee)].add((position, str(relation), privilege))
+
+    by_elements: Dict[Tuple[str, FrozenSet[Tuple[int, str, str]]], List[str]] = defaultdict(list)
+    for (on_cluster, grantee), grantee_elements in by_grantee.items():
+        by_elements[(on_cluster, frozenset(grantee_elements))].append(grantee)
+
+    statements = []
+    for (on_cluster, elements), grantees in sorted(
+        by_elements.items(), key=lambda item: (item[0][0], sorted(item[0][1]))
+    ):
+        privileges: Dict[str, List[str]] = defaultdict(list)
+        for _, relation, privilege in sorted(elements):
+            privileges[relation].append(privilege)
+        targets = ', '.join(f"{', '.join(privs)} on {rel}" for rel, privs in privileges.items())
+        cluster = f' {on_cluster}' if on_cluster else ''
+        statements.append(f'{verb}{cluster} {targets} {preposition} {", ".join(sorted(grantees))}')
+    return statements
+
+
+def grant_changes(
+    cache: GrantsCache,
+    handle: ChClientWrapper,
+    targets: Sequence[GrantTarget],
+    grant_config: Grants,
+    should_revoke: bool = True,
+) -> List[str]:
+    """
+    The GRANT and REVOKE statements bringing the grants of `targets` to `grant_config`. Missing
+    grants are granted even when `should_revoke` is false, but nothing is revoked then.
+    """
+    granting, revoking = [], []
+    for relation, on_cluster in targets:
+        current = cache.get(handle, relation)
+        needs_granting = diff_grants(grant_config, current)
+        needs_revoking = diff_grants(current, grant_config) if should_revoke else {}
+        cache.update(relation, needs_granting, needs_revoking)
+        granting.append(((relation, on_cluster), needs_granting))
+        revoking.append(((relation, on_cluster), needs_revoking))
+    return dcl_statements('revoke', revoking) + dcl_statements('grant', granting)
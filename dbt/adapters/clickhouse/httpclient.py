@@ -1,10 +1,9 @@
-from typing import List
+from typing import List, Tuple
 
 import clickhouse_connect
 from clickhouse_connect.driver.exceptions import DatabaseError, OperationalError
 from clickhouse_connect.driver.httputil import all_managers, check_env_proxy, get_pool_manager
 from dbt.adapters.__about__ import version as dbt_adapters_version
-from dbt.adapters.clickhouse import ClickHouseColumn
 from dbt.adapters.clickhouse.__version__ import version as dbt_clickhouse_version
 from dbt.adapters.clickhouse.dbclient import ChClientWrapper, ChRetryableException
 from dbt.adapters.clickhouse.util import hide_stack_trace
@@ -23,6 +22,7 @@ class ChHttpClient(ChClientWrapper):
     def query(self, sql, **kwargs):
         try:
             self._inject_query_id(kwargs)
+            self._apply_statement_settings(sql, kwargs)
             return self._client.query(sql, **kwargs)
         except DatabaseError as ex:
             err_msg = hide_stack_trace(ex)
@@ -31,19 +31,17 @@ class ChHttpClient(ChClientWrapper):
     def command(self, sql, **kwargs):
         try:
             self._inject_query_id(kwargs)
+            self._apply_statement_settings(sql, kwargs)
             return self._client.command(sql, **kwargs)
         except DatabaseError as ex:
             err_msg = hide_stack_trace(ex)
             raise DbtDatabaseError(err_msg) from ex
 
-    def columns_in_query(self, sql: str, **kwargs) -> List[ClickHouseColumn]:
+    def _column_types(self, sql: str, **kwargs) -> List[Tuple[str, str]]:
         try:
-            query_result = self._client.query(
-                f"SELECT * FROM ( \n{sql} \n) LIMIT 0",
-                **kwargs,
-            )
+            query_result = self._client.query(sql, **kwargs)
             return [
-                ClickHouseColumn.create(name, ch_type.name)
+                (name, ch_type.name)
                 for name, ch_type in zip(
                     query_result.column_names, query_result.column_types, strict=True
                 )
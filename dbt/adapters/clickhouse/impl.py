@@ -1,7 +1,8 @@
 import csv
 import io
 import json
-from dataclasses import dataclass
+import os
+from dataclasses import dataclass, replace
 from multiprocessing.context import SpawnContext
 from typing import (
     TYPE_CHECKING,
@@ -22,22 +23,61 @@ from dbt.adapters.base.impl import BaseAdapter, ConstraintSupport
 from dbt.adapters.base.relation import BaseRelation, InformationSchema
 from dbt.adapters.capability import Capability, CapabilityDict, CapabilitySupport, Support
 from dbt.adapters.clickhouse.cache import ClickHouseRelationsCache
+from dbt.adapters.clickhouse.catchup import CatchupConfig, MvCatchup
 from dbt.adapters.clickhouse.column import ClickHouseColumn, ClickHouseColumnChanges
 from dbt.adapters.clickhouse.connections import ClickHouseConnectionManager
-from dbt.adapters.clickhouse.dbclient import ND_MUTATION_SETTING
+from dbt.adapters.clickhouse.dbclient import ND_MUTATION_SETTING, get_db_client
+from dbt.adapters.clickhouse.dictionary import (
+    DictionaryLoadResponse,
+    SourceProfile,
+    advise_layout,
+    dictionary_keys,
+    dictionary_status,
+    profile_query,
+    wait_for_dictionary,
+)
+from dbt.adapters.clickhouse.distributed import parallel_insert_source
 from dbt.adapters.clickhouse.errors import (
     schema_change_fail_error,
 )
+from dbt.adapters.clickhouse.grants import GrantsCache, grant_changes
 from dbt.adapters.clickhouse.logger import logger
-from dbt.adapters.clickhouse.query import quote_identifier
+from dbt.adapters.clickhouse.partitions import PartitionCarryOver
+from dbt.adapters.clickhouse.query import escape_str, quote_identifier
+from dbt.adapters.clickhouse.refresh import WAIT_VIEW_VERSION, ViewRefresher
 from dbt.adapters.clickhouse.relation import ClickHouseRelation, ClickHouseRelationType
-from dbt.adapters.clickhouse.util import compare_versions, engine_can_atomic_exchange
+from dbt.adapters.clickhouse.s3 import (
+    S3File,
+    S3FileTracker,
+    S3SchemaCache,
+    export_settings,
+    s3_path_filter,
+    schema_cache_key,
+)
+from dbt.adapters.clickhouse.schema_diff import diff_columns
+from dbt.adapters.clickhouse.state import (
+    ModelStateStore,
+    fingerprint,
+    schema_dropped,
+    upstream_state,
+)
+from dbt.adapters.clickhouse.util import (
+    compare_versions,
+    engine_can_atomic_exchange,
+    poll_with_backoff,
+)
+from dbt.adapters.contracts.connection import AdapterResponse
 from dbt.adapters.contracts.relation import Path, RelationConfig
 from dbt.adapters.events.types import ConstraintNotSupported
 from dbt.adapters.sql import SQLAdapter
 from dbt_common.contracts.constraints import ConstraintType, ModelLevelConstraint
 from dbt_common.events.functions import warn_or_error
-from dbt_common.exceptions import DbtInternalError, DbtRuntimeError, NotImplementedError
+from dbt_common.exceptions import (
+    DbtDatabaseError,
+    DbtInternalError,
+    DbtRuntimeError,
+    NotImplementedError,
+)
 from dbt_common.utils import filter_null_values
 
 if TYPE_CHECKING:
@@ -83,6 +123,7 @@ class ClickHouseAdapter(SQLAdapter):
     def __init__(self, config, mp_context: SpawnContext):
         BaseAdapter.__init__(self, config, mp_context)
         self.cache = ClickHouseRelationsCache()
+        self.grants_cache = GrantsCache()
 
     @classmethod
     def date_function(cls):
@@ -241,26 +282,8 @@ class ClickHouseAdapter(SQLAdapter):
                 "Only `fail`, `ignore`, `append_new_columns`, and `sync_all_columns` supported for `on_schema_change`."
             )
 
-        source = self.get_columns_in_relation(existing)
-        source_map = {column.name: column for column in source}
-        target = self.get_column_schema_from_query(target_sql, query_settings=query_settings)
-        target_map = {column.name: column for column in target}
-
-        source_not_in_target = [column for column in source if column.name not in target_map.keys()]
-        target_not_in_source = [column for column in target if column.name not in source_map.keys()]
-        target_in_source = [column for column in target if column.name in source_map.keys()]
-        changed_data_types = []
-        for column in target_in_source:
-            source_column = source_map.get(column.name)
-            if source_column is not None and column.dtype != source_column.dtype:
-                changed_data_types.append(column)
-
-        clickhouse_column_changes = ClickHouseColumnChanges(
-            columns_to_add=target_not_in_source,
-            columns_to_drop=source_not_in_target,
-            columns_to_modify=changed_data_types,
-            on_schema_change=on_schema_change,
-        )
+        source, target = self._get_schema_change_columns(existing, target_sql, query_settings)
+        clickhouse_column_changes = diff_columns(source, target, on_schema_change)
 
         if clickhouse_column_changes.has_conflicting_changes:
 
@@ -271,14 +294,31 @@ class ClickHouseAdapter(SQLAdapter):
                 schema_change_fail_error.format(
                     materialization,
                     'on_schema_change' if materialization != 'table' else 'mv_on_schema_change',
-                    format_column_names(source_not_in_target),
-                    format_column_names(target_not_in_source),
-                    format_column_names(changed_data_types),
+                    format_column_names(clickhouse_column_changes.columns_to_drop),
+                    format_column_names(clickhouse_column_changes.columns_to_add),
+                    format_column_names(clickhouse_column_changes.columns_to_modify),
                 )
             )
 
         return clickhouse_column_changes
 
+    def _get_schema_change_columns(
+        self, existing, target_sql, query_settings: Optional[Dict[str, Any]]
+    ) -> Tuple[List[ClickHouseColumn], List[ClickHouseColumn]]:
+        conn = self.connections.get_if_exists()
+        try:
+            return conn.handle.columns_in_query_and_relation(
+                target_sql, str(existing), settings=dict(query_settings or {})
+            )
+        except DbtDatabaseError as ex:
+            # Fall back to separate lookups, a genuine error in the model query will surface again
+            logger.debug(f'Unable to read the schemas of {existing} and its query together: {ex}')
+        # Expand the existing columns like the combined query does, without MATERIALIZED and
+        # ALIAS columns, which the model query can't insert into anyway
+        source = self.get_column_schema_from_query(f'SELECT * FROM {existing}')
+        target = self.get_column_schema_from_query(target_sql, query_settings=query_settings)
+        return source, target
+
     @available.parse_none
     def s3source_clause(
         self,
@@ -293,6 +333,8 @@ class ClickHouseAdapter(SQLAdapter):
         role_arn: str,
         compression: str = '',
         external_id: str = '',
+        cluster: Union[bool, str, None] = None,
+        schema_cache: Optional[bool] = None,
     ) -> str:
         s3config = {**self.config.vars.vars.get(config_name, {}), **s3_model_config}
 
@@ -311,12 +353,13 @@ class ClickHouseAdapter(SQLAdapter):
 
         bucket = bucket or s3config.get('bucket', '')
         path = path or s3config.get('path', '')
-        url = bucket.replace('https://', '')
+        scheme = 'http://' if bucket.startswith('http://') else 'https://'
+        url = bucket.replace(scheme, '')
         if path:
             if bucket and path and not bucket.endswith('/') and not bucket.startswith('/'):
                 path = f'/{path}'
             url = f'{url}{path}'.replace('//', '/')
-        url = f'https://{url}'
+        url = f'{scheme}{url}'
         aws_access_key_id = aws_access_key_id or s3config.get('aws_access_key_id', '')
         aws_secret_access_key = aws_secret_access_key or s3config.get('aws_secret_access_key', '')
         access = ''
@@ -328,10 +371,6 @@ class ClickHouseAdapter(SQLAdapter):
             access = f", '{aws_access_key_id}', '{aws_secret_access_key}'"
 
         comp = compression or s3config.get('compression', '')
-        if comp:
-            if not struct:
-                struct = ", ''"
-            comp = f", '{comp}'"
 
         extra_credentials = ''
         role_arn = role_arn or s3config.get('role_arn', '')
@@ -342,14 +381,192 @@ class ClickHouseAdapter(SQLAdapter):
             ext_id = f", external_id='{external_id}'" if external_id else ''
             extra_credentials = f", extra_credentials(role_arn='{role_arn}'{ext_id})"
 
+        if schema_cache is None:
+            schema_cache = s3config.get('schema_cache', False)
+        if not struct and schema_cache:
+            cache_key = schema_cache_key(url, fmt, comp)
+            cache = S3SchemaCache(os.path.join(self.config.project_root, self.config.target_path))
+            cached = cache.get(cache_key)
+            if cached is None:
+                comp_arg = f", '{comp}'" if comp else ''
+                cached = self._infer_s3_structure(
+                    f"s3('{url}'{access}, '{fmt}', 'auto'{comp_arg}{extra_credentials})"
+                )
+                logger.debug(f'Cached the inferred structure of S3 source {url}')
+                cache.put(cache_key, cached)
+            struct = f", '{escape_str(cached)}'"
+
+        if comp:
+            if not struct:
+                struct = ", ''"
+            comp = f", '{comp}'"
+
+        # s3Cluster is opt-in, it changes which nodes (and credentials) read the files
+        if cluster is None:
+            cluster = s3config.get('cluster', False)
+        if cluster is True:
+            conn = self.connections.get_if_exists()
+            cluster = conn.credentials.cluster if conn else ''
+        if cluster:
+            return (
+                f"s3Cluster('{escape_str(cluster)}', '{url}'{access}, '{fmt}'{struct}{comp}"
+                f"{extra_credentials})"
+            )
         return f"s3('{url}'{access}, '{fmt}'{struct}{comp}{extra_credentials})"
 
+    def _infer_s3_structure(self, s3_function: str) -> str:
+        conn = self.connections.get_if_exists()
+        rows = conn.handle.query(f'DESCRIBE TABLE {s3_function}').result_set
+        return ', '.join(f'{quote_identifier(row[0])} {row[1]}' for row in rows)
+
+    @available
+    def get_grant_statements(
+        self,
+        targets: List[Tuple[ClickHouseRelation, str]],
+        grant_config: Dict[str, List[str]],
+        should_revoke: bool = True,
+    ) -> List[str]:
+        """The combined GRANT/REVOKE statements bringing the grants of the relations (each with
+        its ON CLUSTER clause) to `grant_config`, diffed against the grants cached for this
+        invocation."""
+        conn = self.connections.get_if_exists()
+        return grant_changes(self.grants_cache, conn.handle, targets, grant_config, should_revoke)
+
+    @available
+    def get_upstream_state(self, relations: List[ClickHouseRelation]) -> Optional[str]:
+        """Parts based state of the data of upstream relations, see `upstream_state`. None if it
+        is unknown for any of them."""
+        conn = self.connections.get_if_exists()
+        return upstream_state(conn.handle, relations, conn.credentials.cluster or '')
+
+    @available
+    def get_model_fingerprint(
+        self, sql: str, config: Dict[str, Any], relations: List[ClickHouseRelation]
+    ) -> Optional[str]:
+        """Fingerprint of the compiled SQL, config and upstream state of a model, None if the
+        upstream state is unknown."""
+        upstream = self.get_upstream_state(relations)
+        return None if upstream is None else fingerprint(sql, config, upstream)
+
+    @available
+    def can_parallel_distributed_insert(
+        self, relations: List[ClickHouseRelation], sharding_key: Optional[str]
+    ) -> bool:
+        """Whether a distributed_table model reading from `relations` can insert on each shard,
+        see `parallel_insert_source`."""
+        conn = self.connections.get_if_exists()
+        source = parallel_insert_source(
+            conn.handle, relations, conn.credentials.cluster or '', sharding_key
+        )
+        return source is not None
+
+    @available
+    def get_model_state(self, relation: ClickHouseRelation, key: str) -> Optional[str]:
+        return self._model_state_store(relation).get(relation.identifier, key)
+
+    @available
+    def set_model_state(self, relation: ClickHouseRelation, key: str, value: str) -> None:
+        self._model_state_store(relation).put(relation.identifier, key, value)
+
+    def _model_state_store(self, relation: ClickHouseRelation) -> ModelStateStore:
+        conn = self.connections.get_if_exists()
+        return ModelStateStore(conn.handle, relation.schema, self._bookkeeping_cluster())
+
+    def _bookkeeping_cluster(self) -> str:
+        """The cluster the tables dbt keeps its own bookkeeping in are created on, see
+        `bookkeeping_engine`."""
+        conn = self.connections.get_if_exists()
+        # DDL of a Replicated database is already run on every replica, without ON CLUSTER
+        if conn.credentials.database_engine == 'Replicated':
+            return ''
+        return conn.credentials.cluster or ''
+
+    @available
+    def s3_export_settings(
+        self,
+        config_name: str,
+        s3_model_config: dict,
+        mode: str = 'truncate',
+        row_group_size: Optional[int] = None,
+        parallel: bool = False,
+        query_settings: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """The SETTINGS clause of an s3_export model, including its query_settings"""
+        s3config = {**self.config.vars.vars.get(config_name, {}), **s3_model_config}
+        settings = export_settings(s3config.get('fmt', ''), mode, row_group_size, parallel)
+        return self._build_settings_str({**settings, **(query_settings or {})})
+
+    @available
+    def plan_partition_carry_over(
+        self, existing: ClickHouseRelation, relation: ClickHouseRelation, predicate: str
+    ) -> Optional[List[str]]:
+        """The partitions of `existing` not selected by `predicate`, to attach to its rebuilt
+        `relation` (see `PartitionCarryOver`). None if the parts can't be attached, then the
+        table is rebuilt completely."""
+        conn = self.connections.get_if_exists()
+        carry_over = PartitionCarryOver(conn.handle, existing, relation)
+        on_cluster = bool(conn.credentials.cluster) and relation.should_on_cluster
+        return carry_over.plan(predicate) if carry_over.compatible(on_cluster) else None
+
+    @available
+    def carry_over_partitions(
+        self, existing: ClickHouseRelation, relation: ClickHouseRelation, partitions: List[str]
+    ) -> None:
+        conn = self.connections.get_if_exists()
+        PartitionCarryOver(conn.handle, existing, relation).attach(partitions)
+
+    @available
+    def s3_pending_files(
+        self,
+        relation: ClickHouseRelation,
+        listing: str,
+        files_per_chunk: Optional[int] = None,
+        reset: bool = False,
+        all_files: bool = False,
+        path_column: Optional[str] = None,
+    ) -> List[List[S3File]]:
+        """The S3 files an s3_ingest model has not ingested yet, in chunks, see `S3FileTracker`.
+        `reset` discards the recorded files, `all_files` lists every file without discarding
+        them. Changed files are only listed with the `path_column` of the relation, whose rows
+        of those files are deleted."""
+        tracker = S3FileTracker(
+            self.connections.get_if_exists().handle, relation, self._bookkeeping_cluster()
+        )
+        tracker.ensure(reset)
+        return tracker.pending(listing, files_per_chunk, all_files, path_column)
+
+    @available
+    def s3_record_files(
+        self, relation: ClickHouseRelation, files: List[S3File], replace: bool = False
+    ) -> None:
+        """Record S3 files as ingested into the relation, replacing the recorded ones with
+        `replace`."""
+        tracker = S3FileTracker(
+            self.connections.get_if_exists().handle, relation, self._bookkeeping_cluster()
+        )
+        tracker.record(files, replace)
+
+    @available
+    def s3_path_filter(
+        self,
+        paths: Optional[List[str]] = None,
+        files: Optional[List[str]] = None,
+        partitions: Optional[Dict[str, Union[str, List[str]]]] = None,
+        like: str = '',
+    ) -> str:
+        """
+        Condition on the `_path`/`_file` virtual columns of an S3 source, so ClickHouse
+        only reads the matching files.
+        """
+        return s3_path_filter(paths, files, partitions, like)
+
     def check_schema_exists(self, database, schema):
         results = self.execute_macro(LIST_SCHEMAS_MACRO_NAME, kwargs={'database': database})
         return schema in (row[0] for row in results)
 
     def drop_schema(self, relation: BaseRelation) -> None:
         super().drop_schema(relation)
+        schema_dropped(relation.schema)
         conn = self.connections.get_if_exists()
         if conn:
             conn.handle.database_dropped(relation.schema)
@@ -416,6 +633,168 @@ class ClickHouseAdapter(SQLAdapter):
     def get_relation(self, database: Optional[str], schema: str, identifier: str):
         return super().get_relation('', schema, identifier)
 
+    @available
+    def cache_exchanged(
+        self, relation_a: ClickHouseRelation, relation_b: ClickHouseRelation
+    ) -> str:
+        """Swap two relations in the cache after `EXCHANGE TABLES`, so later lookups in
+        this run don't have to list the schema again."""
+        self.cache.exchange(relation_a, relation_b)
+        return ''
+
+    @available
+    def cache_replaced(self, relation: ClickHouseRelation) -> str:
+        """Cache a relation created with `CREATE OR REPLACE`, overwriting a stale entry."""
+        self.cache.replace(relation)
+        return ''
+
+    @available
+    def cache_mv_created(
+        self, mv_relation: ClickHouseRelation, target_relation: ClickHouseRelation, sql: str
+    ) -> str:
+        """Cache a new materialized view and add it to the `mvs_pointing_to_it` of its target."""
+        self.cache.add_mv(mv_relation, target_relation, sql)
+        return ''
+
+    @available
+    def cache_mv_query_modified(self, mv_relation: ClickHouseRelation, sql: str) -> str:
+        """Record the query of a materialized view changed by `MODIFY QUERY`."""
+        self.cache.update_mv_query(mv_relation, sql)
+        return ''
+
+    @available
+    def get_cached_mv_target(self, mv_relation: ClickHouseRelation) -> Optional[str]:
+        """The `schema.identifier` of the cached target table of a materialized view, or None
+        if the schema of the target hasn't been cached."""
+        target = self.cache.mv_target(mv_relation)
+        return f'{target.schema}.{target.identifier}' if target else None
+
+    @available
+    def run_mv_catchup(
+        self,
+        relation: ClickHouseRelation,
+        views: Dict[str, str],
+        catchup: Dict[str, Any],
+        query_settings: Optional[Dict[str, Any]] = None,
+        resume: bool = False,
+    ) -> int:
+        """Backfill the target of materialized views in chunks, see `MvCatchup`. Concurrent
+        inserts use their own connections, opened with the credentials of this one."""
+        conn = self.connections.get_if_exists()
+        catchup_run = MvCatchup(
+            conn.handle,
+            lambda: get_db_client(conn.credentials),
+            relation,
+            views,
+            CatchupConfig.from_config(catchup),
+            query_settings,
+            self._bookkeeping_cluster(),
+        )
+        return catchup_run.run(resume)
+
+    @available
+    def wait_for_server_time(self, timestamp: int, timeout: Optional[float] = None) -> None:
+        """Wait until the clock of the server passes a unix timestamp. Points in time compared
+        with the rows, e.g. the handoff point of a materialized view full refresh, come from the
+        server clock, so it is polled rather than the local one."""
+        conn = self.connections.get_if_exists()
+        query = f'SELECT now() >= toDateTime({int(timestamp)})'
+        poll_with_backoff(
+            lambda: True if conn.handle.query(query).result_set[0][0] else None,
+            f'the server time to pass {int(timestamp)}',
+            timeout,
+        )
+
+    @available
+    def refresh_mvs(
+        self,
+        mv_relations: List[ClickHouseRelation],
+        trigger: bool = True,
+        timeout: Optional[float] = None,
+    ) -> AdapterResponse:
+        """Run `SYSTEM REFRESH VIEW` on refreshable materialized views and wait for the refreshes
+        to finish, see `ViewRefresher`. With `trigger=False` only a running refresh is waited
+        for. The response reports the status, duration and written rows of each refresh."""
+        conn = self.connections.get_if_exists()
+        refresher = ViewRefresher(
+            conn.handle, self.is_at_or_after_version(WAIT_VIEW_VERSION), timeout
+        )
+        results = [refresher.refresh(relation, trigger) for relation in mv_relations]
+        message = ', '.join(
+            f'{result.view} {result.status} in {result.duration:.1f}s ({result.written_rows} rows)'
+            for result in results
+        )
+        return AdapterResponse(
+            _message=f'REFRESH {message}',
+            code='REFRESH',
+            rows_affected=sum(result.written_rows for result in results),
+        )
+
+    @available
+    def dictionary_status(self, relation: ClickHouseRelation) -> str:
+        """The load status of a dictionary in system.dictionaries, e.g. LOADED or NOT_LOADED"""
+        conn = self.connections.get_if_exists()
+        return str(dictionary_status(conn.handle, relation)[0])
+
+    @available
+    def dictionary_load_stats(
+        self, relation: ClickHouseRelation, timeout: Optional[float] = None
+    ) -> AdapterResponse:
+        """Wait for a dictionary to be loaded and report its size and loading time, so
+        dictionaries growing out of memory show up in the run results."""
+        conn = self.connections.get_if_exists()
+        stats = wait_for_dictionary(conn.handle, relation, timeout)
+        logger.info(f'Dictionary {relation} {stats}')
+        return DictionaryLoadResponse.from_stats(stats)
+
+    @available
+    def advise_dictionary_layout(
+        self,
+        source_sql: str,
+        fields: List[Tuple[str, str]],
+        primary_key: str,
+        connection_overrides: Optional[Dict[str, Any]] = None,
+        ranged: bool = False,
+    ) -> str:
+        """Pick a dictionary layout for `layout: auto` by profiling the source's row count, key
+        cardinality, key range and value sizes in a single query. The source is read with the
+        user, password and database the dictionary reads it with, see `clickhouse_source`.
+        `ranged` dictionaries, i.e. with a `range` config, get a range hashed layout."""
+        keys, simple_key = dictionary_keys(fields, primary_key)
+        attributes = [name for name, _ in fields if name not in keys]
+        query = profile_query(source_sql, keys, attributes, simple_key)
+        conn = self.connections.get_if_exists()
+        # The database of ClickHouse credentials is their schema
+        credential_fields = {'user': 'user', 'password': 'password', 'database': 'schema'}
+        overrides = {
+            credential_fields[key]: value
+            for key, value in (connection_overrides or {}).items()
+            if key in credential_fields and value
+        }
+        if overrides:
+            client = get_db_client(replace(conn.credentials, **overrides))
+            try:
+                row = client.query(query).result_set[0]
+            finally:
+                client.close()
+        else:
+            row = conn.handle.query(query).result_set[0]
+        rows, unique_keys, min_key, max_key, key_bytes, value_bytes = row
+        profile = SourceProfile(
+            int(rows),
+            int(unique_keys),
+            None if min_key is None else int(min_key),
+            None if max_key is None else int(max_key),
+            float(key_bytes or 0),
+            float(value_bytes or 0),
+        )
+        advice = advise_layout(simple_key, len(attributes), profile, ranged)
+        logger.info(
+            f'Dictionary layout auto: {advice.layout} for {profile.rows} rows and '
+            f'{profile.unique_keys} keys, expected memory {advice.estimated_bytes / 1048576:.1f} MiB'
+        )
+        return advice.layout
+
     @available.parse_none
     def get_ch_database(self, schema: str):
         try:
@@ -580,8 +959,9 @@ class ClickHouseAdapter(SQLAdapter):
         return filtered_settings
 
     @available
-    def get_model_query_settings(self, model):
-        settings = model['config'].get('query_settings', {})
+    def get_model_query_settings(self, model, defaults: Optional[Dict[str, Any]] = None):
+        """The SETTINGS clause of the model's `query_settings`, on top of `defaults`"""
+        settings = {**(defaults or {}), **model['config'].get('query_settings', {})}
         settings_str = self._build_settings_str(settings)
         return (
             ''
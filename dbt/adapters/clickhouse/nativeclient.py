@@ -1,10 +1,10 @@
 from importlib.metadata import PackageNotFoundError, version
-from typing import List
+from typing import List, Tuple
 
 import clickhouse_driver
 from clickhouse_driver.errors import NetworkError, SocketTimeoutError
 from dbt.adapters.__about__ import version as dbt_adapters_version
-from dbt.adapters.clickhouse import ClickHouseColumn, ClickHouseCredentials
+from dbt.adapters.clickhouse import ClickHouseCredentials
 from dbt.adapters.clickhouse.__version__ import version as dbt_clickhouse_version
 from dbt.adapters.clickhouse.dbclient import ChClientWrapper, ChRetryableException
 from dbt.adapters.clickhouse.logger import logger
@@ -20,6 +20,7 @@ except PackageNotFoundError:
 class ChNativeClient(ChClientWrapper):
     def query(self, sql, **kwargs):
         try:
+            self._apply_statement_settings(sql, kwargs)
             return NativeClientResult(self._client.execute(sql, with_column_types=True, **kwargs))
         except clickhouse_driver.errors.Error as ex:
             err_msg = hide_stack_trace(ex)
@@ -27,6 +28,7 @@ class ChNativeClient(ChClientWrapper):
 
     def command(self, sql, **kwargs):
         try:
+            self._apply_statement_settings(sql, kwargs)
             result = self._client.execute(sql, **kwargs)
             if len(result) and len(result[0]):
                 return result[0][0]
@@ -34,14 +36,10 @@ class ChNativeClient(ChClientWrapper):
             err_msg = hide_stack_trace(ex)
             raise DbtDatabaseError(err_msg) from ex
 
-    def columns_in_query(self, sql: str, **kwargs) -> List[ClickHouseColumn]:
+    def _column_types(self, sql: str, **kwargs) -> List[Tuple[str, str]]:
         try:
-            _, columns = self._client.execute(
-                f"SELECT * FROM ( \n{sql} \n) LIMIT 0",
-                with_column_types=True,
-                **kwargs,
-            )
-            return [ClickHouseColumn.create(column[0], column[1]) for column in columns]
+            _, columns = self._client.execute(sql, with_column_types=True, **kwargs)
+            return [(column[0], column[1]) for column in columns]
         except clickhouse_driver.errors.Error as ex:
             err_msg = hide_stack_trace(ex)
             raise DbtDatabaseError(err_msg) from ex
@@ -0,0 +1,146 @@
+from typing import List, Optional
+
+from dbt.adapters.clickhouse.dbclient import ChClientWrapper
+from dbt.adapters.clickhouse.distributed import split_args
+from dbt.adapters.clickhouse.logger import logger
+from dbt.adapters.clickhouse.query import escape_str
+from dbt.adapters.clickhouse.relation import ClickHouseRelation
+from dbt_common.exceptions import DbtDatabaseError, DbtRuntimeError
+
+
+def engine_arguments(engine_full: str) -> List[str]:
+    """
+    The arguments of the engine of a `system.tables.engine_full`, e.g. the version column of
+    `ReplacingMergeTree(ver)`, without the ZooKeeper path and replica name of replicated engines,
+    which differ between tables
+    """
+    name, paren, rest = engine_full.partition('(')
+    if not paren or ' ' in name:
+        return []
+    depth, end = 1, -1
+    for position, char in enumerate(rest):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+            if depth == 0:
+                end = position
+                break
+    args = [arg for arg in split_args(rest[:end]) if arg] if end >= 0 else []
+    if name.startswith('Replicated') and args and args[0].startswith("'"):
+        args = args[2:]
+    return args
+
+
+class PartitionCarryOver:
+    """
+    Rebuild of a partitioned table that only rebuilds the partitions selected by a predicate
+    (the `rebuild_predicate` config) and carries the other partitions of the existing table
+    over into the new one with `ATTACH PARTITION ... FROM`, which hardlinks the parts instead of
+    copying them.
+
+    The predicate has to select whole partitions, e.g. a condition on the partition column, so
+    a partition is either rebuilt completely or carried over unchanged.
+    """
+
+    def __init__(
+        self, handle: ChClientWrapper, source: ClickHouseRelation, target: ClickHouseRelation
+    ):
+        self.handle = handle
+        self.source = source
+        self.target = target
+
+    def _table_filter(self, relation: ClickHouseRelation, name_column: str = 'name') -> str:
+        return (
+            f"database = '{escape_str(relation.schema)}' "
+            f"AND {name_column} = '{escape_str(relation.identifier)}'"
+        )
+
+    def _definition(self, relation: ClickHouseRelation) -> Optional[tuple]:
+        table_filter = self._table_filter(relation, 'table')
+        rows = self.handle.query(
+            'SELECT engine, partition_key, sorting_key, primary_key, storage_policy, '
+            '(SELECT groupArray((name, type)) FROM (SELECT name, type FROM system.columns '
+            f'WHERE {table_filter} ORDER BY position)), '
+            '(SELECT groupArray((name, type_full, expr, granularity)) FROM (SELECT name, '
+            'type_full, expr, granularity FROM system.data_skipping_indices '
+            f'WHERE {table_filter} ORDER BY name)), '
+            '(SELECT groupArray((name, query)) FROM (SELECT name, query FROM system.projections '
+            f'WHERE {table_filter} ORDER BY name)), '
+            'engine_full '
+            f'FROM system.tables WHERE {self._table_filter(relation)}'
+        ).result_set
+        if not rows:
+            return None
+        *definition, engine_full = rows[0]
+        return (*definition, engine_arguments(str(engine_full)))
+
+    def compatible(self, on_cluster: bool = False) -> bool:
+        """
+        Whether parts of the source can be attached to the target: both are partitioned tables
+        of the same MergeTree engine and engine arguments with the same structure, keys,
+        data skipping indices, projections and storage policy. Tables created on a cluster also
+        have to be replicated, so attaching on one replica is enough.
+        """
+        try:
+            source, target = self._definition(self.source), self._definition(self.target)
+        except DbtDatabaseError as ex:
+            # e.g. a server without system.projections
+            logger.debug(f'The definitions of {self.source} and {self.target} are unknown: {ex}')
+            return False
+        if source is None or target is None or source != target:
+            logger.debug(f'The partitions of {self.source} can not be attached to {self.target}')
+            return False
+        engine, partition_key = str(source[0]), source[1]
+        if not engine.endswith('MergeTree') or not partition_key:
+            logger.debug(f'{self.source} is not a partitioned MergeTree table')
+            return False
+        if on_cluster and not engine.startswith('Replicated'):
+            logger.debug(f'{self.source} is created on a cluster without being replicated')
+            return False
+        return True
+
+    def plan(self, predicate: str) -> List[str]:
+        """The ids of the partitions of the source without any row matching the predicate"""
+        partial = self.handle.query(
+            f'SELECT _partition_id FROM {self.source} '
+            f'WHERE _partition_id IN (SELECT DISTINCT _partition_id FROM {self.source} '
+            f'WHERE {predicate}) '
+            f'GROUP BY _partition_id HAVING countIf({predicate}) < count() LIMIT 5'
+        ).result_set
+        if partial:
+            raise DbtRuntimeError(
+                f'rebuild_predicate {predicate} must select whole partitions of {self.source}, '
+                f'it only selects some rows of partitions {", ".join(row[0] for row in partial)}'
+            )
+        rows = self.handle.query(
+            'SELECT DISTINCT partition_id FROM system.parts '
+            f'WHERE active AND {self._table_filter(self.source, "table")} '
+            f'AND partition_id NOT IN (SELECT DISTINCT _partition_id FROM {self.source} '
+            f'WHERE {predicate}) ORDER BY partition_id'
+        ).result_set
+        return [row[0] for row in rows]
+
+    def attach(self, partitions: List[str]) -> None:
+        """Attach the planned partitions of the source to the target, once the rows selected by
+        the predicate have been inserted into the target"""
+        if not partitions:
+            return
+        ids = ', '.join(f"'{escape_str(partition)}'" for partition in partitions)
+        rebuilt = self.handle.query(
+            'SELECT DISTINCT partition_id FROM system.parts '
+            f'WHERE active AND {self._table_filter(self.target, "table")} '
+            f'AND partition_id IN ({ids})'
+        ).result_set
+        if rebuilt:
+            raise DbtRuntimeError(
+                f'rebuild_predicate must select whole partitions, new rows of {self.target} match '
+                f'it in partitions {", ".join(row[0] for row in rebuilt)} whose existing rows '
+                "don't"
+            )
+        for partition in partitions:
+            self.handle.command(
+                f"ALTER TABLE {self.target} ATTACH PARTITION ID '{escape_str(partition)}' "
+                f'FROM {self.source}'
+            )
+        logger.debug(f'Attached {len(partitions)} partitions of {self.source} to {self.target}')
@@ -0,0 +1,97 @@
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional, Sequence
+
+from dbt.adapters.clickhouse.dbclient import ChClientWrapper
+from dbt.adapters.clickhouse.logger import logger
+from dbt.adapters.clickhouse.query import escape_str
+from dbt.adapters.clickhouse.relation import ClickHouseRelation
+from dbt.adapters.clickhouse.util import poll_with_backoff
+from dbt_common.exceptions import DbtRuntimeError
+
+# First server version with SYSTEM WAIT VIEW
+WAIT_VIEW_VERSION = '24.10'
+
+
+@dataclass
+class RefreshResult:
+    view: str
+    status: str
+    duration: float
+    written_rows: int
+
+
+class ViewRefresher:
+    """
+    Trigger and wait for the refresh of a refreshable materialized view.
+
+    `SYSTEM WAIT VIEW` blocks on the server until the running refresh completes and fails if it
+    failed. Servers without it, and waits bounded by a timeout, which `SYSTEM WAIT VIEW` doesn't
+    honour, poll system.view_refreshes with exponential backoff instead until the refresh is seen
+    running and stopping, its last refresh or success time moves past the one seen before the
+    refresh was triggered, or it reports a new exception.
+    """
+
+    def __init__(
+        self,
+        handle: ChClientWrapper,
+        server_wait: bool,
+        timeout: Optional[float] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.handle = handle
+        self.server_wait = server_wait
+        self.timeout = timeout
+        self.sleep = sleep
+
+    def refresh(self, relation: ClickHouseRelation, trigger: bool = True) -> RefreshResult:
+        start = time.monotonic()
+        previous = self._state(relation)
+        if trigger:
+            self.handle.command(f'SYSTEM REFRESH VIEW {relation}')
+        if self.server_wait and not self.timeout:
+            self.handle.command(f'SYSTEM WAIT VIEW {relation}')
+            state = self._state(relation)
+        else:
+            state = self._poll(relation, previous if trigger else None)
+        status, _, _, exception, written_rows = state
+        if exception:
+            raise DbtRuntimeError(f'Refresh of materialized view {relation} failed: {exception}')
+        result = RefreshResult(str(relation), status, time.monotonic() - start, int(written_rows))
+        logger.debug(f'Refreshed {result.view} in {result.duration:.1f}s ({status})')
+        return result
+
+    def _state(self, relation: ClickHouseRelation):
+        rows = self.handle.query(
+            'SELECT status, toString(last_refresh_time), toString(last_success_time), exception, '
+            'written_rows FROM system.view_refreshes '
+            f"WHERE database = '{escape_str(relation.schema)}' "
+            f"AND view = '{escape_str(relation.identifier)}'"
+        ).result_set
+        if not rows:
+            raise DbtRuntimeError(f'{relation} is not a refreshable materialized view')
+        return rows[0]
+
+    def _poll(self, relation: ClickHouseRelation, previous: Optional[Sequence]):
+        previous_refresh, previous_success, previous_exception = (
+            previous[1:4] if previous else (None, None, None)
+        )
+        started = False
+
+        def finished_state():
+            nonlocal started
+            state = self._state(relation)
+            status, last_refresh, last_success, exception = state[:4]
+            if status == 'Running':
+                started = True
+                return None
+            # Older servers don't move last_refresh_time when a refresh fails, only its exception
+            if exception and exception != previous_exception:
+                return state
+            if started or (last_refresh, last_success) != (previous_refresh, previous_success):
+                return state
+            return None
+
+        return poll_with_backoff(
+            finished_state, f'the refresh of {relation}', self.timeout, self.sleep
+        )
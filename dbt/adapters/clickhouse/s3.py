@@ -0,0 +1,226 @@
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+from dbt.adapters.clickhouse.dbclient import ChClientWrapper
+from dbt.adapters.clickhouse.logger import logger
+from dbt.adapters.clickhouse.query import escape_str
+from dbt.adapters.clickhouse.relation import ClickHouseRelation
+from dbt.adapters.clickhouse.util import bookkeeping_engine, cluster_clause
+from dbt_common.exceptions import DbtRuntimeError
+
+# File in the dbt target directory holding the inferred schema of each S3 url/pattern
+SCHEMA_CACHE_FILE = 'clickhouse_s3_schemas.json'
+
+_cache_lock = threading.Lock()
+
+# What an export does with files that already exist at the target path
+EXPORT_MODES: Dict[str, Dict[str, Any]] = {
+    'truncate': {'s3_truncate_on_insert': 1},
+    'new_file': {'s3_create_new_file_on_insert': 1},
+    'fail': {},
+}
+# Suffix of the table recording the files an s3_ingest model has ingested
+TRACKER_SUFFIX = '__dbt_s3_files'
+
+# Format settings for the number of rows in a row group of an exported file
+ROW_GROUP_SETTINGS = {'parquet': 'output_format_parquet_row_group_size'}
+
+
+def schema_cache_key(url: str, fmt: str, compression: str = '') -> str:
+    return '|'.join((url, fmt, compression))
+
+
+class S3SchemaCache:
+    """
+    Inferred structures of S3 sources, kept in a JSON file in the dbt target directory.
+
+    Without a structure ClickHouse samples the source files to infer the schema on every query
+    reading them. Caching the result of the inference once per url/pattern lets later reads pass
+    an explicit structure instead. `dbt clean` (or deleting the file) discards stale entries.
+    """
+
+    def __init__(self, target_path: str):
+        self.path = os.path.join(target_path, SCHEMA_CACHE_FILE)
+
+    def _load(self) -> Dict[str, str]:
+        try:
+            with open(self.path, encoding='utf-8') as cache_file:
+                return json.load(cache_file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as ex:
+            logger.warning(f'Ignoring unreadable S3 schema cache {self.path}: {ex}')
+            return {}
+
+    def get(self, key: str) -> Optional[str]:
+        with _cache_lock:
+            return self._load().get(key)
+
+    def put(self, key: str, structure: str) -> None:
+        with _cache_lock:
+            schemas = self._load()
+            schemas[key] = structure
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f'{self.path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as cache_file:
+                json.dump(schemas, cache_file, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+
+def _in_list(column: str, values: Iterable[str]) -> str:
+    literals = [f"'{escape_str(value)}'" for value in values]
+    return f"{column} IN ({', '.join(literals)})" if literals else 'false'
+
+
+def s3_path_filter(
+    paths: Optional[Iterable[str]] = None,
+    files: Optional[Iterable[str]] = None,
+    partitions: Optional[Mapping[str, Union[str, Iterable[str]]]] = None,
+    like: str = '',
+) -> str:
+    """
+    A condition on the `_path` and `_file` virtual columns of an S3 source. ClickHouse evaluates
+    these conditions before opening any file, so only matching files are read. `partitions`
+    matches hive style `key=value` path segments, a list of values matching any of them.
+    """
+    conditions = []
+    if paths is not None:
+        conditions.append(_in_list('_path', paths))
+    if files is not None:
+        conditions.append(_in_list('_file', files))
+    for key, values in (partitions or {}).items():
+        if isinstance(values, str):
+            values = [values]
+        matches = [f"_path LIKE '%/{escape_str(f'{key}={value}')}/%'" for value in values]
+        conditions.append(matches[0] if len(matches) == 1 else f"({' OR '.join(matches)})")
+    if like:
+        conditions.append(f"_path LIKE '{escape_str(like)}'")
+    return ' AND '.join(conditions) or 'true'
+
+
+def export_settings(
+    fmt: str, mode: str = 'truncate', row_group_size: Optional[int] = None, parallel: bool = False
+) -> Dict[str, Any]:
+    """
+    Settings of an `INSERT INTO FUNCTION s3(...)` export. With `parallel` every node executing a
+    distributed source (a Distributed table or `s3Cluster`) writes its share of the rows itself
+    instead of streaming all of them through the initiator.
+    """
+    if mode not in EXPORT_MODES:
+        raise DbtRuntimeError(
+            f'Invalid export_mode {mode}, expected one of: {", ".join(EXPORT_MODES)}'
+        )
+    settings = dict(EXPORT_MODES[mode])
+    if row_group_size:
+        setting = ROW_GROUP_SETTINGS.get(fmt.lower())
+        if not setting:
+            raise DbtRuntimeError(f'row_group_size is not supported for the {fmt} format')
+        settings[setting] = int(row_group_size)
+    if parallel:
+        settings['parallel_distributed_insert_select'] = 2
+    return settings
+
+
+# An S3 object as listed by s3(..., 'One'): its _path, _size and last modification time as a
+# unix timestamp
+S3File = Tuple[str, int, int]
+
+
+class S3FileTracker:
+    """
+    The bookkeeping of an s3_ingest model: the files (path, size and modification time) already
+    ingested into its target, kept in a `<target>__dbt_s3_files` table.
+
+    Files are listed with the `One` format, which reads a single row per file without opening
+    it, and compared to the ingested ones on the server. Modification times are compared as unix
+    timestamps, so they don't depend on the time zone of the client or the server.
+
+    Appending a file whose size or modification time changed since it was ingested would
+    duplicate its rows, so changed files are only ingested again when the target keeps the
+    `_path` of its rows in a `path_column`: their existing rows are deleted first. Otherwise
+    only new paths are ingested and changed files are skipped with a warning.
+
+    With a cluster, the table is created on every node with a replicated engine, so every
+    replica sees the same ingested files.
+    """
+
+    def __init__(self, handle: ChClientWrapper, target: ClickHouseRelation, cluster: str = ''):
+        self.handle = handle
+        self.target = target
+        self.cluster = cluster
+        self.tracker = target.incorporate(
+            path={'identifier': f'{target.identifier}{TRACKER_SUFFIX}'}
+        )
+
+    def ensure(self, reset: bool = False) -> None:
+        on_cluster = cluster_clause(self.cluster)
+        if reset:
+            sync = 'SYNC' if self.cluster else ''
+            self.handle.command(f'DROP TABLE IF EXISTS {self.tracker} {on_cluster}{sync}'.strip())
+        self.handle.command(
+            f'CREATE TABLE IF NOT EXISTS {self.tracker} {on_cluster}'
+            '(path String, size UInt64, modified DateTime, ingested_at DateTime DEFAULT now()) '
+            f'ENGINE = {bookkeeping_engine("MergeTree", self.cluster)} ORDER BY path'
+        )
+
+    def pending(
+        self,
+        listing: str,
+        files_per_chunk: Optional[int] = None,
+        all_files: bool = False,
+        path_column: Optional[str] = None,
+    ) -> List[List[S3File]]:
+        """The files not ingested yet, split into chunks of at most `files_per_chunk` files.
+        With a `path_column`, the rows of the changed files are deleted from the target."""
+        files = (
+            'SELECT _path, ifNull(_size, 0) AS size, '
+            'toUnixTimestamp(ifNull(_time, toDateTime(0))) AS modified, '
+        )
+        if all_files:
+            files += f'false AS changed FROM {listing}'
+        else:
+            files += (
+                f'_path IN (SELECT path FROM {self.tracker}) AS changed FROM {listing} '
+                'WHERE (_path, size, modified) NOT IN '
+                f'(SELECT path, size, toUnixTimestamp(modified) FROM {self.tracker})'
+            )
+        rows = self.handle.query(f'SELECT * FROM ({files}) ORDER BY _path').result_set
+        changed = [str(row[0]) for row in rows if row[3]]
+        if changed and path_column:
+            self._delete_rows(changed, path_column)
+        elif changed:
+            logger.warning(
+                f'Skipping {len(changed)} S3 files of {self.target} changed since they were '
+                f'ingested, set path_column to ingest them again: {", ".join(changed[:5])}'
+            )
+        pending = [
+            (str(path), int(size), int(modified))
+            for path, size, modified, was_ingested in rows
+            if not was_ingested or path_column
+        ]
+        if not pending:
+            return []
+        size = files_per_chunk or len(pending)
+        logger.debug(f'{len(pending)} S3 files pending for {self.tracker}')
+        return [pending[i : i + size] for i in range(0, len(pending), size)]
+
+    def _delete_rows(self, paths: List[str], path_column: str) -> None:
+        values = ', '.join(f"'{escape_str(path)}'" for path in paths)
+        self.handle.command(
+            f'ALTER TABLE {self.target} DELETE WHERE {path_column} IN ({values}) '
+            'SETTINGS mutations_sync = 2'
+        )
+        logger.debug(f'Deleted the rows of {len(paths)} changed S3 files from {self.target}')
+
+    def record(self, files: List[S3File], replace: bool = False) -> None:
+        if replace:
+            self.handle.command(f'TRUNCATE TABLE {self.tracker}')
+        if not files:
+            return
+        values = ', '.join(
+            f"('{escape_str(path)}', {int(size)}, {int(modified)})"
+            for path, size, modified in files
+        )
+        self.handle.command(f'INSERT INTO {self.tracker} (path, size, modified) VALUES {values}')
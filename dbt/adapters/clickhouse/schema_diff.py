@@ -0,0 +1,130 @@
+import re
+from enum import Enum
+from typing import List, Literal
+
+from dbt.adapters.base.column import Column
+from dbt.adapters.clickhouse.column import ClickHouseColumnChanges
+from dbt.adapters.clickhouse.column_type import ClickHouseType, parse_type
+
+_int_regex = re.compile(r'^(U?)Int(8|16|32|64|128|256)$')
+
+
+class TypeChange(Enum):
+    NONE = 'none'
+    # Only wraps the existing type in Nullable
+    NULLABLE = 'nullable'
+    # Every existing value fits the new type, e.g. Int32 to Int64
+    WIDENING = 'widening'
+    # Any other change of the type, e.g. Int64 to Int32
+    CHANGED = 'changed'
+
+
+def _normalize(ch_type: ClickHouseType) -> ClickHouseType:
+    """
+    Canonical form for comparisons: LowCardinality is dropped (it is a storage detail) and all
+    Decimal flavours are rewritten as Decimal(P, S)
+    """
+    if ch_type.is_low_cardinality and len(ch_type.type_params) == 1:
+        return _normalize(ch_type.inner)
+    precision_scale = ch_type.precision_scale
+    if precision_scale:
+        return ClickHouseType(
+            'Decimal', tuple(str(arg) for arg in precision_scale), ch_type.field_name
+        )
+    params = tuple(
+        _normalize(param) if isinstance(param, ClickHouseType) else param
+        for param in ch_type.params
+    )
+    return ClickHouseType(ch_type.name, params, ch_type.field_name)
+
+
+def _widens_scalar(source: ClickHouseType, target: ClickHouseType) -> bool:
+    source_int = _int_regex.match(source.name)
+    target_int = _int_regex.match(target.name)
+    if source_int and target_int:
+        # Only integers of the same signedness, a UInt32 to Int64 change is not applied in place
+        return source_int.group(1) == target_int.group(1) and int(target_int.group(2)) > int(
+            source_int.group(2)
+        )
+    if source.name == 'Float32' and target.name == 'Float64':
+        return True
+    if source.name == 'Decimal' and target.name == 'Decimal':
+        source_precision, source_scale = source.precision_scale or (0, 0)
+        target_precision, target_scale = target.precision_scale or (0, 0)
+        return target_scale == source_scale and target_precision > source_precision
+    return False
+
+
+def _widens(source: ClickHouseType, target: ClickHouseType) -> bool:
+    """
+    True if every value of the (normalized) source type is representable in the target type, so
+    an existing column can be converted in place with ALTER TABLE ... MODIFY COLUMN
+    """
+    if source == target:
+        return True
+    if target.is_nullable:
+        return _widens(source.inner if source.is_nullable else source, target.inner)
+    if source.is_nullable or source.field_name != target.field_name:
+        return False
+    if source.name == target.name and source.name in ('Array', 'Map', 'Tuple'):
+        source_params, target_params = source.type_params, target.type_params
+        return len(source_params) == len(target_params) and all(
+            _widens(source_param, target_param)
+            for source_param, target_param in zip(source_params, target_params, strict=True)
+        )
+    return _widens_scalar(source, target)
+
+
+def type_change(source: Column, target: Column) -> TypeChange:
+    """
+    Classify the change from an existing column to the column produced by the model query.
+    Nested types are compared structurally. As before, a top level Nullable on the existing
+    column alone is not considered a change, since inserting into it never fails.
+    """
+    source_nullable = getattr(source, 'is_nullable', False)
+    target_nullable = getattr(target, 'is_nullable', False)
+    source_type = _normalize(parse_type(source.dtype))
+    target_type = _normalize(parse_type(target.dtype))
+    if source_type == target_type:
+        return TypeChange.NULLABLE if target_nullable and not source_nullable else TypeChange.NONE
+    # Modifying the column to the target type would drop its Nullable wrapper
+    if source_nullable and not target_nullable:
+        return TypeChange.CHANGED
+    return TypeChange.WIDENING if _widens(source_type, target_type) else TypeChange.CHANGED
+
+
+def diff_columns(
+    source: List[Column],
+    target: List[Column],
+    on_schema_change: Literal['ignore', 'fail', 'append_new_columns', 'sync_all_columns'],
+) -> ClickHouseColumnChanges:
+    """
+    Compare the columns of an existing relation (source) with the columns of the model query
+    (target)
+    """
+    source_map = {column.name: column for column in source}
+    target_names = {column.name for column in target}
+
+    columns_to_modify = []
+    columns_to_widen = []
+    for column in target:
+        source_column = source_map.get(column.name)
+        if source_column is None:
+            continue
+        change = type_change(source_column, column)
+        # Inserting into the existing column never fails, so a Nullable wrapper alone doesn't
+        # fail the run
+        if change == TypeChange.NULLABLE and on_schema_change == 'fail':
+            continue
+        if change != TypeChange.NONE:
+            columns_to_modify.append(column)
+        if change in (TypeChange.NULLABLE, TypeChange.WIDENING):
+            columns_to_widen.append(column)
+
+    return ClickHouseColumnChanges(
+        on_schema_change=on_schema_change,
+        columns_to_add=[column for column in target if column.name not in source_map],
+        columns_to_drop=[column for column in source if column.name not in target_names],
+        columns_to_modify=columns_to_modify,
+        columns_to_widen=columns_to_widen,
+    )
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import threading
+from typing import Any, Dict, Optional, Sequence, Set, Tuple
+
+from dbt.adapters.clickhouse.dbclient import ChClientWrapper
+from dbt.adapters.clickhouse.logger import logger
+from dbt.adapters.clickhouse.query import escape_str
+from dbt.adapters.clickhouse.relation import ClickHouseRelation
+from dbt.adapters.clickhouse.util import bookkeeping_engine, cluster_clause
+
+# Table of each schema holding the state dbt keeps between runs of its models
+MODEL_STATE_TABLE = '__dbt_model_state'
+
+# The (cluster, schema) pairs whose model state table was created by this process
+_created_tables: Set[Tuple[str, str]] = set()
+_created_lock = threading.Lock()
+
+
+def schema_dropped(schema: str) -> None:
+    """Forget the model state tables of a dropped schema, so they are created again"""
+    with _created_lock:
+        _created_tables.difference_update([key for key in _created_tables if key[1] == schema])
+
+
+def upstream_state(
+    handle: ChClientWrapper, relations: Sequence[ClickHouseRelation], cluster: str = ''
+) -> Optional[str]:
+    """
+    The state of the data of upstream relations: active part count, row count and latest part
+    modification of each of them. Any insert, mutation or merge creates new parts and so changes
+    the state. None if the state of a relation is unknown, i.e. it doesn't exist or isn't a
+    MergeTree table (views, Distributed tables, dictionaries, ...), whose data can change without
+    its parts changing. Also None without any upstream relation: the model then reads only
+    table functions (`s3()`, `numbers()`, ...) or tables it doesn't `ref`, which aren't tracked.
+    """
+    if not relations:
+        return None
+    names = ', '.join(
+        f"('{escape_str(relation.schema)}', '{escape_str(relation.identifier)}')"
+        for relation in relations
+    )
+    parts = (
+        f"clusterAllReplicas('{escape_str(cluster)}', system.parts)" if cluster else 'system.parts'
+    )
+    rows = handle.query(
+        'SELECT t.database, t.name, t.engine, p.parts, p.rows, toString(p.modified) '
+        'FROM system.tables AS t LEFT JOIN ('
+        'SELECT database, table, count() AS parts, sum(rows) AS rows, '
+        'max(modification_time) AS modified '
+        f'FROM {parts} WHERE active AND (database, table) IN ({names}) '
+        'GROUP BY database, table'
+        ') AS p ON t.database = p.database AND t.name = p.table '
+        f'WHERE (t.database, t.name) IN ({names}) ORDER BY t.database, t.name'
+    ).result_set
+    untracked = [f'{row[0]}.{row[1]}' for row in rows if not str(row[2]).endswith('MergeTree')]
+    if len(rows) < len({(r.schema, r.identifier) for r in relations}) or untracked:
+        logger.debug(f'Unknown upstream state, untracked relations: {untracked or "missing"}')
+        return None
+    return ';'.join(
+        f'{db}.{name}:{part_count}:{row_count}:{modified}'
+        for db, name, _, part_count, row_count, modified in rows
+    )
+
+
+def fingerprint(sql: str, config: Dict[str, Any], upstream: str) -> str:
+    """Fingerprint of a model build: its compiled SQL, its config and the state of its inputs"""
+    content = json.dumps(
+        {'sql': ' '.join(sql.split()), 'config': config, 'upstream': upstream},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.md5(content.encode('utf-8')).hexdigest()
+
+
+class ModelStateStore:
+    """
+    Values dbt keeps between runs of the models of a schema (e.g. fingerprints or upstream
+    watermarks), stored in the `__dbt_model_state` table of the schema.
+
+    The table is created once per process and schema, and again after the schema is dropped.
+    With a cluster, it is created on every node with a replicated engine, so all replicas see
+    the same state.
+    """
+
+    def __init__(self, handle: ChClientWrapper, schema: str, cluster: str = ''):
+        self.handle = handle
+        self.cluster = cluster
+        self.table = ClickHouseRelation.create(schema=schema, identifier=MODEL_STATE_TABLE)
+
+    def ensure(self) -> None:
+        key = (self.cluster, self.table.schema)
+        with _created_lock:
+            if key in _created_tables:
+                return
+            engine = bookkeeping_engine('ReplacingMergeTree', self.cluster)
+            self.handle.command(
+                f'CREATE TABLE IF NOT EXISTS {self.table} {cluster_clause(self.cluster)}'
+                '(model String, key String, value String, updated_at DateTime64(3) DEFAULT now64(3)) '
+                f'ENGINE = {engine}(updated_at) ORDER BY (model, key)'
+            )
+            _created_tables.add(key)
+
+    def get(self, model: str, key: str) -> Optional[str]:
+        self.ensure()
+        rows = self.handle.query(
+            f'SELECT value FROM {self.table} FINAL '
+            f"WHERE model = '{escape_str(model)}' AND key = '{escape_str(key)}'"
+        ).result_set
+        return rows[0][0] if rows else None
+
+    def put(self, model: str, key: str, value: str) -> None:
+        self.ensure()
+        self.handle.command(
+            f'INSERT INTO {self.table} (model, key, value) '
+            f"VALUES ('{escape_str(model)}', '{escape_str(key)}', '{escape_str(value)}')"
+        )
@@ -1,7 +1,15 @@
 import os
+import time
+from typing import Callable, Optional, TypeVar
 
 from dbt_common.exceptions import DbtRuntimeError
 
+T = TypeVar('T')
+
+# First and maximum delay between two polls of poll_with_backoff
+POLL_INITIAL_SECONDS = 0.5
+POLL_MAX_SECONDS = 30.0
+
 
 def compare_versions(v1: str, v2: str) -> int:
     v1_parts = v1.split('.')
@@ -26,3 +34,38 @@ def hide_stack_trace(ex: Exception) -> str:
 
 def engine_can_atomic_exchange(engine: str) -> bool:
     return engine in ['Atomic', 'Replicated', 'Shared']
+
+
+def cluster_clause(cluster: str) -> str:
+    """ON CLUSTER clause of the DDL of a table dbt keeps its own bookkeeping in"""
+    return f'ON CLUSTER "{cluster}" ' if cluster else ''
+
+
+def bookkeeping_engine(engine: str, cluster: str) -> str:
+    """
+    Engine of a table dbt keeps its own bookkeeping in (e.g. model state or progress). On a
+    cluster it is replicated, so every replica, and every connection, sees the same rows.
+    """
+    return f'Replicated{engine}' if cluster else engine
+
+
+def poll_with_backoff(
+    check: Callable[[], Optional[T]],
+    description: str,
+    timeout: Optional[float] = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> T:
+    """
+    Call check until it returns a value other than None, sleeping between calls with an
+    exponentially growing delay. Raise if that takes longer than timeout seconds.
+    """
+    start = time.monotonic()
+    delay = POLL_INITIAL_SECONDS
+    while True:
+        result = check()
+        if result is not None:
+            return result
+        if timeout and time.monotonic() - start + delay > timeout:
+            raise DbtRuntimeError(f'Timed out after {timeout}s waiting for {description}')
+        sleep(delay)
+        delay = min(delay * 2, POLL_MAX_SECONDS)
@@ -22,7 +22,8 @@
 {% macro clickhouse__list_relations_without_caching(schema_relation) %}
   {% call statement('list_relations_without_caching', fetch_result=True) -%}
     with mv_sources as (
-      -- Find all MVs and their target tables (database and name of the MV, plus the SELECT SQL)
+      -- Find the MVs writing to this schema and their target tables (database and name of the MV,
+      -- plus the SELECT SQL). The substring search keeps the target regex off all other MVs.
       select
         name as mv_name,
         database as mv_database,
@@ -34,7 +35,7 @@
       from system.tables
       {% endif %}
       where engine = 'MaterializedView'
-        and create_table_query like '%TO %'
+        and multiSearchAny(create_table_query, [' TO {{ schema_relation.schema }}.', ' TO `{{ schema_relation.schema }}`.'])
       group by mv_name, mv_database
     )
     select
@@ -146,4 +147,5 @@
   {%- call statement('exchange_tables_atomic') -%}
     EXCHANGE {{ obj_types }} {{ old_relation }} AND {{ target_relation }} {{ on_cluster_clause(target_relation)}}
   {% endcall %}
+  {% do adapter.cache_exchanged(old_relation, target_relation) %}
 {% endmacro %}
@@ -3,6 +3,29 @@
     AND database = '{{ relation.schema }}'
 {%- endmacro %}
 
+{% macro clickhouse__apply_grants(relation, grant_config, should_revoke=True) %}
+    {% do clickhouse__apply_grants_to_relations([relation], grant_config, should_revoke) %}
+{% endmacro %}
+
+{#
+  Applies the grants of several relations of a model (e.g. a distributed table and its local
+  table) at once. They are diffed against grants read once per schema and invocation, and the
+  changes are combined into as few GRANT/REVOKE statements as possible.
+#}
+{% macro clickhouse__apply_grants_to_relations(relations, grant_config, should_revoke=True) %}
+    {% if grant_config %}
+        {% set targets = [] %}
+        {% for relation in relations %}
+            {% do targets.append((relation, on_cluster_clause(relation) | trim)) %}
+        {% endfor %}
+        {% set dcl_statement_list = adapter.get_grant_statements(targets, grant_config, should_revoke) %}
+        {% if not dcl_statement_list %}
+            {{ log('On ' ~ relations | join(', ') ~ ': All grants are in place, no revocation or granting needed.') }}
+        {% endif %}
+        {{ call_dcl_statements(dcl_statement_list) }}
+    {% endif %}
+{% endmacro %}
+
 {% macro clickhouse__call_dcl_statements(dcl_statement_list) %}
     {% for dcl_statement in dcl_statement_list %}
       {% call statement('dcl') %}
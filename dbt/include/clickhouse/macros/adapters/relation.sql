@@ -24,4 +24,21 @@
         where name = '{{ database }}'
    {% endcall %}
    {% do return(load_result('get_database').table) %}
-{% endmacro %}
\ No newline at end of file
+{% endmacro %}
+
+{#
+  The relations the current model reads from: the models, seeds, snapshots and sources it
+  depends on
+#}
+{% macro clickhouse__upstream_relations() %}
+  {%- set relations = [] -%}
+  {%- for unique_id in model.depends_on.nodes -%}
+    {%- set node = graph.nodes.get(unique_id) or graph.sources.get(unique_id) -%}
+    {%- if node -%}
+      {%- do relations.append(api.Relation.create(
+          schema=node.schema,
+          identifier=node.identifier if node.resource_type == 'source' else node.alias)) -%}
+    {%- endif -%}
+  {%- endfor -%}
+  {{ return(relations) }}
+{% endmacro %}
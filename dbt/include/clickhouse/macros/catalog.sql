@@ -1,18 +1,31 @@
 {% macro clickhouse__get_catalog(information_schema, schemas) -%}
   {%- call statement('catalog', fetch_result=True) -%}
-    {{ get_catalog_results_sql(get_catalog_schemas_where_clause_sql(schemas)) }}
+    {{ get_catalog_results_sql(
+      get_catalog_schemas_where_clause_sql(schemas),
+      get_catalog_schemas_where_clause_sql(schemas, 'parts')
+    ) }}
   {%- endcall -%}
   {{ return(load_result('catalog').table) }}
 {%- endmacro %}
 
 {% macro clickhouse__get_catalog_relations(information_schema, relations) -%}
   {%- call statement('catalog', fetch_result=True) -%}
-    {{ get_catalog_results_sql(get_catalog_relations_where_clause_sql(relations)) }}
+    {{ get_catalog_results_sql(
+      get_catalog_relations_where_clause_sql(relations),
+      get_catalog_relations_where_clause_sql(relations, 'parts')
+    ) }}
   {%- endcall -%}
   {{ return(load_result('catalog').table) }}
 {%- endmacro %}
 
-{% macro get_catalog_results_sql(where_clause) -%}
+{#-
+  Table statistics come from a single aggregated pass over system.parts, joined to the
+  column rows. parts_where_clause restricts that pass to the same schemas/relations as
+  where_clause, so the catalog still costs one round trip no matter how many tables it
+  covers. Relations without active parts (views, dictionaries, Distributed tables)
+  get the stats with include = false, so dbt docs does not show them.
+-#}
+{% macro get_catalog_results_sql(where_clause, parts_where_clause='where 1 = 1') -%}
     select
       '' as table_database,
       columns.database as table_schema,
@@ -23,32 +36,64 @@
       columns.position as column_index,
       columns.type as column_type,
       nullIf(columns.comment, '') as column_comment,
-      null as table_owner
+      null as table_owner,
+      'Row Count' as "stats:row_count:label",
+      table_stats.total_rows as "stats:row_count:value",
+      'Number of rows in the active parts of the table' as "stats:row_count:description",
+      toBool(table_stats.part_count > 0) as "stats:row_count:include",
+      'Bytes on Disk' as "stats:bytes_on_disk:label",
+      table_stats.bytes_on_disk as "stats:bytes_on_disk:value",
+      'Size of the active parts of the table on disk, in bytes' as "stats:bytes_on_disk:description",
+      toBool(table_stats.part_count > 0) as "stats:bytes_on_disk:include",
+      'Compression Ratio' as "stats:compression_ratio:label",
+      if(table_stats.compressed_bytes > 0,
+         round(table_stats.uncompressed_bytes / table_stats.compressed_bytes, 2),
+         0) as "stats:compression_ratio:value",
+      'Uncompressed data size divided by compressed data size' as "stats:compression_ratio:description",
+      toBool(table_stats.compressed_bytes > 0) as "stats:compression_ratio:include",
+      'Active Parts' as "stats:part_count:label",
+      table_stats.part_count as "stats:part_count:value",
+      'Number of active data parts of the table' as "stats:part_count:description",
+      toBool(table_stats.part_count > 0) as "stats:part_count:include"
     from system.columns as columns
     join system.tables as tables on tables.database = columns.database and tables.name = columns.table
+    left join (
+      select
+        parts.database as database,
+        parts.table as table,
+        sum(parts.rows) as total_rows,
+        sum(parts.bytes_on_disk) as bytes_on_disk,
+        sum(parts.data_compressed_bytes) as compressed_bytes,
+        sum(parts.data_uncompressed_bytes) as uncompressed_bytes,
+        count() as part_count
+      from system.parts as parts
+      {{ parts_where_clause }}
+        and parts.active
+      group by parts.database, parts.table
+    ) as table_stats on table_stats.database = columns.database and table_stats.table = columns.table
     {{ where_clause }}
     order by columns.database, columns.table, columns.position
 {%- endmacro %}
 
-{% macro get_catalog_schemas_where_clause_sql(schemas) -%}
+{% macro get_catalog_schemas_where_clause_sql(schemas, table_alias='columns') -%}
   {% if schemas | length == 0 %}
     where 1 = 0
   {% else %}
-    where columns.database != 'system'
+    where {{ table_alias }}.database != 'system'
       and (
       {%- for schema in schemas -%}
-        columns.database = '{{ schema }}'
+        {{ table_alias }}.database = '{{ schema }}'
         {%- if not loop.last %} or {% endif -%}
       {%- endfor -%}
       )
   {% endif %}
 {%- endmacro %}
 
-{% macro get_catalog_relations_where_clause_sql(relations) -%}
+{% macro get_catalog_relations_where_clause_sql(relations, table_alias='columns') -%}
   {% if relations | length == 0 %}
     where 1 = 0
   {% else %}
-    where columns.database != 'system'
+    where {{ table_alias }}.database != 'system'
       and (
       {%- for relation in relations -%}
         {% if not relation.schema %}
@@ -58,9 +103,9 @@
         {% endif %}
 
         (
-          columns.database = '{{ relation.schema }}'
+          {{ table_alias }}.database = '{{ relation.schema }}'
           {%- if relation.identifier %}
-          and columns.table = '{{ relation.identifier }}'
+          and {{ table_alias }}.table = '{{ relation.identifier }}'
           {%- endif %}
         )
         {%- if not loop.last %} or {% endif -%}
@@ -2,17 +2,28 @@
     {#
         Clone behavior with ClickHouse (dbt clone only operates on 'table'-type materializations, for the rest it falls back to view):
         - *MergeTree tables  -> cloned via `CLONE AS`.
+        - Distributed tables -> the local table is cloned via `CLONE AS` on every shard, then the Distributed table is recreated over the clone.
         - Tables with other engines -> not supported, fall back to a view.
-        - Distributed tables -> not supported, fall back to a view.
         - Materialized views -> only the target table is cloned; now MV is crated/attached to the clon.
     #}
-    {%- if config.get('materialized', '').startswith('distributed_') -%}
-        {{ return(False) }}
-    {%- endif -%}
     {%- set engine = config.get('engine', default='MergeTree()') -%}
     {{ return('MergeTree' in engine) }}
 {% endmacro %}
 
 {% macro clickhouse__create_or_replace_clone(this_relation, defer_relation) %}
+    {%- if config.get('materialized', '').startswith('distributed_') -%}
+        {%- set local_suffix = adapter.get_clickhouse_local_suffix() -%}
+        {%- set local_db_prefix = adapter.get_clickhouse_local_db_prefix() -%}
+        {%- set this_local = this_relation.incorporate(path={"identifier": this_relation.identifier + local_suffix, "schema": local_db_prefix + this_relation.schema}) -%}
+        {%- set defer_local = defer_relation.incorporate(path={"identifier": defer_relation.identifier + local_suffix, "schema": local_db_prefix + defer_relation.schema}) -%}
+        {% do create_schema(this_local) %}
+        {% do run_query(clickhouse__clone_table(this_local, defer_local)) %}
+        {{ create_distributed_table(this_relation, this_local) }}
+    {%- else -%}
+        {{ clickhouse__clone_table(this_relation, defer_relation) }}
+    {%- endif -%}
+{% endmacro %}
+
+{% macro clickhouse__clone_table(this_relation, defer_relation) %}
     CREATE OR REPLACE TABLE {{ this_relation }} {{ on_cluster_clause(this_relation) }} CLONE AS {{ defer_relation }}
 {% endmacro %}
@@ -11,10 +11,44 @@
 
   {{ run_hooks(pre_hooks, inside_transaction=True) }}
 
-  {# create our new dictionary #}
-  {% call statement('main') -%}
-    {{ clickhouse__get_create_dictionary_as_sql(target_relation, cluster_clause, sql) }}
-  {%- endcall %}
+  {#- `layout: auto` is fingerprinted as is, the source is only profiled for a new dictionary -#}
+  {%- set layout = config.get('layout') -%}
+  {%- set create_sql = clickhouse__get_create_dictionary_as_sql(target_relation, cluster_clause, sql, layout) -%}
+  {%- set fingerprint = clickhouse__dictionary_fingerprint(create_sql) -%}
+  {#- Unchanged dictionaries are reloaded unless `reload_on_run: false` opts out of it -#}
+  {%- set reload_on_run = config.get('reload_on_run', true) -%}
+  {%- set unchanged = existing_relation is not none and existing_relation.type == 'dictionary'
+        and not should_full_refresh()
+        and adapter.get_model_state(target_relation, 'fingerprint') == fingerprint -%}
+
+  {% if unchanged %}
+    {# the definition is the same, so at most the data needs a refresh #}
+    {{ log('Dictionary ' ~ target_relation ~ ' is unchanged, skipping recreation') }}
+    {#- a dictionary that was never loaded (e.g. lazily loaded after a restart) is loaded anyway -#}
+    {%- set reload = reload_on_run or adapter.dictionary_status(target_relation) == 'NOT_LOADED' -%}
+    {% call statement('main') -%}
+      {% if reload -%}
+        system reload dictionary {{ cluster_clause }} {{ target_relation }}
+      {%- else -%}
+        select 1
+      {%- endif %}
+    {%- endcall %}
+  {% else %}
+    {# create our new dictionary #}
+    {% if clickhouse__is_auto_layout(layout) %}
+      {%- set layout = clickhouse__advise_dictionary_layout(sql) -%}
+      {%- set create_sql = clickhouse__get_create_dictionary_as_sql(target_relation, cluster_clause, sql, layout) -%}
+    {% endif %}
+    {% call statement('main') -%}
+      {{ create_sql }}
+    {%- endcall %}
+    {% do adapter.cache_replaced(target_relation) %}
+    {% do adapter.set_model_state(target_relation, 'fingerprint', fingerprint) %}
+    {% call statement('load_dictionary') -%}
+      system reload dictionary {{ cluster_clause }} {{ target_relation }}
+    {%- endcall %}
+  {% endif %}
+  {% do store_result('main', response=adapter.dictionary_load_stats(target_relation, config.get('load_timeout'))) %}
 
   {% set should_revoke = should_revoke(target_relation, full_refresh_mode=True) %}
   {% do apply_grants(target_relation, grant_config, should_revoke=should_revoke) %}
@@ -33,7 +67,7 @@
 {%- endmaterialization -%}
 
 
-{% macro clickhouse__get_create_dictionary_as_sql(relation, cluster_clause, sql) %}
+{% macro clickhouse__get_create_dictionary_as_sql(relation, cluster_clause, sql, layout) %}
   {%- set fields = config.get('fields') -%}
   {%- set source_type = config.get('source_type') -%}
 
@@ -51,7 +85,7 @@
       {{ clickhouse_source(sql) }}
     {% endif -%}
   )
-  LAYOUT({{ config.get('layout') }})
+  LAYOUT({{ layout }})
   {%- if config.get('lifetime') %}
   LIFETIME({{ config.get('lifetime') }})
   {%- endif %}
@@ -61,6 +95,40 @@
 {% endmacro %}
 
 
+{#-
+  The definition of a dictionary is fingerprinted in the `__dbt_model_state` table of its schema,
+  so an unchanged dictionary is reloaded in place instead of recreated with CREATE OR REPLACE
+-#}
+{% macro clickhouse__dictionary_fingerprint(create_sql) %}
+  {{ return(local_md5(create_sql.split() | join(' '))) }}
+{% endmacro %}
+
+
+{% macro clickhouse__is_auto_layout(layout) %}
+  {{ return(layout is string and layout | lower == 'auto') }}
+{% endmacro %}
+
+
+{#-
+  `layout: auto` profiles the source (row count, key cardinality and range, value sizes) and
+  lets the adapter pick the layout with the smallest expected memory footprint. A dictionary with
+  a `range` always gets a (COMPLEX_KEY_)RANGE_HASHED layout, the only layouts RANGE(...) works with.
+-#}
+{% macro clickhouse__advise_dictionary_layout(sql) %}
+  {%- if config.get('source_type') == 'http' -%}
+    {% do exceptions.raise_compiler_error("layout: auto is only supported for dictionaries with a ClickHouse source") %}
+  {%- endif -%}
+  {%- set connection_overrides = config.get('connection_overrides', {}) -%}
+  {%- set table = config.get('table') -%}
+  {%- if table is not none -%}
+    {%- set database = adapter.get_credentials(connection_overrides).get('database') -%}
+    {%- set sql = 'select * from ' ~ ((database ~ '.') if database else '') ~ table -%}
+  {%- endif -%}
+  {%- set ranged = config.get('range') is not none -%}
+  {{ return(adapter.advise_dictionary_layout(sql, config.get('fields'), config.get('primary_key'), connection_overrides, ranged)) }}
+{% endmacro %}
+
+
 {% macro http_source() %}
   HTTP(URL '{{ config.get("url") }}' FORMAT '{{ config.get("format") }}')
 {% endmacro %}
@@ -102,5 +170,6 @@
     {% call statement('drop_dictionary_if_exists') %}
       drop dictionary if exists {{ relation }} {{ cluster_clause }}
     {% endcall %}
+    {% do adapter.cache_dropped(relation) %}
   {% endif %}
 {% endmacro %}
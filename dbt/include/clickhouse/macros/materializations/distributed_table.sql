@@ -63,12 +63,12 @@
     {{ adapter.rename_relation(intermediate_relation, target_relation_local) }}
   {% endif %}
     {% do run_query(create_distributed_table(target_relation, target_relation_local)) or '' %}
-  {% do run_query(clickhouse__insert_into(target_relation, sql, has_contract)) or '' %}
+  {% set insert_settings = {'parallel_distributed_insert_select': 2} if clickhouse__parallel_distributed_insert() else {} %}
+  {% do run_query(clickhouse__insert_into(target_relation, sql, has_contract, query_settings=insert_settings)) or '' %}
   {{ drop_relation_if_exists(view_relation) }}
   -- cleanup
   {% set should_revoke = should_revoke(existing_relation, full_refresh_mode=True) %}
-  {% do apply_grants(target_relation_local, grant_config, should_revoke=should_revoke) %}
-  {% do apply_grants(target_relation, grant_config, should_revoke=should_revoke) %}
+  {% do clickhouse__apply_grants_to_relations([target_relation_local, target_relation], grant_config, should_revoke=should_revoke) %}
 
   {% do persist_docs(target_relation, model) %}
   {{ run_hooks(post_hooks, inside_transaction=True) }}
@@ -79,6 +79,21 @@
 
 {% endmaterialization %}
 
+{% macro clickhouse__parallel_distributed_insert() %}
+  {#- Whether each shard inserts its own part of the source, instead of the initiator inserting
+      all rows. Only with the opt-in `parallel_distributed_insert` config, as the model's query
+      has to be row-local (no aggregation, join, DISTINCT, LIMIT or window across shards), and
+      when the source is sharded like the model. -#}
+  {%- if not config.get('parallel_distributed_insert', false) -%}
+    {{ return(false) }}
+  {%- endif -%}
+  {%- set parallel = adapter.can_parallel_distributed_insert(clickhouse__upstream_relations(), config.get('sharding_key')) -%}
+  {%- if not parallel -%}
+    {{ log('parallel_distributed_insert is ignored for ' ~ this.name ~ ', it does not read from a single Distributed table sharded like it', info=True) }}
+  {%- endif -%}
+  {{ return(parallel) }}
+{% endmacro %}
+
 {% macro create_distributed_table(relation, local_relation) %}
     {%- set cluster = adapter.get_clickhouse_cluster_name() -%}
    {% if cluster is none %}
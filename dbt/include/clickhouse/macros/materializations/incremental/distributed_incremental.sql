@@ -132,8 +132,7 @@
   {% endif %}
 
   {% set should_revoke = should_revoke(existing_relation, full_refresh_mode) %}
-  {% do apply_grants(target_relation, grant_config, should_revoke=should_revoke) %}
-  {% do apply_grants(target_relation_local, grant_config, should_revoke=should_revoke) %}
+  {% do clickhouse__apply_grants_to_relations([target_relation, target_relation_local], grant_config, should_revoke=should_revoke) %}
 
   {% do persist_docs(target_relation, model) %}
 
@@ -29,7 +29,24 @@
   {{ run_hooks(pre_hooks, inside_transaction=True) }}
   {% set to_drop = [] %}
 
-  {% if existing_relation is none %}
+  -- With skip_if_upstream_unchanged, nothing is inserted while the SQL, the config and the parts of
+  -- the upstream relations are unchanged. A model without upstream relations (reading table
+  -- functions or unref'd tables) has no known upstream state and always runs
+  {%- set upstream_watermark = none -%}
+  {%- if config.get('skip_if_upstream_unchanged', false) and config.get('incremental_strategy') != 'microbatch' -%}
+    {%- set upstream_watermark = adapter.get_model_fingerprint(sql, model.config, clickhouse__upstream_relations()) -%}
+  {%- endif -%}
+  {%- set upstream_unchanged = upstream_watermark is not none
+        and existing_relation is not none and not full_refresh_mode
+        and adapter.get_model_state(target_relation, 'upstream_watermark') == upstream_watermark -%}
+
+  {% if upstream_unchanged %}
+    {{ log('Upstream relations of ' ~ target_relation.name ~ ' are unchanged, skipping the incremental run') }}
+    {% call noop_statement('main', 'SKIP upstream unchanged', 'SKIP', 0) -%}
+      -- upstream relations unchanged since the last run
+    {%- endcall %}
+
+  {% elif existing_relation is none %}
     -- No existing table, simply create a new one
     {% call statement('main') %}
         {{ get_create_table_as_sql(False, target_relation, sql) }}
@@ -100,6 +117,10 @@
       {% do to_drop.append(backup_relation) %}
   {% endif %}
 
+  {% if upstream_watermark is not none and not upstream_unchanged %}
+    {% do adapter.set_model_state(target_relation, 'upstream_watermark', upstream_watermark) %}
+  {% endif %}
+
   {% set should_revoke = should_revoke(existing_relation, full_refresh_mode) %}
   {% do apply_grants(target_relation, grant_config, should_revoke=should_revoke) %}
 
@@ -7,46 +7,62 @@
         {%- set existing_local = existing_relation.incorporate(path={"identifier": this.identifier + local_suffix, "schema": local_db_prefix + this.schema}) if existing_relation is not none else none -%}
     {% endif %}
 
+    {#-- All changes go into one multi-action ALTER per relation, so a replicated table gets a single metadata version --#}
+    {%- set alter_actions = [] -%}
     {% if column_changes.on_schema_change == 'append_new_columns' %}
-        {% do clickhouse__add_columns(column_changes.columns_to_add, existing_relation, existing_local, is_distributed) %}
+        {% do alter_actions.extend(clickhouse__add_column_actions(column_changes.columns_to_add)) %}
+        {% do alter_actions.extend(clickhouse__modify_column_actions(column_changes.columns_to_widen)) %}
 
     {% elif column_changes.on_schema_change == 'sync_all_columns' %}
-        {% do clickhouse__drop_columns(column_changes.columns_to_drop, existing_relation, existing_local, is_distributed) %}
-        {% do clickhouse__add_columns(column_changes.columns_to_add, existing_relation, existing_local, is_distributed) %}
-        {% do clickhouse__modify_columns(column_changes.columns_to_modify, existing_relation, existing_local, is_distributed) %}
+        {% do alter_actions.extend(clickhouse__drop_column_actions(column_changes.columns_to_drop)) %}
+        {% do alter_actions.extend(clickhouse__add_column_actions(column_changes.columns_to_add)) %}
+        {% do alter_actions.extend(clickhouse__modify_column_actions(column_changes.columns_to_modify)) %}
     {% endif %}
+    {% do clickhouse__run_alter_table_actions(alter_actions, existing_relation, existing_local, is_distributed) %}
 
 {% endmacro %}
 
-{% macro clickhouse__add_columns(columns, existing_relation, existing_local=none, is_distributed=False) %}
+{% macro clickhouse__add_column_actions(columns) %}
+    {%- set actions = [] -%}
     {% for column in columns %}
         {% set codec = model['columns'].get(column.name, {}).get('codec') %}
-        {% set alter_action -%}
-            add column if not exists `{{ column.name }}` {{ column.data_type }} {{ codec_clause(codec) }}
-        {%- endset %}
-        {% do clickhouse__run_alter_table_command(alter_action, existing_relation, existing_local, is_distributed) %}
+        {% do actions.append(('add column if not exists `' ~ column.name ~ '` ' ~ column.data_type ~ ' ' ~ (codec_clause(codec) | trim)) | trim) %}
     {% endfor %}
+    {{ return(actions) }}
+{% endmacro %}
 
+{% macro clickhouse__drop_column_actions(columns) %}
+    {%- set actions = [] -%}
+    {% for column in columns %}
+        {% do actions.append('drop column if exists `' ~ column.name ~ '`') %}
+    {% endfor %}
+    {{ return(actions) }}
 {% endmacro %}
 
-{% macro clickhouse__drop_columns(columns, existing_relation, existing_local=none, is_distributed=False) %}
+{% macro clickhouse__modify_column_actions(columns) %}
+    {%- set actions = [] -%}
     {% for column in columns %}
-        {% set alter_action -%}
-            drop column if exists `{{ column.name }}`
-        {%- endset %}
-        {% do clickhouse__run_alter_table_command(alter_action, existing_relation, existing_local, is_distributed) %}
+        {% do actions.append('modify column if exists `' ~ column.name ~ '` ' ~ column.data_type) %}
     {% endfor %}
+    {{ return(actions) }}
+{% endmacro %}
+
+{% macro clickhouse__add_columns(columns, existing_relation, existing_local=none, is_distributed=False) %}
+    {% do clickhouse__run_alter_table_actions(clickhouse__add_column_actions(columns), existing_relation, existing_local, is_distributed) %}
+{% endmacro %}
 
+{% macro clickhouse__drop_columns(columns, existing_relation, existing_local=none, is_distributed=False) %}
+    {% do clickhouse__run_alter_table_actions(clickhouse__drop_column_actions(columns), existing_relation, existing_local, is_distributed) %}
 {% endmacro %}
 
 {% macro clickhouse__modify_columns(columns, existing_relation, existing_local=none, is_distributed=False) %}
-    {% for column in columns %}
-        {% set alter_action -%}
-            modify column if exists `{{ column.name }}` {{ column.data_type }}
-        {%- endset %}
-        {% do clickhouse__run_alter_table_command(alter_action, existing_relation, existing_local, is_distributed) %}
-    {% endfor %}
+    {% do clickhouse__run_alter_table_actions(clickhouse__modify_column_actions(columns), existing_relation, existing_local, is_distributed) %}
+{% endmacro %}
 
+{% macro clickhouse__run_alter_table_actions(alter_actions, existing_relation, existing_local=none, is_distributed=False) %}
+    {% if alter_actions %}
+        {% do clickhouse__run_alter_table_command(alter_actions | join(',\n'), existing_relation, existing_local, is_distributed) %}
+    {% endif %}
 {% endmacro %}
 
 {% macro clickhouse__run_alter_table_command(alter_action, existing_relation, existing_local=none, is_distributed=False) %}
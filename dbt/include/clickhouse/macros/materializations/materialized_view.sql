@@ -121,11 +121,11 @@
   {%- set view_created = True -%}
 
   {% if existing_relation is none %}
-    {{ clickhouse__create_mv(mv_relation, materialization_target_table, cluster_clause, refreshable_clause, sql, is_main_statement=True) }};
+    {{ clickhouse__create_mv(mv_relation, target_table_relation, cluster_clause, refreshable_clause, sql, is_main_statement=True) }};
   {% elif should_full_refresh() %}
     {{ log('Dropping existing MV ' ~ mv_relation.name ~ ' for full refresh recreation') }}
     {{ clickhouse__drop_mv(mv_relation, cluster_clause) }}
-    {{ clickhouse__create_mv(mv_relation, materialization_target_table, cluster_clause, refreshable_clause, sql, is_main_statement=True) }};
+    {{ clickhouse__create_mv(mv_relation, target_table_relation, cluster_clause, refreshable_clause, sql, is_main_statement=True) }};
   {% else %}
     {# Check if target table has changed - cannot be updated via MODIFY QUERY #}
     {% set existing_target = clickhouse__get_mv_current_target(mv_relation) %}
@@ -147,12 +147,17 @@
   {% endif %}
 
   {% set catchup_data = config.get("catchup", True) %}
-  {% if catchup_data == True and view_created == True %}
+  {% if catchup_data is mapping and view_created == True %}
+    {{ log('Executing chunked catchup data insertion into target table ' ~ target_table_relation )}}
+    {% do adapter.run_mv_catchup(target_table_relation, clickhouse__extract_mv_views(sql), catchup_data, config.get('query_settings', {})) %}
+  {% elif catchup_data == True and view_created == True %}
     {{ log('Executing catchup data insertion into target table ' ~ target_table_relation )}}
     {% set has_contract = config.get('contract').enforced %}
     {% do run_query(clickhouse__insert_into(target_table_relation, sql, has_contract, use_columns_from_sql=True)) %}
   {% endif %}
 
+  {% do clickhouse__refresh_mvs_on_run([mv_relation]) %}
+
   {#- Cleanup and grants -#}
   {% set should_revoke = should_revoke(existing_relation, full_refresh_mode=True) %}
   {% set grant_config = config.get('grants') %}
@@ -198,16 +203,20 @@
 
   {{ run_hooks(pre_hooks, inside_transaction=False) }}
 
+  -- extract the sql for each of the materialized views into a map
+  {% set views = clickhouse__extract_mv_views(sql) %}
+
   -- drop the temp relations if they exist already in the database
   {{ drop_relation_if_exists(preexisting_intermediate_relation) }}
+  {% if preexisting_backup_relation is not none and config.get('handoff_watermark') %}
+    {#- handoff views and table left by an interrupted full refresh -#}
+    {{ clickhouse__drop_handoff_relations(target_relation, cluster_clause, views) }}
+  {% endif %}
   {{ drop_relation_if_exists(preexisting_backup_relation) }}
 
   -- `BEGIN` happens here:
   {{ run_hooks(pre_hooks, inside_transaction=True) }}
 
-  -- extract the sql for each of the materialized views into a map
-  {% set views = clickhouse__extract_mv_views(sql) %}
-
   {% if backup_relation is none %}
     {{ log('Creating new materialized view ' + target_relation.name )}}
     {{ clickhouse__get_create_materialized_view_as_sql(target_relation, sql, views, catchup_data) }}
@@ -228,7 +237,9 @@
         {% endif %}
       {% endfor %}
     {% endif %}
-    {% if should_full_refresh() %}
+    {% if should_full_refresh() and config.get('handoff_watermark') %}
+      {% do clickhouse__full_refresh_mvs_with_handoff(existing_relation, backup_relation, sql, views, catchup_data) %}
+    {% elif should_full_refresh() %}
       {% do clickhouse__create_target_table(backup_relation, sql, catchup_data) %}
 
       {# Drop MV just before exchange to minimize blind period while avoiding old MV writing to new table #}
@@ -252,6 +263,10 @@
           {% set existing_relation = load_cached_relation(this) %}
         {% endif %}
       {%- endif %}
+      {#- a chunked catch-up interrupted before the views were created is finished first -#}
+      {% if catchup_data is mapping %}
+        {% do adapter.run_mv_catchup(existing_relation, views, catchup_data, config.get('query_settings', {}), resume=True) %}
+      {% endif %}
       -- try to alter view first to replace sql, else drop and create
       {{ clickhouse__update_mvs(target_relation, cluster_clause, refreshable_clause, views) }}
 
@@ -261,6 +276,12 @@
     {{ clickhouse__replace_mv(target_relation, existing_relation, intermediate_relation, backup_relation, sql, views, catchup_data) }}
   {% endif %}
 
+  {% set mv_relations = [] %}
+  {% for view in views %}
+    {% do mv_relations.append(target_relation.derivative('_' + view, 'materialized_view')) %}
+  {% endfor %}
+  {% do clickhouse__refresh_mvs_on_run(mv_relations) %}
+
   -- cleanup
   {% set should_revoke = should_revoke(existing_relation, full_refresh_mode=True) %}
   {% do apply_grants(target_relation, grant_config, should_revoke=should_revoke) %}
@@ -275,22 +296,23 @@
 
   {{ run_hooks(post_hooks, inside_transaction=False) }}
 
-  {% set relations = [target_relation] %}
-  {% for view in views %}
-    {{ relations.append(target_relation.derivative('_' + view, 'materialized_view')) }}
-  {% endfor %}
-
-  {{ return({'relations': relations}) }}
+  {{ return({'relations': [target_relation] + mv_relations}) }}
 {% endmacro %}
 
 
 {#
   Creates a target table for materialized views with optional catchup logic.
   If catchup is True, backfills the table with data from the SQL query.
+  If catchup is a mapping, creates an empty table and backfills it per view in chunks
+  (see adapter.run_mv_catchup), which can run concurrently and resume after a failure.
   If catchup is False, creates an empty table without backfilling.
 #}
 {% macro clickhouse__create_target_table(relation, sql, catchup=True) -%}
-  {% if catchup %}
+  {% if catchup is mapping %}
+    {% set has_contract = config.get('contract').enforced %}
+    {{ clickhouse__create_empty_table(False, relation, sql, has_contract, statement_name='main') }}
+    {% do adapter.run_mv_catchup(relation, clickhouse__extract_mv_views(sql), catchup, config.get('query_settings', {})) %}
+  {% elif catchup %}
     {% call statement('main') %}
       {{ get_create_table_as_sql(False, relation, sql) }}
     {% endcall %}
@@ -316,10 +338,141 @@
   {{ clickhouse__create_mvs(relation, cluster_clause, refreshable_clause, views) }}
 {%- endmacro %}
 
+{#-
+  Full refresh without a blind window, enabled by the `handoff_watermark` config.
+  The default full refresh drops the views just before the exchange and creates them again
+  after it, so rows inserted into the source in between are lost. Here handoff views running
+  the new queries are created before the old views are dropped. Every row gets to the rebuilt
+  table exactly once, as long as the watermark (a DateTime column of the views, e.g. an insert
+  timestamp) follows the insert time and rows arrive at most `handoff_lag_seconds` late:
+  - rows before a handoff point, chosen `handoff_lag_seconds` ahead, are backfilled;
+  - the handoff views write the rows from the handoff point on to a `__dbt_handoff` table;
+  - after the exchange, the views of the model are created again with a filter on a second
+    point. Views write to their `TO` table by name, so they write to the rebuilt table;
+  - once the second point has passed, the rows between the two points are moved from the
+    handoff table to the rebuilt table, and MODIFY QUERY drops the filter of the views.
+  The handoff views don't write to the backup table directly: once exchanged, that name is
+  the old table.
+-#}
+{% macro clickhouse__full_refresh_mvs_with_handoff(existing_relation, backup_relation, sql, views, catchup=True) %}
+  {%- set watermark = config.get('handoff_watermark') -%}
+  {%- set lag_seconds = config.get('handoff_lag_seconds', 5) | int -%}
+  {%- if config.get('refreshable') -%}
+    {% do exceptions.raise_compiler_error('handoff_watermark is not supported for refreshable materialized views') %}
+  {%- endif -%}
+  {%- set cluster_clause = on_cluster_clause(existing_relation) -%}
+  {%- set has_contract = config.get('contract').enforced -%}
+  {%- set handoff_table = existing_relation.derivative('__dbt_handoff') -%}
+  {{ clickhouse__create_empty_table(False, backup_relation, sql, has_contract, statement_name='main') }}
+  {% call statement('create handoff table') %}
+    create table if not exists {{ handoff_table }} {{ cluster_clause }} as {{ backup_relation }}
+  {% endcall %}
+
+  {%- set handoff_point = clickhouse__handoff_point(lag_seconds) -%}
+  {% for view, view_sql in views.items() %}
+    {%- set handoff_relation = existing_relation.derivative('_' ~ view ~ '__dbt_handoff', 'materialized_view') -%}
+    {{ clickhouse__create_mv(handoff_relation, handoff_table, cluster_clause, '', clickhouse__handoff_filter(view_sql, watermark, '>=', handoff_point)) }}
+  {% endfor %}
+  {#- rows inserted between choosing the handoff point and creating the views would be missed -#}
+  {% if not clickhouse__handoff_point_ahead(handoff_point) %}
+    {{ clickhouse__drop_handoff_relations(existing_relation, cluster_clause, views) }}
+    {% do exceptions.raise_compiler_error('Creating the handoff materialized views took longer than handoff_lag_seconds (' ~ lag_seconds ~ '), increase it and run again') %}
+  {% endif %}
+  {% do adapter.wait_for_server_time(handoff_point + lag_seconds) %}
+
+  {% if catchup %}
+    {% set backfill_views = {} %}
+    {% for view, view_sql in views.items() %}
+      {% do backfill_views.update({view: clickhouse__handoff_filter(view_sql, watermark, '<', handoff_point)}) %}
+    {% endfor %}
+    {% if catchup is mapping %}
+      {% do adapter.run_mv_catchup(backup_relation, backfill_views, catchup, config.get('query_settings', {})) %}
+    {% else %}
+      {% for view, view_sql in backfill_views.items() %}
+        {% call statement('handoff backfill: ' ~ view) %}
+          {{ clickhouse__insert_into(backup_relation, view_sql, has_contract, use_columns_from_sql=True) }}
+        {% endcall %}
+      {% endfor %}
+    {% endif %}
+  {% endif %}
+
+  {{ clickhouse__drop_mvs_by_suffixes(existing_relation, cluster_clause, views) }}
+  {% do exchange_tables_atomic(backup_relation, existing_relation) %}
+
+  {#- The handoff views write every row from the handoff point on to the handoff table, so an
+      attempt whose views were created too late is undone and the views are created again -#}
+  {%- set switch = namespace(point=none) -%}
+  {% for attempt in range(3) %}
+    {% if switch.point is none %}
+      {%- set switch_point = clickhouse__handoff_point(lag_seconds) -%}
+      {% for view, view_sql in views.items() %}
+        {%- set mv_relation = existing_relation.derivative('_' ~ view, 'materialized_view') -%}
+        {{ clickhouse__create_mv(mv_relation, existing_relation, cluster_clause, '', clickhouse__handoff_filter(view_sql, watermark, '>=', switch_point)) }}
+      {% endfor %}
+      {% if clickhouse__handoff_point_ahead(switch_point) %}
+        {%- set switch.point = switch_point -%}
+      {% else %}
+        {{ clickhouse__drop_mvs_by_suffixes(existing_relation, cluster_clause, views) }}
+        {% call statement('undo late switch: ' ~ attempt) %}
+          alter table {{ existing_relation }} {{ cluster_clause }}
+          delete where ({{ watermark }}) >= toDateTime({{ switch_point }}) settings mutations_sync = 2
+        {% endcall %}
+      {% endif %}
+    {% endif %}
+  {% endfor %}
+  {% if switch.point is none %}
+    {% do exceptions.raise_compiler_error('Creating the materialized views of ' ~ existing_relation ~ ' took longer than handoff_lag_seconds (' ~ lag_seconds ~ '). The rows inserted since the handoff are in ' ~ handoff_table ~ ', increase handoff_lag_seconds and run again') %}
+  {% endif %}
+  {% do adapter.wait_for_server_time(switch.point + lag_seconds) %}
+
+  {{ clickhouse__drop_handoff_mvs(existing_relation, cluster_clause, views) }}
+  {% call statement('move handoff rows') %}
+    insert into {{ existing_relation }}
+    select * from {{ handoff_table }} where ({{ watermark }}) < toDateTime({{ switch.point }})
+  {% endcall %}
+  {{ clickhouse__drop_handoff_table(existing_relation, cluster_clause) }}
+  {% for view, view_sql in views.items() %}
+    {{ clickhouse__modify_mv(existing_relation.derivative('_' ~ view, 'materialized_view'), cluster_clause, view_sql) }}
+  {% endfor %}
+{% endmacro %}
+
+{#- A unix timestamp `lag_seconds` ahead of the server clock -#}
+{% macro clickhouse__handoff_point(lag_seconds) %}
+  {{ return(run_query('select toUnixTimestamp(now()) + ' ~ lag_seconds).columns[0].values()[0] | int) }}
+{% endmacro %}
+
+{% macro clickhouse__handoff_point_ahead(point) %}
+  {{ return(run_query('select now() < toDateTime(' ~ point ~ ')').columns[0].values()[0]) }}
+{% endmacro %}
+
+{% macro clickhouse__handoff_filter(view_sql, watermark, operator, point) %}
+  {{ return('select * from (\n' ~ view_sql ~ '\n) where (' ~ watermark ~ ') ' ~ operator ~ ' toDateTime(' ~ point ~ ')') }}
+{% endmacro %}
+
+{% macro clickhouse__drop_handoff_mvs(target_relation, cluster_clause, views) %}
+  {% for view in views.keys() %}
+    {{ clickhouse__drop_mv(target_relation.derivative('_' ~ view ~ '__dbt_handoff', 'materialized_view'), cluster_clause) }}
+  {% endfor %}
+{% endmacro %}
+
+{% macro clickhouse__drop_handoff_table(target_relation, cluster_clause) %}
+  {%- set handoff_table = target_relation.derivative('__dbt_handoff') -%}
+  {% call statement('drop handoff table') %}
+    drop table if exists {{ handoff_table }} {{ cluster_clause }}
+  {% endcall %}
+  {% do adapter.cache_dropped(handoff_table) %}
+{% endmacro %}
+
+{% macro clickhouse__drop_handoff_relations(target_relation, cluster_clause, views) %}
+  {{ clickhouse__drop_handoff_mvs(target_relation, cluster_clause, views) }}
+  {{ clickhouse__drop_handoff_table(target_relation, cluster_clause) }}
+{% endmacro %}
+
 {% macro clickhouse__drop_mv(mv_relation, cluster_clause)  -%}
   {% call statement('drop existing mv: ' + mv_relation.name) -%}
     drop view if exists {{ mv_relation }} {{ cluster_clause }}
   {% endcall %}
+  {% do adapter.cache_dropped(mv_relation) %}
 {%- endmacro %}
 
 {% macro clickhouse__create_mv(mv_relation, target_relation, cluster_clause, refreshable_clause, view_sql, is_main_statement=False)  -%}
@@ -330,6 +483,7 @@
     to {{ target_relation }}
     as {{ view_sql }}
   {% endcall %}
+  {% do adapter.cache_mv_created(mv_relation, target_relation, view_sql) %}
 {%- endmacro %}
 
 {% macro clickhouse__modify_mv(mv_relation, cluster_clause, view_sql, is_main_statement=False)  -%}
@@ -337,9 +491,16 @@
   {% call statement(statement_name) -%}
     alter table {{ mv_relation }} {{ cluster_clause }} modify query {{ view_sql }}
   {% endcall %}
+  {% do adapter.cache_mv_query_modified(mv_relation, view_sql) %}
 {%- endmacro %}
 
+{#- The target is read from the relation cache, and only looked up in system.tables when the
+    target's schema hasn't been listed in this run -#}
 {% macro clickhouse__get_mv_current_target(mv_relation) %}
+  {% set cached_target = adapter.get_cached_mv_target(mv_relation) %}
+  {% if cached_target is not none %}
+    {{ return(cached_target) }}
+  {% endif %}
   {% set query %}
     select replaceRegexpOne(create_table_query, '.*TO\\s+`?([^`\\s(]+)`?\\.`?([^`\\s(]+)`?.*', '\\1.\\2') as target_table
     from system.tables
@@ -512,6 +673,20 @@
   {{ clickhouse__create_mvs(target_relation, cluster_clause, refreshable_clause, views) }}
 {% endmacro %}
 
+{#-
+  With `refresh_on_run: true` in the `refreshable` config, the views are refreshed at the end of
+  the run and the model waits for the refreshes (bounded by `refresh_timeout` seconds), so
+  downstream models read refreshed data. The refresh status, duration and written rows become
+  the adapter response of the model.
+-#}
+{% macro clickhouse__refresh_mvs_on_run(mv_relations) %}
+  {%- set refreshable_config = config.get('refreshable') -%}
+  {%- if refreshable_config is mapping and refreshable_config.get('refresh_on_run', false) -%}
+    {% set response = adapter.refresh_mvs(mv_relations, timeout=refreshable_config.get('refresh_timeout')) %}
+    {% do store_result('main', response=response) %}
+  {%- endif -%}
+{% endmacro %}
+
 {#-
   Renders the refresh clause of a refreshable MV
   (REFRESH ... [RANDOMIZE FOR ...] [DEPENDS ON ...] [APPEND]).
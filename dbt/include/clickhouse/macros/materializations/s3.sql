@@ -1,5 +1,5 @@
 {% macro clickhouse_s3source(config_name='', bucket='', path='', fmt='', structure='',
-    aws_access_key_id='', aws_secret_access_key='', role_arn='', compression='', external_id='') %}
+    aws_access_key_id='', aws_secret_access_key='', role_arn='', compression='', external_id='', cluster=none, schema_cache=none) %}
   {% if config_name and not config_name.lower().endswith('s3') %}
     {{ exceptions.raise_compiler_error("S3 configuration should end with 's3'") }}
   {% endif %}
@@ -15,5 +15,11 @@
     aws_secret_access_key=aws_secret_access_key,
     role_arn=role_arn,
     compression=compression,
-    external_id=external_id) }}
+    external_id=external_id,
+    cluster=cluster,
+    schema_cache=schema_cache) }}
+{% endmacro %}
+
+{% macro clickhouse_s3_path_filter(paths=none, files=none, partitions=none, like='') %}
+  {{ adapter.s3_path_filter(paths=paths, files=files, partitions=partitions, like=like) }}
 {% endmacro %}
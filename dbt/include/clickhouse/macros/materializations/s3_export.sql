@@ -0,0 +1,53 @@
+{%- materialization s3_export, adapter='clickhouse' -%}
+
+  {{ run_hooks(pre_hooks, inside_transaction=False) }}
+
+  -- `BEGIN` happens here:
+  {{ run_hooks(pre_hooks, inside_transaction=True) }}
+
+  {% call statement('main') -%}
+    {{ clickhouse__s3_export_sql(sql) }}
+  {%- endcall %}
+
+  {{ run_hooks(post_hooks, inside_transaction=True) }}
+
+  {{ adapter.commit() }}
+
+  {{ run_hooks(post_hooks, inside_transaction=False) }}
+
+  {{ return({'relations': []}) }}
+
+{%- endmaterialization -%}
+
+
+{% macro clickhouse__s3_export_sql(sql) %}
+  {%- set config_name = config.get('s3_config', '') -%}
+  {%- if config_name and not config_name.lower().endswith('s3') -%}
+    {{ exceptions.raise_compiler_error("S3 configuration should end with 's3'") }}
+  {%- endif -%}
+  {%- set s3config = config.get(config_name, {}) if config_name else {} -%}
+  {%- set partition_by = config.get('partition_by') -%}
+  insert into function {{ adapter.s3source_clause(
+    config_name=config_name,
+    s3_model_config=s3config,
+    bucket='',
+    path='',
+    fmt='',
+    structure='',
+    aws_access_key_id='',
+    aws_secret_access_key='',
+    role_arn='',
+    cluster=false,
+    schema_cache=false) }}
+  {%- if partition_by %}
+  partition by {{ partition_by if partition_by is string else '(' ~ partition_by | join(', ') ~ ')' }}
+  {%- endif %}
+  {{ adapter.s3_export_settings(
+    config_name,
+    s3config,
+    mode=config.get('export_mode', 'truncate'),
+    row_group_size=config.get('row_group_size'),
+    parallel=config.get('parallel_export', false),
+    query_settings=config.get('query_settings', {})) }}
+  {{ sql }}
+{% endmacro %}
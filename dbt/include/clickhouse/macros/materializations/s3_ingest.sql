@@ -0,0 +1,128 @@
+{%- materialization s3_ingest, adapter='clickhouse' -%}
+
+  {%- set existing_relation = load_cached_relation(this) -%}
+  {%- set target_relation = this.incorporate(type='table') -%}
+  {%- set grant_config = config.get('grants') -%}
+  {%- set has_contract = config.get('contract').enforced -%}
+  {%- set full_refresh_mode = existing_relation is not none and (should_full_refresh() or existing_relation.is_view) -%}
+
+  {%- set intermediate_relation = make_intermediate_relation(target_relation) -%}
+  {%- set backup_relation = make_backup_relation(target_relation, 'table') -%}
+  {%- set marker = clickhouse__s3_new_files_marker() | trim -%}
+  {%- if marker not in sql -%}
+    {{ exceptions.raise_compiler_error('s3_ingest models must filter their files with clickhouse_s3_new_files() in their where clause, otherwise every chunk inserts all files') }}
+  {%- endif -%}
+
+  {{ drop_relation_if_exists(load_cached_relation(intermediate_relation)) }}
+  {{ drop_relation_if_exists(load_cached_relation(backup_relation)) }}
+
+  {{ run_hooks(pre_hooks, inside_transaction=False) }}
+  {{ run_hooks(pre_hooks, inside_transaction=True) }}
+  {% set to_drop = [] %}
+
+  -- A full refresh ingests every file into a new table and swaps it in, so the recorded files
+  -- are only replaced once the new table holds them
+  {%- set ingest_relation = intermediate_relation if full_refresh_mode else target_relation -%}
+  {% if existing_relation is none or full_refresh_mode %}
+    {% do clickhouse__create_empty_table(False, ingest_relation, sql | replace(marker, 'false'), has_contract) %}
+  {% endif %}
+
+  {% set chunks = adapter.s3_pending_files(
+      target_relation,
+      clickhouse__s3_ingest_listing(),
+      config.get('files_per_chunk'),
+      reset=existing_relation is none,
+      all_files=full_refresh_mode,
+      path_column=config.get('path_column')) %}
+  {% set ingested = [] %}
+  {% for chunk in chunks %}
+    {% set files_filter = adapter.s3_path_filter(paths=chunk | map('first') | list) %}
+    {% call statement('main' if loop.last else 'ingest chunk ' ~ loop.index) %}
+      {{ clickhouse__insert_into(ingest_relation, sql | replace(marker, files_filter), has_contract) }}
+    {% endcall %}
+    {% if full_refresh_mode %}
+      {% do ingested.extend(chunk) %}
+    {% else %}
+      {% do adapter.s3_record_files(target_relation, chunk) %}
+    {% endif %}
+  {% endfor %}
+  {% if not chunks %}
+    {% call noop_statement('main', 'No new S3 files', 'INSERT', 0) -%}
+      -- no new S3 files to ingest
+    {%- endcall %}
+  {% endif %}
+
+  {% if full_refresh_mode %}
+    {% if existing_relation.can_exchange %}
+      {% do adapter.rename_relation(intermediate_relation, backup_relation) %}
+      {% do exchange_tables_atomic(backup_relation, target_relation) %}
+    {% else %}
+      {% do adapter.rename_relation(target_relation, backup_relation) %}
+      {% do adapter.rename_relation(intermediate_relation, target_relation) %}
+    {% endif %}
+    {% do adapter.s3_record_files(target_relation, ingested, replace=True) %}
+    {% do to_drop.append(backup_relation) %}
+  {% endif %}
+
+  {% set should_revoke = should_revoke(existing_relation, full_refresh_mode) %}
+  {% do apply_grants(target_relation, grant_config, should_revoke=should_revoke) %}
+
+  {% do persist_docs(target_relation, model) %}
+
+  {{ run_hooks(post_hooks, inside_transaction=True) }}
+
+  {% do adapter.commit() %}
+
+  {% for rel in to_drop %}
+      {% do adapter.drop_relation(rel) %}
+  {% endfor %}
+
+  {{ run_hooks(post_hooks, inside_transaction=False) }}
+
+  {{ return({'relations': [target_relation]}) }}
+
+{%- endmaterialization -%}
+
+
+{% macro clickhouse__s3_new_files_marker() -%}
+  /* dbt_s3_new_files */ true
+{%- endmacro %}
+
+
+{#
+  Condition of an s3_ingest model selecting the files it has not ingested yet. It compiles to
+  `true` and is replaced with a `_path` filter for every chunk of new files.
+#}
+{% macro clickhouse_s3_new_files() %}
+  {%- if config.get('materialized') != 's3_ingest' -%}
+    {{ exceptions.raise_compiler_error('clickhouse_s3_new_files() is only supported by s3_ingest models') }}
+  {%- endif -%}
+  {{ clickhouse__s3_new_files_marker() }}
+{%- endmacro %}
+
+
+{#
+  Lists the files of the `s3_config` S3 configuration with the `One` format, which reads one
+  row per file without opening it.
+#}
+{% macro clickhouse__s3_ingest_listing() %}
+  {%- set config_name = config.require('s3_config') -%}
+  {%- if not config_name.lower().endswith('s3') -%}
+    {{ exceptions.raise_compiler_error("S3 configuration should end with 's3'") }}
+  {%- endif -%}
+  {%- set listing_config = {} -%}
+  {%- do listing_config.update(config.get(config_name, {}) or {}) -%}
+  {%- do listing_config.update({'structure': '', 'compression': ''}) -%}
+  {{ return(adapter.s3source_clause(
+    config_name=config_name,
+    s3_model_config=listing_config,
+    bucket='',
+    path='',
+    fmt='One',
+    structure='',
+    aws_access_key_id='',
+    aws_secret_access_key='',
+    role_arn='',
+    cluster=false,
+    schema_cache=false)) }}
+{% endmacro %}
@@ -1,10 +1,32 @@
+{#-- Hashes the arguments natively, without casting them to strings. The isNull flag keeps NULL
+     distinct from the type default. cityHash64 returns UInt64 like the former halfMD5, so
+     existing snapshot tables keep a compatible dbt_scd_id column. --#}
 {% macro clickhouse__snapshot_hash_arguments(args) -%}
-  halfMD5({%- for arg in args -%}
-    coalesce(cast({{ arg }} as varchar ), '')
-    {% if not loop.last %} || '|' || {% endif %}
+  cityHash64({%- for arg in args -%}
+    isNull({{ arg }}), assumeNotNull({{ arg }})
+    {%- if not loop.last %}, {% endif %}
   {%- endfor -%})
 {%- endmacro %}
 
+{#-- Snapshot joins are ALL joins unless `snapshot_join_strictness: any` is configured, which
+     keeps a single match per key and builds a smaller hash table --#}
+{% macro clickhouse__snapshot_join(join_type='inner') -%}
+  {%- set strictness = config.get('snapshot_join_strictness', 'all') -%}
+  {%- if strictness not in ('all', 'any') -%}
+    {% do exceptions.raise_compiler_error("Invalid snapshot_join_strictness '" ~ strictness ~ "', expected 'all' or 'any'") %}
+  {%- endif -%}
+  {{ join_type }} {{ 'any ' if strictness == 'any' }}join
+{%- endmacro %}
+
+{#-- Settings for the snapshot staging and merge queries, e.g. `snapshot_join_algorithm: grace_hash`
+     to bound memory when the current snapshot rows are large --#}
+{% macro clickhouse__snapshot_join_settings() -%}
+  {%- set join_algorithm = config.get('snapshot_join_algorithm') -%}
+  {%- if join_algorithm -%}
+    settings join_algorithm = '{{ join_algorithm }}'
+  {%- endif -%}
+{%- endmacro %}
+
 {% macro clickhouse__post_snapshot(staging_relation) %}
     {{ drop_relation_if_exists(staging_relation) }}
 {% endmacro %}
@@ -14,8 +36,18 @@
 
     {{ drop_relation_if_exists(tmp_relation) }}
 
+    {#-- (column, target type) pairs of the check columns when the target keeps their hash --#}
+    {%- set check_hash_cols = clickhouse__ensure_snapshot_check_hash(target_relation) -%}
+    {%- if check_hash_cols is not none -%}
+        {%- set strategy = dict(strategy, check_hash_cols=check_hash_cols) -%}
+    {%- endif -%}
     {% set select = snapshot_staging_table(strategy, sql, target_relation) %}
 
+    {%- set join_settings = clickhouse__snapshot_join_settings() -%}
+    {%- if join_settings -%}
+        {%- set select = 'select * from (\n' ~ select ~ '\n) ' ~ join_settings -%}
+    {%- endif -%}
+
     {% call statement('build_snapshot_staging_relation') %}
         {{ create_table_as(False, tmp_relation, select) }}
     {% endcall %}
@@ -23,7 +55,109 @@
     {% do return(tmp_relation) %}
 {% endmacro %}
 
+{#-- With `snapshot_check_hash: true`, check strategy snapshots keep a hash of the check columns in a
+     MATERIALIZED dbt_check_hash column of the target. ClickHouse computes it once at insert time
+     (and on read for rows written before the column existed), so change detection compares one
+     UInt64 per row. The column comment fingerprints the hash expression to follow check_cols.
+     Both hashes cast the check columns to their types in the target, so a source column of
+     another type (e.g. String for LowCardinality(String), or not Nullable) hashes the same.
+     The existing columns and the comment are read once per run, in
+     clickhouse__ensure_snapshot_check_hash, which hands the typed check columns to the staging
+     query through the strategy. --#}
+{% macro clickhouse__snapshot_check_hash_columns() %}
+  {%- if not (config.get('snapshot_check_hash') and config.get('strategy') == 'check') -%}
+    {{ return(none) }}
+  {%- endif -%}
+  {%- set column_added, check_cols = snapshot_check_all_get_existing_columns(model, true, config.get('check_cols')) -%}
+  {#-- New check columns are not in the target yet, dbt treats every row as changed in that case --#}
+  {{ return(none if column_added or not check_cols else check_cols) }}
+{% endmacro %}
+
+{#-- typed_cols are (column, target type) pairs. The value is cast to the target type without
+     Nullable, since a NULL can't be cast to a non Nullable type, and isNull keeps NULLs apart --#}
+{% macro clickhouse__snapshot_check_hash_expression(typed_cols, qualifier='') %}
+  {%- set args = [] -%}
+  {%- for column, data_type in typed_cols -%}
+    {%- set value_type = modules.re.sub("^(LowCardinality\\()?Nullable\\((.*)\\)$", "\\1\\2", data_type) -%}
+    {%- do args.append("isNull(" ~ qualifier ~ column ~ "), CAST(assumeNotNull(" ~ qualifier ~ column ~ "), '" ~ (value_type | replace("'", "\\'")) ~ "')") -%}
+  {%- endfor -%}
+  {{ return('cityHash64(' ~ args | join(', ') ~ ')') }}
+{% endmacro %}
+
+{% macro clickhouse__snapshot_check_hash_fingerprint(typed_cols) %}
+  {{ return('dbt check hash ' ~ local_md5(clickhouse__snapshot_check_hash_expression(typed_cols))) }}
+{% endmacro %}
+
+{#-- The name, type and comment of every column of the target --#}
+{% macro clickhouse__snapshot_target_columns(target_relation) %}
+  {% set select_columns %}
+    select name, type, comment from system.columns
+    where database = '{{ target_relation.schema }}'
+      and table = '{{ target_relation.identifier }}'
+  {% endset %}
+  {%- set columns = {} -%}
+  {%- for row in run_query(select_columns).rows -%}
+    {%- do columns.update({row['name']: row}) -%}
+  {%- endfor -%}
+  {{ return(columns) }}
+{% endmacro %}
+
+{#-- Returns the (column, target type) pairs of the check columns once the target holds an up to
+     date dbt_check_hash column --#}
+{% macro clickhouse__ensure_snapshot_check_hash(target_relation) %}
+  {%- set check_cols = clickhouse__snapshot_check_hash_columns() -%}
+  {%- if check_cols is none or not execute -%}
+    {{ return(none) }}
+  {%- endif -%}
+  {%- set target_columns = clickhouse__snapshot_target_columns(target_relation) -%}
+  {%- set typed_cols = [] -%}
+  {%- for column in check_cols -%}
+    {%- set target_column = target_columns.get(column | replace('`', '')) -%}
+    {%- if target_column is none -%}
+      {{ return(none) }}
+    {%- endif -%}
+    {%- do typed_cols.append((column, target_column['type'])) -%}
+  {%- endfor -%}
+  {%- set hash_expr = clickhouse__snapshot_check_hash_expression(typed_cols) -%}
+  {%- set fingerprint = clickhouse__snapshot_check_hash_fingerprint(typed_cols) -%}
+  {%- set hash_column = target_columns.get('dbt_check_hash') -%}
+  {% if hash_column is none %}
+    {% call statement('add_check_hash_column') %}
+      alter table {{ target_relation }} {{ on_cluster_clause(target_relation) }}
+      add column if not exists dbt_check_hash UInt64 materialized {{ hash_expr }} comment '{{ fingerprint }}'
+    {% endcall %}
+  {% elif hash_column['comment'] != fingerprint %}
+    {% call statement('modify_check_hash_column') %}
+      alter table {{ target_relation }} {{ on_cluster_clause(target_relation) }}
+      modify column dbt_check_hash UInt64 materialized {{ hash_expr }} comment '{{ fingerprint }}'
+    {% endcall %}
+    {#-- Values already stored in parts still follow the old expression --#}
+    {% call statement('materialize_check_hash_column') %}
+      alter table {{ target_relation }} {{ on_cluster_clause(target_relation) }}
+      materialize column dbt_check_hash settings mutations_sync = 2
+    {% endcall %}
+  {% endif %}
+  {{ return(typed_cols) }}
+{% endmacro %}
+
+{#-- The row_changed condition for the staging query: a hash comparison once the target holds an
+     up to date dbt_check_hash column, otherwise the column by column comparison of the strategy --#}
+{% macro clickhouse__snapshot_row_changed(strategy) %}
+  {%- set check_cols = strategy.get('check_hash_cols') -%}
+  {%- if check_cols -%}
+    {{ return('snapshotted_data.dbt_check_hash != ' ~ clickhouse__snapshot_check_hash_expression(check_cols, 'source_data.')) }}
+  {%- endif -%}
+  {{ return(strategy.row_changed) }}
+{% endmacro %}
+
 {% macro clickhouse__snapshot_merge_sql(target, source, insert_cols) -%}
+  {%- set merge_strategy = config.get('snapshot_merge_strategy', 'rebuild') -%}
+  {%- if merge_strategy == 'replace_partitions' -%}
+    {% do clickhouse__snapshot_replace_partitions(target, source, insert_cols) %}
+    {% do return ('select 1') %}
+  {%- elif merge_strategy != 'rebuild' -%}
+    {% do exceptions.raise_compiler_error("Invalid snapshot_merge_strategy '" ~ merge_strategy ~ "', expected 'rebuild' or 'replace_partitions'") %}
+  {%- endif -%}
   {%- set insert_cols_csv = insert_cols | join(', ') -%}
   {%- set valid_to_col = adapter.quote('dbt_valid_to') -%}
 
@@ -35,12 +169,13 @@
   {% call statement('insert_unchanged_data') %}
     insert into {{ upsert }} ({{ insert_cols_csv }})
     select {% for column in insert_cols -%}
-      {{ column }} {%- if not loop.last %}, {%- endif %}
+      target.{{ column }} {%- if not loop.last %}, {%- endif %}
     {%- endfor %}
-    from {{ target }}
-    where dbt_scd_id not in (
-      select {{ source }}.dbt_scd_id from {{ source }} 
-    )
+    from {{ target }} target
+    left anti join (
+      select dbt_scd_id from {{ source }}
+    ) as source_scd_ids on target.dbt_scd_id = source_scd_ids.dbt_scd_id
+    {{ clickhouse__snapshot_join_settings() }}
   {% endcall %}
 
  {% call statement('insert_updated_and_deleted') %}
@@ -60,7 +195,8 @@
       {%- endif %} {%- if not loop.last %}, {%- endif %}
     {%- endfor %}
     from {{ target }} target
-    join updates_and_deletes on target.dbt_scd_id = updates_and_deletes.dbt_scd_id;
+    {{ clickhouse__snapshot_join('inner') }} updates_and_deletes on target.dbt_scd_id = updates_and_deletes.dbt_scd_id
+    {{ clickhouse__snapshot_join_settings() }}
   {% endcall %}
 
   {% call statement('insert_new') %}
@@ -77,6 +213,7 @@
     {% call statement('drop_exchanged_relation') %}
       drop table if exists {{ upsert }} {{ on_cluster_clause(upsert) }};
     {% endcall %}
+    {% do adapter.cache_dropped(upsert) %}
   {% else %}
     {% call statement('drop_target_relation') %}
       drop table if exists {{ target }} {{ on_cluster_clause(target) }};
@@ -90,6 +227,111 @@
 {% endmacro %}
 
 
+{#-- Rewrites only the target partitions holding new rows or rows whose dbt_valid_to changes.
+     The affected partitions are rebuilt in the upsert table and swapped in with REPLACE PARTITION,
+     so the cost of a run follows the change volume rather than the size of the snapshot. --#}
+{% macro clickhouse__snapshot_replace_partitions(target, source, insert_cols) %}
+  {%- set insert_cols_csv = insert_cols | join(', ') -%}
+  {%- set valid_to_col = adapter.quote('dbt_valid_to') -%}
+
+  {%- set upsert = target.derivative('__snapshot_upsert') -%}
+  {#-- Any leftover rows in the upsert table would be swapped into the target, so always start empty --#}
+  {% call statement('drop_upsert_relation') %}
+    drop table if exists {{ upsert }} {{ on_cluster_clause(upsert) }}
+  {% endcall %}
+  {% call statement('create_upsert_relation') %}
+    create table {{ upsert }} {{ on_cluster_clause(upsert) }} as {{ target }}
+  {% endcall %}
+
+  {% call statement('insert_updated_and_deleted') %}
+    insert into {{ upsert }} ({{ insert_cols_csv }})
+    with updates_and_deletes as (
+      select
+        dbt_scd_id,
+        dbt_valid_to
+      from {{ source }}
+      where dbt_change_type IN ('update', 'delete')
+    )
+    select {% for column in insert_cols %}
+      {%- if column == valid_to_col -%}
+        updates_and_deletes.dbt_valid_to as dbt_valid_to
+      {%- else -%}
+        target.{{ column }} as {{ column }}
+      {%- endif %} {%- if not loop.last %}, {%- endif %}
+    {%- endfor %}
+    from {{ target }} target
+    {{ clickhouse__snapshot_join('inner') }} updates_and_deletes on target.dbt_scd_id = updates_and_deletes.dbt_scd_id
+    {{ clickhouse__snapshot_join_settings() }}
+  {% endcall %}
+
+  {% call statement('insert_new') %}
+    insert into {{ upsert }} ({{ insert_cols_csv }})
+    select {% for column in insert_cols -%}
+      {{ column }} {%- if not loop.last %}, {%- endif %}
+    {%- endfor %}
+    from {{ source }}
+    where {{ source }}.dbt_change_type IN ('insert')
+  {% endcall %}
+
+  {% if execute %}
+    {#-- Updated rows may move to another partition when the partition key uses dbt_valid_to,
+         so their original partitions are included as well --#}
+    {% set select_changed_partitions %}
+      select distinct partition_id
+      from system.parts
+      where active
+        and database = '{{ upsert.schema }}'
+        and table = '{{ upsert.identifier }}'
+      union distinct
+      select distinct _partition_id as partition_id
+      from {{ target }}
+      where dbt_scd_id in (
+        select dbt_scd_id from {{ source }} where dbt_change_type IN ('update', 'delete')
+      )
+    {% endset %}
+    {% set changed_partitions = run_query(select_changed_partitions).rows | map(attribute='partition_id') | list %}
+  {% else %}
+    {% set changed_partitions = [] %}
+  {% endif %}
+
+  {% if changed_partitions %}
+    {%- set changed_partitions_csv -%}
+      {%- for partition_id in changed_partitions -%}
+        '{{ partition_id }}'{{ ', ' if not loop.last }}
+      {%- endfor -%}
+    {%- endset %}
+    {% call statement('insert_unchanged_data') %}
+      insert into {{ upsert }} ({{ insert_cols_csv }})
+      select {% for column in insert_cols -%}
+        target.{{ column }} {%- if not loop.last %}, {%- endif %}
+      {%- endfor %}
+      from {{ target }} target
+      left anti join (
+        select dbt_scd_id from {{ source }}
+      ) as source_scd_ids on target.dbt_scd_id = source_scd_ids.dbt_scd_id
+      where target._partition_id in ({{ changed_partitions_csv }})
+      {{ clickhouse__snapshot_join_settings() }}
+    {% endcall %}
+
+    {% call statement('replace_partitions') %}
+      alter table {{ target }}
+      {%- for partition_id in changed_partitions %}
+        replace partition id '{{ partition_id }}' from {{ upsert }}
+        {{- ', ' if not loop.last }}
+      {%- endfor %}
+      {#- A partition emptied by the update has no parts in the upsert table --#}
+      {%- if adapter.is_at_or_after_version('26.6') %}
+        settings allow_replace_partition_from_empty_source = 1
+      {%- endif %}
+    {% endcall %}
+  {% endif %}
+
+  {% call statement('drop_upsert_relation') %}
+    drop table if exists {{ upsert }} {{ on_cluster_clause(upsert) }}
+  {% endcall %}
+  {% do adapter.cache_dropped(upsert) %}
+{% endmacro %}
+
 {% macro clickhouse__snapshot_staging_table(strategy, source_sql, target_relation) -%}
     {# Detect strategy type and delegate to specific macro #}
     {% if strategy.updated_at == 'now()' or 'now()' in strategy.updated_at %}
@@ -100,6 +342,7 @@
 {%- endmacro %}
 
 {% macro clickhouse__snapshot_staging_table_check_strategy(strategy, source_sql, target_relation) -%}
+    {%- set row_changed = clickhouse__snapshot_row_changed(strategy) -%}
 
     with snapshot_time as (
         select {{ strategy.updated_at }} as ts  -- Single timestamp
@@ -113,6 +356,9 @@
     snapshotted_data as (
 
         select *,
+            {%- if row_changed != strategy.row_changed %}
+            dbt_check_hash,
+            {%- endif %}
             {{ strategy.unique_key }} as dbt_unique_key
 
         from {{ target_relation }}
@@ -163,12 +409,12 @@
             source_data.*
 
         from insertions_source_data as source_data
-        left outer join snapshotted_data on snapshotted_data.dbt_unique_key = source_data.dbt_unique_key
+        {{ clickhouse__snapshot_join('left') }} snapshotted_data on snapshotted_data.dbt_unique_key = source_data.dbt_unique_key
         where snapshotted_data.dbt_unique_key is null
            or (
                 snapshotted_data.dbt_unique_key is not null
             and (
-                {{ strategy.row_changed }}
+                {{ row_changed }}
             )
         )
 
@@ -182,9 +428,9 @@
             snapshotted_data.dbt_scd_id
 
         from updates_source_data as source_data
-        join snapshotted_data on snapshotted_data.dbt_unique_key = source_data.dbt_unique_key
+        {{ clickhouse__snapshot_join('inner') }} snapshotted_data on snapshotted_data.dbt_unique_key = source_data.dbt_unique_key
         where (
-            {{ strategy.row_changed }}
+            {{ row_changed }}
         )
     )
 
@@ -202,7 +448,7 @@
             snapshotted_data.dbt_scd_id
 
         from snapshotted_data
-        left join deletes_source_data as source_data on snapshotted_data.dbt_unique_key = source_data.dbt_unique_key
+        {{ clickhouse__snapshot_join('left') }} deletes_source_data as source_data on snapshotted_data.dbt_unique_key = source_data.dbt_unique_key
         where source_data.dbt_unique_key is null
     )
     {%- endif %}
@@ -278,7 +524,7 @@
             source_data.*
 
         from insertions_source_data as source_data
-        left outer join snapshotted_data on snapshotted_data.dbt_unique_key = source_data.dbt_unique_key
+        {{ clickhouse__snapshot_join('left') }} snapshotted_data on snapshotted_data.dbt_unique_key = source_data.dbt_unique_key
         where snapshotted_data.dbt_unique_key is null
            or (
                 snapshotted_data.dbt_unique_key is not null
@@ -297,7 +543,7 @@
             snapshotted_data.dbt_scd_id
 
         from updates_source_data as source_data
-        join snapshotted_data on snapshotted_data.dbt_unique_key = source_data.dbt_unique_key
+        {{ clickhouse__snapshot_join('inner') }} snapshotted_data on snapshotted_data.dbt_unique_key = source_data.dbt_unique_key
         where (
             {{ strategy.row_changed }}
         )
@@ -317,7 +563,7 @@
             snapshotted_data.dbt_scd_id
 
         from snapshotted_data
-        left join deletes_source_data as source_data on snapshotted_data.dbt_unique_key = source_data.dbt_unique_key
+        {{ clickhouse__snapshot_join('left') }} deletes_source_data as source_data on snapshotted_data.dbt_unique_key = source_data.dbt_unique_key
         where source_data.dbt_unique_key is null
     )
     {%- endif %}
@@ -31,8 +31,24 @@
   {%- set repopulate_from_mvs_on_full_refresh = config.get('repopulate_from_mvs_on_full_refresh', False) -%}
   {%- set dbt_mvs_pointing_to_this_table = clickhouse__get_dbt_mvs_for_target(existing_relation) -%}
 
+  {# With rebuild_if_unchanged: false, a table whose SQL, config and upstream data didn't change since its last build is kept #}
+  {%- set build_fingerprint = none -%}
+  {%- if not config.get('rebuild_if_unchanged', true) -%}
+    {%- set build_fingerprint = adapter.get_model_fingerprint(sql, model.config, clickhouse__upstream_relations()) -%}
+  {%- endif -%}
+  {%- set unchanged = build_fingerprint is not none
+        and existing_relation is not none and existing_relation.is_table
+        and not should_full_refresh()
+        and adapter.get_model_state(target_relation, 'fingerprint') == build_fingerprint -%}
+
+  {% if unchanged %}
+    {{ log('Table ' ~ target_relation.name ~ ' and its upstream data are unchanged, skipping the rebuild') }}
+    {% call noop_statement('main', 'SKIP unchanged', 'SKIP', 0) -%}
+      -- unchanged since the last build
+    {%- endcall %}
+
   {# If there is not existing relation, we can just create a new one #}
-  {% if existing_relation is none %}
+  {% elif existing_relation is none %}
     {{ log('Creating new relation ' + target_relation.name )}}
     {% call statement('main') -%}
       {{ get_create_table_as_sql(False, target_relation, sql) }}
@@ -58,15 +74,11 @@
     {# If no mv_on_schema_change is set, we behave as usual (rebuild the table) #}
     {% if configured_mv_on_schema_change is none %}
       {% if existing_relation.can_exchange %}
-      {% call statement('main') -%}
-            {{ get_create_table_as_sql(False, backup_relation, sql) }}
-          {%- endcall %}
+      {% do clickhouse__rebuild_table(backup_relation, existing_relation, sql) %}
       {% do exchange_tables_atomic(backup_relation, existing_relation) %}
       {% else %}
           -- We have to use an intermediate and rename accordingly
-          {% call statement('main') -%}
-            {{ get_create_table_as_sql(False, intermediate_relation, sql) }}
-          {%- endcall %}
+          {% do clickhouse__rebuild_table(intermediate_relation, existing_relation, sql) %}
           {{ adapter.rename_relation(existing_relation, backup_relation) }}
           {{ adapter.rename_relation(intermediate_relation, target_relation) }}
       {% endif %}
@@ -104,8 +116,7 @@
       {# Populate staging table from each MV's SELECT #}
       {% for mv_info in dbt_mvs_pointing_to_this_table %}
           {{ log('Repopulating from MV: ' ~ mv_info.name, info=True) }}
-          {% set wrapped_sql = 'SELECT * FROM (' ~ mv_info.sql ~ ')' %}
-          {% do run_query(clickhouse__insert_into(staging_relation, wrapped_sql, false, use_columns_from_sql=True)) %}
+          {% do run_query(clickhouse__insert_into(staging_relation, clickhouse__mv_repopulation_sql(mv_info.sql), false, use_columns_from_sql=True)) %}
       {% endfor %}
 
       {# Swap tables #}
@@ -120,21 +131,21 @@
     {% else %}
       {% if existing_relation.can_exchange %}
         -- We can do an atomic exchange, so no need for an intermediate
-        {% call statement('main') -%}
-          {{ get_create_table_as_sql(False, backup_relation, sql) }}
-        {%- endcall %}
+        {% do clickhouse__rebuild_table(backup_relation, existing_relation, sql) %}
         {% do exchange_tables_atomic(backup_relation, existing_relation) %}
       {% else %}
         -- We have to use an intermediate and rename accordingly
-        {% call statement('main') -%}
-          {{ get_create_table_as_sql(False, intermediate_relation, sql) }}
-        {%- endcall %}
+        {% do clickhouse__rebuild_table(intermediate_relation, existing_relation, sql) %}
         {{ adapter.rename_relation(existing_relation, backup_relation) }}
         {{ adapter.rename_relation(intermediate_relation, target_relation) }}
       {% endif %}
     {% endif %}
   {% endif %}
 
+  {% if build_fingerprint is not none and not unchanged %}
+    {% do adapter.set_model_state(target_relation, 'fingerprint', build_fingerprint) %}
+  {% endif %}
+
   -- cleanup
   {% set should_revoke = should_revoke(existing_relation, full_refresh_mode=True) %}
   {% do apply_grants(target_relation, grant_config, should_revoke=should_revoke) %}
@@ -153,6 +164,36 @@
 
 {% endmaterialization %}
 
+{#
+  Build `relation` to replace `existing_relation`. With `rebuild_predicate`, only the rows
+  selected by the predicate are built and the other partitions of the existing table are attached
+  to the new one, when its parts can be attached.
+#}
+{% macro clickhouse__rebuild_table(relation, existing_relation, sql) %}
+  {%- set predicate = config.get('rebuild_predicate') -%}
+  {% if predicate and existing_relation.is_table %}
+    {%- set has_contract = config.get('contract').enforced -%}
+    {{ clickhouse__create_empty_table(False, relation, sql, has_contract) }}
+    {%- set carried_partitions = adapter.plan_partition_carry_over(existing_relation, relation, predicate) -%}
+    {% if carried_partitions is none %}
+      {{ log('Partitions of ' ~ existing_relation.name ~ ' can not be carried over, rebuilding the whole table') }}
+      {% call statement('main') -%}
+        {{ clickhouse__insert_into(relation, sql, has_contract) }}
+      {%- endcall %}
+    {% else %}
+      {% call statement('main') -%}
+        {{ clickhouse__insert_into(relation, 'select * from (' ~ sql ~ '\n) where ' ~ predicate, has_contract) }}
+      {%- endcall %}
+      {{ log('Carrying ' ~ carried_partitions | length ~ ' partitions of ' ~ existing_relation.name ~ ' over') }}
+      {% do adapter.carry_over_partitions(existing_relation, relation, carried_partitions) %}
+    {% endif %}
+  {% else %}
+    {% call statement('main') -%}
+      {{ get_create_table_as_sql(False, relation, sql) }}
+    {%- endcall %}
+  {% endif %}
+{% endmacro %}
+
 {% macro engine_clause() %}
   engine = {{ config.get('engine', default='MergeTree()') }}
 {%- endmacro -%}
@@ -195,6 +236,15 @@
   {{ return(dbt_mvs) }}
 {% endmacro %}
 
+{#-
+  The query of a cached MV is the SQL of its model, not the query ClickHouse reformatted, so it can
+  end with a line comment, e.g. `-- materialization_target_table: ...`. The closing parenthesis
+  goes on its own line so the comment doesn't swallow it.
+-#}
+{% macro clickhouse__mv_repopulation_sql(mv_sql) %}
+  {{ return('SELECT * FROM (' ~ mv_sql ~ '\n)') }}
+{% endmacro %}
+
 {% macro partition_cols(label) %}
   {%- set cols = config.get('partition_by', validator=validation.any[list, basestring]) -%}
   {%- if cols is not none %}
@@ -355,7 +405,7 @@
 
 {%- endmacro %}
 
-{% macro clickhouse__insert_into(target_relation, sql, has_contract, use_columns_from_sql=False) %}
+{% macro clickhouse__insert_into(target_relation, sql, has_contract, use_columns_from_sql=False, query_settings=none) %}
   {% if use_columns_from_sql %}
     {% set dest_columns = clickhouse__get_columns_in_query(sql) %}
     {%- set ns = namespace(quoted_cols=[]) -%}
@@ -379,7 +429,7 @@
   {%- else -%}
       {{ sql }}
   {%- endif -%}
-  {{ adapter.get_model_query_settings(model) }}
+  {{ adapter.get_model_query_settings(model, query_settings) }}
 {%- endmacro %}
 
 {% macro codec_clause(codec_name) %}
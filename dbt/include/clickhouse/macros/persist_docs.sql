@@ -12,17 +12,19 @@
 
 {% macro clickhouse__persist_docs(relation, model, for_relation, for_columns) %}
   {%- set alter_comments = [] %}
+  {%- set persist_relation = for_relation and config.persist_relation_docs() and model.description -%}
+  {%- set persist_columns = for_columns and config.persist_column_docs() and model.columns -%}
+  {%- set existing_comments = clickhouse__get_relation_comments(relation) if (persist_relation or persist_columns) else {} -%}
 
-  {%- if for_relation and config.persist_relation_docs() and model.description -%}
+  {%- if persist_relation and existing_comments.get('') != model.description -%}
     {% set escaped_comment = clickhouse_escape_comment(model.description) %}
     {% do alter_comments.append("modify comment {comment}".format(comment=escaped_comment)) %}
   {%- endif -%}
 
-  {%- if for_columns and config.persist_column_docs() and model.columns -%}
-    {% set existing_columns = adapter.get_columns_in_relation(relation) | map(attribute="name") | list %}
-    {% for column_name in model.columns if (column_name in existing_columns) %}
+  {%- if persist_columns -%}
+    {% for column_name in model.columns if (column_name in existing_comments and column_name != '') %}
       {%- set comment = model.columns[column_name]['description'] -%}
-      {%- if comment %}
+      {%- if comment and existing_comments[column_name] != comment %}
         {% set escaped_comment = clickhouse_escape_comment(comment) %}
         {% do alter_comments.append("comment column `{column_name}` {comment}".format(column_name=column_name, comment=escaped_comment)) %}
       {%- endif %}
@@ -34,6 +36,25 @@
   {%- endif -%}
 {% endmacro %}
 
+{#
+  The current comments of a relation and its columns in one query, keyed by column name. The
+  comment of the relation itself has the key ''.
+#}
+{% macro clickhouse__get_relation_comments(relation) %}
+  {% set comments_sql %}
+    select '' as name, comment from system.tables
+    where database = '{{ relation.schema }}' and name = '{{ relation.identifier }}'
+    union all
+    select name, comment from system.columns
+    where database = '{{ relation.schema }}' and table = '{{ relation.identifier }}'
+  {% endset %}
+  {% set comments = {} %}
+  {% for row in run_query(comments_sql) %}
+    {% do comments.update({row[0]: row[1]}) %}
+  {% endfor %}
+  {{ return(comments) }}
+{% endmacro %}
+
 {#
   By using dollar-quoting like this, users can embed anything they want into their comments
   (including nested dollar-quoting), as long as they do not use this exact dollar-quoting
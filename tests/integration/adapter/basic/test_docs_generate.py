@@ -5,6 +5,38 @@ from dbt.tests.adapter.basic.test_docs_generate import (
     BaseDocsGenReferences,
     ref_sources__schema_yml,
 )
+from dbt.tests.util import AnyFloat
+
+
+def clickhouse_table_stats():
+    """Stats that the catalog reports for a table with active parts (from system.parts)."""
+    stats = {
+        'row_count': ('Row Count', 'Number of rows in the active parts of the table'),
+        'bytes_on_disk': (
+            'Bytes on Disk',
+            'Size of the active parts of the table on disk, in bytes',
+        ),
+        'compression_ratio': (
+            'Compression Ratio',
+            'Uncompressed data size divided by compressed data size',
+        ),
+        'part_count': ('Active Parts', 'Number of active data parts of the table'),
+    }
+    result = {
+        stat_id: {
+            'id': stat_id,
+            'label': label,
+            'value': AnyFloat(),
+            'description': description,
+            'include': True,
+        }
+        for stat_id, (label, description) in stats.items()
+    }
+    result['has_stats'] = {
+        **no_stats()['has_stats'],
+        'value': True,
+    }
+    return result
 
 
 class TestBaseDocsGenerate(BaseDocsGenerate):
@@ -19,6 +51,7 @@ class TestBaseDocsGenerate(BaseDocsGenerate):
             view_type="view",
             table_type="table",
             model_stats=no_stats(),
+            seed_stats=clickhouse_table_stats(),
         )
 
 
@@ -270,7 +303,9 @@ class TestBaseDocsGenReferences(BaseDocsGenReferences):
             bigint_type="UInt64",
             view_type="view",
             table_type="table",
-            model_stats=no_stats(),
+            model_stats=clickhouse_table_stats(),
+            seed_stats=clickhouse_table_stats(),
+            view_summary_stats=no_stats(),
         )
 
     @pytest.fixture(scope="class")
@@ -0,0 +1,13 @@
+import pytest
+from dbt.tests.adapter.basic.test_snapshot_check_cols import BaseSnapshotCheckCols
+
+
+class TestSnapshotCheckHash(BaseSnapshotCheckCols):
+    """The check_cols snapshot scenario, detecting changes through the stored dbt_check_hash"""
+
+    @pytest.fixture(scope="class")
+    def project_config_update(self):
+        return {
+            "name": "snapshot_strategy_check_cols",
+            "snapshots": {"+snapshot_check_hash": True},
+        }
@@ -0,0 +1,16 @@
+import pytest
+from dbt.tests.adapter.basic.test_snapshot_timestamp import BaseSnapshotTimestamp
+
+
+class TestSnapshotReplacePartitions(BaseSnapshotTimestamp):
+    """The timestamp snapshot scenario, merged by replacing changed partitions only"""
+
+    @pytest.fixture(scope="class")
+    def project_config_update(self):
+        return {
+            "name": "snapshot_strategy_timestamp",
+            "snapshots": {
+                "+snapshot_merge_strategy": "replace_partitions",
+                "+partition_by": "id % 4",
+            },
+        }
@@ -0,0 +1,75 @@
+import pytest
+from dbt.tests.util import relation_from_name, run_dbt
+
+facts_model = """
+{{ config(
+    materialized='table',
+    order_by='id',
+    partition_by='toYYYYMM(day)',
+    rebuild_predicate="day >= '2024-03-01'",
+    )
+}}
+select number as id,
+       toDate('2024-01-01') + number as day,
+       '{{ var("version", "v1") }}' as version
+from numbers(90)
+"""
+
+
+class TestPartitionCarryOver:
+    @pytest.fixture(scope="class")
+    def models(self):
+        return {"facts.sql": facts_model}
+
+    def versions(self, project):
+        relation = relation_from_name(project.adapter, "facts")
+        return project.run_sql(
+            f"select toYYYYMM(day), version, count() from {relation} group by all order by 1",
+            fetch="all",
+        )
+
+    def test_rebuild_only_selected_partitions(self, project):
+        run_dbt(["run"])
+        assert self.versions(project) == [
+            (202401, 'v1', 31),
+            (202402, 'v1', 29),
+            (202403, 'v1', 30),
+        ]
+
+        # Only March is rebuilt, January and February are attached from the previous table
+        run_dbt(["run", "--vars", "version: v2"])
+        assert self.versions(project) == [
+            (202401, 'v1', 31),
+            (202402, 'v1', 29),
+            (202403, 'v2', 30),
+        ]
+
+        run_dbt(["run", "--full-refresh", "--vars", "version: v3"])
+        assert self.versions(project) == [
+            (202401, 'v1', 31),
+            (202402, 'v1', 29),
+            (202403, 'v3', 30),
+        ]
+
+
+partial_predicate_model = """
+{{ config(
+    materialized='table',
+    order_by='id',
+    partition_by='toYYYYMM(day)',
+    rebuild_predicate="day >= '2024-01-15'",
+    )
+}}
+select number as id, toDate('2024-01-01') + number as day from numbers(40)
+"""
+
+
+class TestPartitionCarryOverPartialPredicate:
+    @pytest.fixture(scope="class")
+    def models(self):
+        return {"partial_facts.sql": partial_predicate_model}
+
+    def test_predicate_must_select_whole_partitions(self, project):
+        run_dbt(["run"])
+        results = run_dbt(["run"], expect_pass=False)
+        assert 'must select whole partitions' in results[0].message
@@ -0,0 +1,34 @@
+import pytest
+from dbt.tests.util import run_dbt
+
+dim_source = """
+{{ config(materialized='table', order_by='id') }}
+select number as id from numbers(10)
+"""
+
+dim_static = """
+{{ config(materialized='table', order_by='id', rebuild_if_unchanged=false) }}
+select id, now64(6) as built_at from {{ ref('dim_source') }}
+"""
+
+
+class TestRebuildIfUnchanged:
+    @pytest.fixture(scope="class")
+    def models(self):
+        return {
+            "dim_source.sql": dim_source,
+            "dim_static.sql": dim_static,
+        }
+
+    def test_skips_rebuild_until_upstream_changes(self, project):
+        run_dbt(["run"])
+        built_at = f'select max(built_at) from {project.test_schema}.dim_static'
+        first_build = project.run_sql(built_at, fetch='one')[0]
+
+        results = run_dbt(["run", "--select", "dim_static"])
+        assert results[0].adapter_response['code'] == 'SKIP'
+        assert project.run_sql(built_at, fetch='one')[0] == first_build
+
+        project.run_sql(f'insert into {project.test_schema}.dim_source values (10)')
+        run_dbt(["run", "--select", "dim_static"])
+        assert project.run_sql(built_at, fetch='one')[0] > first_build
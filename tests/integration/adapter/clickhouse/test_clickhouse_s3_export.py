@@ -0,0 +1,52 @@
+import os
+
+import pytest
+from dbt.tests.util import run_dbt
+
+# Bucket url of a local MinIO reachable from the ClickHouse server, e.g. the `minio` service of
+# the test docker compose: http://minio:9000/dbt-test
+minio_url = os.environ.get('DBT_CH_TEST_MINIO_URL', '')
+
+s3_export_model = """
+{{ config(
+    materialized='s3_export',
+    s3_config='export_s3',
+    export_s3={'path': '/events/{_partition_id}.parquet'},
+    partition_by='kind',
+    row_group_size=100,
+    )
+}}
+select number as id, number % 3 as kind from numbers(1000)
+"""
+
+
+@pytest.mark.skipif(not minio_url, reason='No MinIO bucket configured')
+class TestS3Export:
+    @pytest.fixture(scope="class")
+    def project_config_update(self):
+        return {
+            'vars': {
+                'export_s3': {
+                    'bucket': minio_url,
+                    'fmt': 'Parquet',
+                    'aws_access_key_id': 'minioadmin',
+                    'aws_secret_access_key': 'minioadmin',
+                    'cluster': False,
+                }
+            }
+        }
+
+    @pytest.fixture(scope="class")
+    def models(self):
+        return {"events_export.sql": s3_export_model}
+
+    def test_export_truncates_partitioned_files(self, project):
+        exported = (
+            f"select count(), uniqExact(_file) from s3('{minio_url}/events/*.parquet', "
+            "'minioadmin', 'minioadmin', 'Parquet')"
+        )
+        run_dbt(["run", "--select", "events_export"])
+        assert project.run_sql(exported, fetch="one") == (1000, 3)
+
+        run_dbt(["run", "--select", "events_export"])
+        assert project.run_sql(exported, fetch="one") == (1000, 3)
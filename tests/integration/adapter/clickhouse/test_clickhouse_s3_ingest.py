@@ -0,0 +1,84 @@
+import os
+
+import pytest
+from dbt.tests.util import run_dbt, run_dbt_and_capture
+
+# Bucket url of a local MinIO reachable from the ClickHouse server, e.g. the `minio` service of
+# the test docker compose: http://minio:9000/dbt-test
+minio_url = os.environ.get('DBT_CH_TEST_MINIO_URL', '')
+
+s3_ingest_model = """
+{{ config(
+    materialized='s3_ingest',
+    order_by='id',
+    s3_config='ingest_s3',
+    files_per_chunk=2,
+    )
+}}
+select id, _file as file from {{ clickhouse_s3source('ingest_s3') }}
+where {{ clickhouse_s3_new_files() }}
+"""
+
+s3_ingest_unfiltered_model = """
+{{ config(materialized='s3_ingest', order_by='id', s3_config='ingest_s3') }}
+select id from {{ clickhouse_s3source('ingest_s3') }}
+"""
+
+
+@pytest.mark.skipif(not minio_url, reason='No MinIO bucket configured')
+class TestS3Ingest:
+    @pytest.fixture(scope="class")
+    def project_config_update(self):
+        return {
+            'vars': {
+                'ingest_s3': {
+                    'bucket': minio_url,
+                    'path': '/ingest/*.parquet',
+                    'fmt': 'Parquet',
+                    'aws_access_key_id': 'minioadmin',
+                    'aws_secret_access_key': 'minioadmin',
+                    'structure': 'id UInt64',
+                    'cluster': False,
+                }
+            }
+        }
+
+    @pytest.fixture(scope="class")
+    def models(self):
+        return {
+            "events_ingest.sql": s3_ingest_model,
+            "unfiltered_ingest.sql": s3_ingest_unfiltered_model,
+        }
+
+    def _write_file(self, project, name, start):
+        project.run_sql(
+            f"insert into function s3('{minio_url}/ingest/{name}.parquet', 'minioadmin', "
+            f"'minioadmin', 'Parquet') select number as id from numbers({start}, 10) "
+            "settings s3_truncate_on_insert = 1"
+        )
+
+    def test_only_new_files_are_ingested(self, project):
+        for index in range(3):
+            self._write_file(project, f'part_{index}', index * 10)
+        run_dbt(["run", "--select", "events_ingest"])
+        table = f'{project.test_schema}.events_ingest'
+        assert project.run_sql(f'select count(), uniqExact(file) from {table}', fetch='one') == (
+            30,
+            3,
+        )
+
+        run_dbt(["run", "--select", "events_ingest"])
+        assert project.run_sql(f'select count() from {table}', fetch='one')[0] == 30
+
+        self._write_file(project, 'part_3', 30)
+        run_dbt(["run", "--select", "events_ingest"])
+        assert project.run_sql(f'select count() from {table}', fetch='one')[0] == 40
+
+        run_dbt(["run", "--select", "events_ingest", "--full-refresh"])
+        assert project.run_sql(f'select count() from {table}', fetch='one')[0] == 40
+        tracked = project.run_sql(f'select count() from {table}__dbt_s3_files', fetch='one')
+        assert tracked[0] == 4
+
+    def test_models_must_filter_new_files(self, project):
+        _, output = run_dbt_and_capture(["run", "--select", "unfiltered_ingest"], expect_pass=False)
+        assert 'must filter their files with clickhouse_s3_new_files()' in output
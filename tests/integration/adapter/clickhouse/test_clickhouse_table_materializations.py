@@ -160,6 +160,94 @@ class TestDistributedMaterializations(BaseSimpleMaterializations):
         assert 'Compilation Error' in result[0].message
 
 
+parallel_source_model = """
+{{ config(materialized='distributed_table', order_by='id', sharding_key='cityHash64(id)') }}
+select number as id, toString(number) as name from numbers(1000)
+"""
+
+parallel_target_model = """
+{{ config(
+       materialized='distributed_table',
+       order_by='id',
+       sharding_key='cityHash64(id)',
+       parallel_distributed_insert=true,
+) }}
+select id, upper(name) as name from {{ ref('parallel_source') }}
+"""
+
+reshard_target_model = """
+{{ config(
+       materialized='distributed_table',
+       order_by='id',
+       sharding_key='cityHash64(name)',
+       parallel_distributed_insert=true,
+) }}
+select id, name from {{ ref('parallel_source') }}
+"""
+
+grouped_target_model = """
+{{ config(materialized='distributed_table', order_by='id', sharding_key='cityHash64(id)') }}
+select id % 10 as id, count() as names from {{ ref('parallel_source') }} group by id
+"""
+
+
+class TestParallelDistributedInsert:
+    '''A distributed_table with parallel_distributed_insert reading from a Distributed table
+    sharded the same way inserts on each shard with parallel_distributed_insert_select=2'''
+
+    @pytest.fixture(scope="class")
+    def models(self):
+        return {
+            "parallel_source.sql": parallel_source_model,
+            "parallel_target.sql": parallel_target_model,
+            "reshard_target.sql": reshard_target_model,
+            "grouped_target.sql": grouped_target_model,
+        }
+
+    def parallel_insert_count(self, project, model_name):
+        project.run_sql("SYSTEM FLUSH LOGS")
+        return project.run_sql(
+            "select count() from system.query_log where type = 'QueryFinish' "
+            "and query_kind = 'Insert' "
+            "and Settings['parallel_distributed_insert_select'] = '2' "
+            f"and has(tables, '{project.test_schema}.{model_name}')",
+            fetch="one",
+        )[0]
+
+    @pytest.mark.skipif(
+        os.environ.get('DBT_CH_TEST_CLUSTER', '').strip() == '', reason='Not on a cluster'
+    )
+    def test_parallel_insert(self, project):
+        results = run_dbt(["run"])
+        assert len(results) == 4
+
+        assert self.parallel_insert_count(project, 'parallel_target') == 1
+        assert self.parallel_insert_count(project, 'reshard_target') == 0
+        assert self.parallel_insert_count(project, 'grouped_target') == 0
+        # Aggregated across shards by the initiator, one row per group
+        relation = relation_from_name(project.adapter, 'grouped_target')
+        result = project.run_sql(f"select count(), sum(names) from {relation}", fetch="one")
+        assert result == (10, 1000)
+        for model_name in ('parallel_target', 'reshard_target'):
+            relation = relation_from_name(project.adapter, model_name)
+            result = project.run_sql(f"select count(), uniqExact(id) from {relation}", fetch="one")
+            assert result == (1000, 1000)
+
+        # Every row is still on the shard its sharding key puts it on
+        cluster = project.test_config['cluster']
+        rows_per_host = []
+        for model_name in ('parallel_source_local', 'parallel_target_local'):
+            relation = relation_from_name(project.adapter, model_name)
+            rows_per_host.append(
+                project.run_sql(
+                    f"select hostName(), count(), sum(id) "
+                    f"from clusterAllReplicas('{cluster}', {relation}) group by 1 order by 1",
+                    fetch="all",
+                )
+            )
+        assert rows_per_host[0] == rows_per_host[1]
+
+
 class TestReplicatedTableMaterialization(BaseSimpleMaterializations):
     '''Test ReplicatedMergeTree table with table materialization'''
 
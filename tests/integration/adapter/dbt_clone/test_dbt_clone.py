@@ -1,3 +1,5 @@
+import os
+
 import pytest
 from dbt.tests.adapter.dbt_clone import fixtures
 from dbt.tests.adapter.dbt_clone.test_dbt_clone import (
@@ -105,3 +107,61 @@ class TestCloneNonMergeTreeBecomesView(BaseClone):
         # rather than being cloned as a table.
         assert len(schema_relations) == 1
         assert all(r.type == "view" for r in schema_relations)
+
+
+@pytest.mark.skipif(
+    os.environ.get('DBT_CH_TEST_CLUSTER', '').strip() == '', reason='Not on a cluster'
+)
+class TestCloneDistributedTable(BaseClone):
+    """A distributed table is cloned by cloning its local table on every shard and recreating
+    the Distributed table over the clone."""
+
+    @pytest.fixture(scope="class")
+    def models(self):
+        return {
+            "distributed_model.sql": "{{ config(materialized='distributed_table', order_by='id', "
+            "sharding_key='cityHash64(id)') }}\n"
+            "select number as id, toString(number) as name from numbers(100)",
+        }
+
+    @pytest.fixture(scope="class")
+    def snapshots(self):
+        return {}
+
+    @pytest.fixture(scope="class")
+    def seeds(self):
+        return {}
+
+    def test_distributed_table_cloned(self, project, unique_schema, other_schema):
+        project.create_test_schema(other_schema)
+
+        results = run_dbt(["run"])
+        assert len(results) == 1
+        self.copy_state(project.project_root)
+
+        clone_args = ["clone", "--state", "state", "--target", "otherschema"]
+        results = run_dbt(clone_args)
+        assert len(results) == 1
+
+        engines = project.run_sql(
+            f"select name, engine from system.tables where database = '{other_schema}' "
+            "order by name",
+            fetch="all",
+        )
+        assert engines == [
+            ('distributed_model', 'Distributed'),
+            ('distributed_model_local', 'MergeTree'),
+        ]
+        count = project.run_sql(
+            f"select count() from {other_schema}.distributed_model", fetch="one"
+        )
+        assert count[0] == 100
+
+        # The clone is isolated from the deferred table
+        project.run_sql(
+            f"truncate table {unique_schema}.distributed_model_local on cluster {project.test_config['cluster']}"
+        )
+        count = project.run_sql(
+            f"select count() from {other_schema}.distributed_model", fetch="one"
+        )
+        assert count[0] == 100
@@ -105,6 +105,23 @@ PEOPLE_DICT_MODEL = """
 select 1
 """
 
+# No LIFETIME, so only a run reloads the data of the unchanged dictionary
+PEOPLE_DICT_NO_LIFETIME_MODEL = """
+{{ config(
+       materialized='dictionary',
+       fields=[
+           ('id', 'UInt64'),
+           ('name', 'String'),
+       ],
+       primary_key='id',
+       layout='HASHED()',
+       source_type='clickhouse',
+       table='people'
+) }}
+
+select 1
+"""
+
 
 SEED_SCHEMA_YML = """
 version: 2
@@ -280,6 +297,34 @@ class TestTableDictionary:
         assert names == set(["Dade", "Kate", "Ksenia"])
 
 
+class TestUnchangedDictionaryReload:
+    @pytest.fixture(scope="class")
+    def seeds(self):
+        return {
+            "people.csv": PEOPLE_SEED_CSV,
+            "schema.yml": SEED_SCHEMA_YML,
+        }
+
+    @pytest.fixture(scope="class")
+    def models(self):
+        return {"people_dict.sql": PEOPLE_DICT_NO_LIFETIME_MODEL}
+
+    def test_unchanged_dictionary_is_reloaded(self, project):
+        run_dbt(["seed"])
+        results = run_dbt()
+        assert results[0].adapter_response['rows_affected'] == 3
+
+        project.run_sql(
+            "insert into people values (1232,'Dade',11,'engineering'), (9999,'Eugene',40,'malware')"
+        )
+        results = run_dbt()
+
+        assert results[0].adapter_response['rows_affected'] == 5
+        assert results[0].adapter_response['bytes_allocated'] > 0
+        result = project.run_sql("select count() from people_dict", fetch="one")
+        assert result[0] == 5
+
+
 class TestHttpDictionary:
     @pytest.fixture(scope="class")
     def models(self):
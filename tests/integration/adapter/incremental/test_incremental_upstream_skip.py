@@ -0,0 +1,71 @@
+import pytest
+from dbt.tests.util import run_dbt, write_file
+
+events_source = """
+{{ config(materialized='table', order_by='id') }}
+select number as id from numbers(10)
+"""
+
+events_append = """
+{{ config(
+    materialized='incremental',
+    order_by='id',
+    skip_if_upstream_unchanged=true,
+    )
+}}
+select id from {{ ref('events_source') }}
+"""
+
+events_from_numbers = """
+{{ config(
+    materialized='incremental',
+    order_by='id',
+    skip_if_upstream_unchanged=true,
+    )
+}}
+select number as id from numbers(5)
+"""
+
+
+class TestUpstreamUnchangedSkips:
+    @pytest.fixture(scope="class")
+    def models(self):
+        return {
+            "events_source.sql": events_source,
+            "events_append.sql": events_append,
+        }
+
+    def test_skips_until_upstream_changes(self, project):
+        run_dbt(["run"])
+        appended = f'select count() from {project.test_schema}.events_append'
+        assert project.run_sql(appended, fetch='one')[0] == 10
+
+        results = run_dbt(["run", "--select", "events_append"])
+        assert results[0].adapter_response['code'] == 'SKIP'
+        assert project.run_sql(appended, fetch='one')[0] == 10
+
+        project.run_sql(f'insert into {project.test_schema}.events_source values (10)')
+        run_dbt(["run", "--select", "events_append"])
+        assert project.run_sql(appended, fetch='one')[0] == 21
+
+        changed_sql = events_append.replace(
+            "ref('events_source') }}", "ref('events_source') }} where id < 5"
+        )
+        write_file(changed_sql, project.project_root, "models", "events_append.sql")
+        results = run_dbt(["run", "--select", "events_append"])
+        assert results[0].adapter_response['code'] != 'SKIP'
+        assert project.run_sql(appended, fetch='one')[0] == 26
+
+
+class TestNoUpstreamRelationsNeverSkips:
+    @pytest.fixture(scope="class")
+    def models(self):
+        return {"events_from_numbers.sql": events_from_numbers}
+
+    def test_runs_every_time(self, project):
+        run_dbt(["run"])
+        results = run_dbt(["run"])
+
+        assert results[0].adapter_response['code'] != 'SKIP'
+        appended = f'select count() from {project.test_schema}.events_from_numbers'
+        assert project.run_sql(appended, fetch='one')[0] == 10
@@ -0,0 +1,70 @@
+"""
+test the full refresh of a materialized view with `handoff_watermark`, which must not lose or
+duplicate rows inserted into the source while it runs
+"""
+
+import threading
+import time
+
+import pytest
+from dbt.tests.util import run_dbt
+
+HANDOFF_MV_MODEL = """
+{{ config(
+       materialized='materialized_view',
+       engine='MergeTree()',
+       order_by='(id)',
+       handoff_watermark='inserted_at',
+       handoff_lag_seconds=2,
+) }}
+
+select id, inserted_at from {{ this.schema }}.handoff_source
+"""
+
+
+class TestMaterializedViewHandoff:
+    @pytest.fixture(scope="class")
+    def models(self):
+        return {"handoff_mv.sql": HANDOFF_MV_MODEL}
+
+    def test_full_refresh_keeps_concurrent_inserts(self, project):
+        schema = project.test_schema
+        project.run_sql(
+            f"create table {schema}.handoff_source (id UInt64, inserted_at DateTime default now()) "
+            "engine MergeTree() order by id"
+        )
+        project.run_sql(f"insert into {schema}.handoff_source (id) select number from numbers(100)")
+        run_dbt()
+
+        stop = threading.Event()
+
+        def insert_rows():
+            next_id = 100
+            while not stop.is_set():
+                project.run_sql(f"insert into {schema}.handoff_source (id) values ({next_id})")
+                next_id += 1
+                time.sleep(0.1)
+
+        inserter = threading.Thread(target=insert_rows)
+        inserter.start()
+        try:
+            run_dbt(["run", "--full-refresh"])
+        finally:
+            stop.set()
+            inserter.join()
+
+        (source_count,) = project.run_sql(
+            f"select count() from {schema}.handoff_source", fetch="one"
+        )
+        target_count, unique_ids = project.run_sql(
+            f"select count(), uniqExact(id) from {schema}.handoff_mv", fetch="one"
+        )
+        assert source_count > 100
+        assert target_count == unique_ids == source_count
+
+        handoff_relations = project.run_sql(
+            f"select count() from system.tables where database = '{schema}' "
+            "and name like '%dbt_handoff%'",
+            fetch="one",
+        )
+        assert handoff_relations[0] == 0
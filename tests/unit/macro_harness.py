@@ -46,6 +46,18 @@ class SandboxSafeMock(MagicMock):
     alters_data = False
 
 
+def config_mock(**values: Any) -> SandboxSafeMock:
+    """A ``config`` variable that holds ``values``.
+
+    ``config.get`` returns its default for a missing key, and ``config.require`` raises
+    ``KeyError``.
+    """
+    config = SandboxSafeMock()
+    config.get.side_effect = lambda key, default=None: values.get(key, default)
+    config.require.side_effect = lambda key: values[key]
+    return config
+
+
 class MacroHarness:
     """Calls a macro from ``dbt/include/clickhouse/macros`` by name, and resolves the
     macros it calls in turn.
@@ -64,7 +76,7 @@ class MacroHarness:
 
     Some macros read variables from the dbt context, for example ``adapter``, ``config``,
     ``this``, or ``run_query``. Put these variables in ``context``. Use
-    ``SandboxSafeMock`` for each variable::
+    ``SandboxSafeMock`` for each variable, or ``config_mock`` for ``config``::
 
         def test_on_cluster_clause(macros):
             adapter = SandboxSafeMock()
@@ -0,0 +1,162 @@
+from dbt.adapters.clickhouse.cache import ClickHouseRelationsCache, ReferenceKey
+from dbt.adapters.clickhouse.relation import ClickHouseRelation
+
+
+def _table(identifier, **kwargs):
+    return ClickHouseRelation.create(schema='analytics', identifier=identifier, **kwargs)
+
+
+def _mv(identifier):
+    return _table(identifier, type='materialized_view')
+
+
+def _cached(cache, identifier):
+    return cache.relations[ReferenceKey('analytics', identifier)].inner
+
+
+def test_exchange_swaps_relations_but_keeps_mvs_with_the_name():
+    cache = ClickHouseRelationsCache()
+    mv = {'schema': 'analytics', 'name': 'events_mv', 'sql': 'select 1'}
+    cache.add(_table('events', type='table', can_exchange=True, mvs_pointing_to_it=[mv]))
+    cache.add(_table('events__dbt_backup', type='view'))
+
+    cache.exchange(_table('events__dbt_backup'), _table('events'))
+
+    events = _cached(cache, 'events')
+    backup = _cached(cache, 'events__dbt_backup')
+    assert events.type == 'view'
+    assert events.mvs_pointing_to_it == [mv]
+    assert backup.type == 'table'
+    assert backup.can_exchange
+    assert backup.mvs_pointing_to_it == []
+
+
+def test_exchange_with_uncached_staging_relation_adds_it():
+    cache = ClickHouseRelationsCache()
+    cache.add(_table('events', type='table', can_exchange=True))
+
+    cache.exchange(_table('events__dbt_backup', type='table'), _table('events'))
+
+    assert _cached(cache, 'events').can_exchange
+    assert _cached(cache, 'events__dbt_backup').can_exchange
+    assert _cached(cache, 'events').identifier == 'events'
+    assert _cached(cache, 'events__dbt_backup').identifier == 'events__dbt_backup'
+
+
+def test_add_mv_registers_the_view_on_its_target():
+    cache = ClickHouseRelationsCache()
+    cache.add(_table('events', type='table'))
+
+    cache.add_mv(_mv('events_mv'), _table('events'), 'select 1 as id')
+
+    assert _cached(cache, 'events_mv').type == 'materialized_view'
+    assert _cached(cache, 'events').mvs_pointing_to_it == [
+        {'schema': 'analytics', 'name': 'events_mv', 'sql': 'select 1 as id'}
+    ]
+
+
+def test_add_mv_moves_the_view_to_its_new_target():
+    cache = ClickHouseRelationsCache()
+    cache.add(_table('old_target', type='table'))
+    cache.add(_table('new_target', type='table'))
+    cache.add_mv(_mv('events_mv'), _table('old_target'), 'select 1')
+
+    cache.add_mv(_mv('events_mv'), _table('new_target'), 'select 2')
+
+    assert _cached(cache, 'old_target').mvs_pointing_to_it == []
+    assert _cached(cache, 'new_target').mvs_pointing_to_it == [
+        {'schema': 'analytics', 'name': 'events_mv', 'sql': 'select 2'}
+    ]
+
+
+def test_update_mv_query_changes_the_sql_of_the_view():
+    cache = ClickHouseRelationsCache()
+    cache.add(_table('events', type='table'))
+    cache.add_mv(_mv('events_mv'), _table('events'), 'select 1')
+
+    cache.update_mv_query(_mv('events_mv'), 'select 2')
+
+    assert _cached(cache, 'events').mvs_pointing_to_it[0]['sql'] == 'select 2'
+
+
+def test_drop_mv_removes_it_from_its_target():
+    cache = ClickHouseRelationsCache()
+    cache.add(_table('events', type='table'))
+    cache.add_mv(_mv('events_mv'), _table('events'), 'select 1')
+
+    cache.drop(_mv('events_mv'))
+
+    assert ReferenceKey('analytics', 'events_mv') not in cache.relations
+    assert _cached(cache, 'events').mvs_pointing_to_it == []
+
+
+def test_replace_overwrites_stale_entry_and_keeps_mvs():
+    cache = ClickHouseRelationsCache()
+    mv = {'schema': 'analytics', 'name': 'lookup_mv', 'sql': 'select 1'}
+    cache.add(_table('lookup', type='table', mvs_pointing_to_it=[mv]))
+
+    cache.replace(_table('lookup', type='dictionary'))
+
+    assert _cached(cache, 'lookup').type == 'dictionary'
+    assert _cached(cache, 'lookup').mvs_pointing_to_it == [mv]
+
+
+def test_mv_target_is_found_through_the_cached_target():
+    cache = ClickHouseRelationsCache()
+    cache.add(_table('events', type='table'))
+    cache.add_mv(_mv('events_mv'), _table('events'), 'select 1')
+
+    assert cache.mv_target(_mv('events_mv')) == ReferenceKey('analytics', 'events')
+    assert cache.mv_target(_mv('other_mv')) is None
+
+
+def test_rename_leaves_mvs_with_the_name():
+    cache = ClickHouseRelationsCache()
+    mv = {'schema': 'analytics', 'name': 'events_mv', 'sql': 'select 1'}
+    cache.add(_table('events', type='table', mvs_pointing_to_it=[mv]))
+    cache.add(_table('events__dbt_tmp', type='table'))
+
+    cache.rename(_table('events'), _table('events__dbt_backup'))
+    cache.rename(_table('events__dbt_tmp'), _table('events'))
+
+    assert _cached(cache, 'events__dbt_backup').mvs_pointing_to_it == []
+    assert _cached(cache, 'events').mvs_pointing_to_it == [mv]
+
+
+def test_recreated_target_gets_the_mvs_of_its_name():
+    cache = ClickHouseRelationsCache()
+    cache.add(_table('events', type='table'))
+    cache.add_mv(_mv('events_mv'), _table('events'), 'select 1')
+
+    cache.drop(_table('events'))
+    cache.add(_table('events', type='table'))
+
+    assert _cached(cache, 'events').mvs_pointing_to_it == [
+        {'schema': 'analytics', 'name': 'events_mv', 'sql': 'select 1'}
+    ]
+
+
+def test_dropped_mv_is_not_bound_again():
+    cache = ClickHouseRelationsCache()
+    cache.add(_table('events', type='table'))
+    cache.add_mv(_mv('events_mv'), _table('events'), 'select 1')
+
+    cache.drop(_table('events'))
+    cache.drop(_mv('events_mv'))
+    cache.add(_table('events', type='table'))
+
+    assert _cached(cache, 'events').mvs_pointing_to_it == []
+
+
+def test_repopulation_query_of_a_cached_mv_ends_after_its_comments(macros):
+    cache = ClickHouseRelationsCache()
+    cache.add(_table('events', type='table'))
+    model_sql = 'select id from raw\n-- materialization_target_table: `analytics`.`events`'
+    cache.add_mv(_mv('events_mv'), _table('events'), model_sql)
+
+    mv_info = _cached(cache, 'events').mvs_pointing_to_it[0]
+
+    assert macros.call('clickhouse__mv_repopulation_sql', mv_info['sql']) == (
+        'SELECT * FROM (select id from raw\n'
+        '-- materialization_target_table: `analytics`.`events`\n)'
+    )
@@ -43,3 +43,40 @@ def test_get_filtered_catalog_uses_relation_scoped_fetch_for_small_relation_sets
     assert catalog.predicate is not None
     assert catalog.predicate(FakeRow(table_schema='analytics', table_name='orders'))
     assert not catalog.predicate(FakeRow(table_schema='analytics', table_name='customers'))
+
+
+def _normalize(sql: str) -> str:
+    return ' '.join(sql.split())
+
+
+def test_catalog_results_sql_includes_table_stats(macros):
+    sql = _normalize(
+        macros.call(
+            'get_catalog_results_sql',
+            "where columns.database = 'analytics'",
+            "where parts.database = 'analytics'",
+        )
+    )
+
+    for stat in ('row_count', 'bytes_on_disk', 'compression_ratio', 'part_count'):
+        for key in ('label', 'value', 'description', 'include'):
+            assert f'as "stats:{stat}:{key}"' in sql
+    # a single aggregated pass over system.parts, scoped like the column rows
+    assert sql.count('from system.parts') == 1
+    assert "from system.parts as parts where parts.database = 'analytics' and parts.active" in sql
+    assert 'group by parts.database, parts.table' in sql
+
+
+def test_catalog_relations_where_clause_scopes_parts_by_alias(macros):
+    relations = [ClickHouseRelation.create(schema='analytics', identifier='orders')]
+
+    columns_where = _normalize(
+        macros.call('get_catalog_relations_where_clause_sql', relations, context={})
+    )
+    parts_where = _normalize(
+        macros.call('get_catalog_relations_where_clause_sql', relations, 'parts', context={})
+    )
+
+    assert "columns.database = 'analytics' and columns.table = 'orders'" in columns_where
+    assert "parts.database = 'analytics' and parts.table = 'orders'" in parts_where
+    assert 'columns.' not in parts_where
@@ -0,0 +1,63 @@
+from dbt.adapters.clickhouse.relation import ClickHouseRelation
+
+from tests.unit.macro_harness import SandboxSafeMock, config_mock
+
+PROD = ClickHouseRelation.create(schema='prod', identifier='events')
+CI = ClickHouseRelation.create(schema='ci', identifier='events')
+
+
+def _clone(macros, **config):
+    queries, schemas = [], []
+    adapter = SandboxSafeMock()
+    adapter.get_clickhouse_local_suffix.return_value = '_local'
+    adapter.get_clickhouse_local_db_prefix.return_value = ''
+    sql = macros.call(
+        'clickhouse__create_or_replace_clone',
+        CI,
+        PROD,
+        context={
+            'config': config_mock(**config),
+            'adapter': adapter,
+            'run_query': lambda sql: queries.append(' '.join(sql.split())),
+            'create_schema': schemas.append,
+            'on_cluster_clause': lambda relation: 'ON CLUSTER "c"',
+            'create_distributed_table': lambda relation, local: (
+                f'create or replace table {relation} as {local} ENGINE = Distributed(...)'
+            ),
+        },
+    )
+    return ' '.join(sql.split()), queries, schemas
+
+
+def test_can_clone_merge_tree_and_distributed_tables(macros):
+    for materialized in ('table', 'distributed_table', 'distributed_incremental'):
+        can_clone = macros.call(
+            'clickhouse__can_clone_table',
+            context={
+                'config': config_mock(materialized=materialized, engine='ReplacingMergeTree()')
+            },
+        )
+        assert can_clone is True
+    assert (
+        macros.call('clickhouse__can_clone_table', context={'config': config_mock(engine='Log')})
+        is False
+    )
+
+
+def test_clone_table(macros):
+    sql, queries, _ = _clone(macros, materialized='table')
+
+    assert sql == 'CREATE OR REPLACE TABLE `ci`.`events` ON CLUSTER "c" CLONE AS `prod`.`events`'
+    assert queries == []
+
+
+def test_clone_distributed_table_clones_the_local_table(macros):
+    sql, queries, schemas = _clone(macros, materialized='distributed_table')
+
+    assert [str(schema) for schema in schemas] == ['`ci`.`events_local`']
+    assert queries == [
+        'CREATE OR REPLACE TABLE `ci`.`events_local` ON CLUSTER "c" CLONE AS `prod`.`events_local`'
+    ]
+    assert sql == (
+        'create or replace table `ci`.`events` as `ci`.`events_local` ENGINE = Distributed(...)'
+    )
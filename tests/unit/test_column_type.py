@@ -0,0 +1,70 @@
+import pytest
+from dbt.adapters.clickhouse.column import ClickHouseColumn
+from dbt.adapters.clickhouse.column_type import ClickHouseType, parse_type
+
+
+@pytest.mark.parametrize(
+    'type_str',
+    [
+        'UInt64',
+        'Nullable(String)',
+        'LowCardinality(Nullable(String))',
+        'Array(Array(Nullable(FixedString(16))))',
+        'Map(String, Array(Decimal(18, 4)))',
+        'Tuple(id UInt64, tags Array(String))',
+        "DateTime64(3, 'Europe/Amsterdam')",
+        "Enum8('a' = 1, 'b' = -2)",
+        'AggregateFunction(quantiles(0.5, 0.9), UInt64)',
+        'Dynamic(max_types=10)',
+    ],
+)
+def test_parse_type_round_trips(type_str):
+    assert str(parse_type(type_str)) == type_str
+
+
+def test_parse_type_builds_nested_structure():
+    parsed = parse_type('Map(String, Tuple(id UInt64, score Nullable(Float64)))')
+
+    key_type, value_type = parsed.type_params
+    assert parsed.name == 'Map'
+    assert key_type == ClickHouseType('String')
+    assert [param.field_name for param in value_type.type_params] == ['id', 'score']
+    assert value_type.type_params[1].inner == ClickHouseType('Float64')
+
+
+def test_parse_type_normalizes_whitespace_and_is_memoized():
+    assert str(parse_type(' Decimal( 10 ,2 ) ')) == 'Decimal(10, 2)'
+    assert parse_type('Array(String)') is parse_type('Array(String)')
+
+
+def test_unparseable_type_is_kept_verbatim():
+    assert str(parse_type("JSON(SKIP REGEXP '^tmp')")) == "JSON(SKIP REGEXP '^tmp')"
+
+
+@pytest.mark.parametrize(
+    'dtype,precision,scale',
+    [('Decimal(6, 6)', 6, 6), ('Decimal(12)', 12, 0), ('Decimal64(4)', 18, 4)],
+)
+def test_column_decimal_precision_and_scale(dtype, precision, scale):
+    column = ClickHouseColumn('price', dtype)
+
+    assert (column.numeric_precision, column.numeric_scale) == (precision, scale)
+    assert column.data_type == f'Decimal({precision}, {scale})'
+
+
+def test_column_unwraps_low_cardinality_nullable():
+    column = ClickHouseColumn('name', "LowCardinality(Nullable(FixedString(8)))")
+
+    assert column.is_low_cardinality and column.is_nullable
+    assert column.dtype == 'FixedString(8)'
+    assert column.char_size == 8
+    assert column.data_type == 'LowCardinality(Nullable(String))'
+
+
+def test_column_data_type_follows_field_changes():
+    column = ClickHouseColumn('id', 'UInt32')
+    assert column.data_type == 'UInt32'
+
+    column.is_nullable = True
+
+    assert column.data_type == 'Nullable(UInt32)'
@@ -0,0 +1,52 @@
+from tests.unit.macro_harness import SandboxSafeMock
+
+MAGIC = '$dbt_comment_literal_block$'
+
+
+def _persist_docs(macros, comments, description='Events', columns=None):
+    queries = []
+
+    def run_query(sql):
+        queries.append(' '.join(sql.split()))
+        return comments if len(queries) == 1 else None
+
+    relation = SandboxSafeMock(schema='analytics', identifier='events')
+    relation.__str__.return_value = '`analytics`.`events`'
+    model = SandboxSafeMock(description=description)
+    model.columns = columns or {
+        'id': {'description': 'Event id'},
+        'kind': {'description': 'Event kind'},
+        'dropped': {'description': 'Not in the table'},
+    }
+    adapter = SandboxSafeMock()
+    adapter.is_before_version.return_value = False
+    macros.call(
+        'clickhouse__persist_docs',
+        relation,
+        model,
+        True,
+        True,
+        context={
+            'adapter': adapter,
+            'run_query': run_query,
+            'on_cluster_clause': lambda relation: '',
+            'config': SandboxSafeMock(),
+        },
+    )
+    return queries
+
+
+def test_unchanged_comments_are_not_altered(macros):
+    queries = _persist_docs(macros, [('', 'Events'), ('id', 'Event id'), ('kind', 'Event kind')])
+
+    assert len(queries) == 1
+    assert 'from system.tables' in queries[0] and 'from system.columns' in queries[0]
+
+
+def test_only_changed_comments_are_altered(macros):
+    queries = _persist_docs(macros, [('', 'Old events'), ('id', 'Event id'), ('kind', '')])
+
+    assert queries[1] == (
+        f'alter table `analytics`.`events` modify comment {MAGIC}Events{MAGIC}, '
+        f'comment column `kind` {MAGIC}Event kind{MAGIC}'
+    )
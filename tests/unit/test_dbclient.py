@@ -7,7 +7,11 @@ import pytest
 from clickhouse_connect.driver.exceptions import OperationalError
 from clickhouse_connect.driver.httputil import all_managers
 from dbt.adapters.clickhouse.credentials import ClickHouseCredentials
-from dbt.adapters.clickhouse.dbclient import ND_MUTATION_SETTING, ChRetryableException
+from dbt.adapters.clickhouse.dbclient import (
+    ND_MUTATION_SETTING,
+    ChRetryableException,
+    statement_kind,
+)
 from dbt.adapters.clickhouse.httpclient import ChHttpClient
 from dbt_common.exceptions import DbtConfigError, DbtDatabaseError
 from urllib3.poolmanager import ProxyManager
@@ -26,6 +30,7 @@ def mock_ch_client():
 def reset_process_caches():
     dbclient_module._ensured_databases.clear()
     dbclient_module._nd_mutation_probe = None
+    dbclient_module._max_threads_probe = None
     yield
 
 
@@ -416,3 +421,129 @@ def test_dedicated_pool_honors_env_proxy(mock_ch_client):
     assert isinstance(client._dedicated_pool, ProxyManager)
     assert str(client._dedicated_pool.proxy.url) == 'http://proxy.example:3128'
     client.close()
+
+
+@pytest.mark.parametrize(
+    'sql,kind',
+    [
+        ('insert into db.t (a, b) select a, b from db.s', 'bulk_insert'),
+        (
+            '/* {"app": "dbt"} */\n  INSERT INTO db.t\nWITH x AS (SELECT 1) SELECT * FROM x',
+            'bulk_insert',
+        ),
+        (
+            "insert into function s3('http://b/k.parquet', 'Parquet') select * from db.t",
+            'bulk_insert',
+        ),
+        ("insert into db.t (a) values ('select')", None),
+        ('insert into db.t format Native', None),
+        ('create temporary table t engine Memory as (select 1)', 'bulk_insert'),
+        ('create table db.t engine MergeTree order by a as select 1 as a', 'bulk_insert'),
+        ('create table db.t engine MergeTree order by a empty as (select 1 as a)', None),
+        ('create table db.t as db.s', None),
+        ("select name from system.tables where database = 'db'", 'metadata'),
+        ("select * from clusterAllReplicas('c', system.parts)", 'metadata'),
+        ('-- comment\nEXISTS DATABASE `db`', 'metadata'),
+        ('describe table db.t', 'metadata'),
+        ('select * from db.t where a in (select a from system.one)', None),
+        ('alter table db.t delete where a = 1', None),
+    ],
+)
+def test_statement_kind(sql, kind):
+    assert statement_kind(sql) == kind
+
+
+def _credentials(**kwargs):
+    return ClickHouseCredentials(
+        host='localhost', port=8123, user='default', password='', schema='default', **kwargs
+    )
+
+
+def _last_settings(mock_ch_client, method):
+    return getattr(mock_ch_client.return_value, method).call_args.kwargs.get('settings')
+
+
+def test_bulk_insert_settings(mock_ch_client):
+    mock_ch_client.return_value.server_settings = {
+        'max_threads': SimpleNamespace(value="'auto(16)'", readonly=0)
+    }
+    client = ChHttpClient(_credentials())
+    client.command('insert into db.t select * from db.s', query_id='q1')
+    assert _last_settings(mock_ch_client, 'command') == {
+        'query_id': 'q1',
+        'max_insert_threads': '16',
+    }
+    client.query("select name from system.tables where database = 'db'")
+    assert _last_settings(mock_ch_client, 'query') == {'max_threads': '1'}
+    client.command('alter table db.t delete where 1')
+    assert _last_settings(mock_ch_client, 'command') is None
+
+
+def test_bulk_insert_threads_without_server_max_threads(mock_ch_client):
+    client = ChHttpClient(_credentials())
+    client.command('insert into db.t select * from db.s')
+    assert 'max_insert_threads' not in _last_settings(mock_ch_client, 'command')
+
+
+def test_statement_settings_overrides(mock_ch_client):
+    """Connection custom_settings and explicit settings win, null disables a built in setting"""
+    mock_ch_client.return_value.server_settings = {
+        'max_threads': SimpleNamespace(value='8', readonly=0)
+    }
+    client = ChHttpClient(
+        _credentials(
+            custom_settings={'max_insert_block_size': '65536'},
+            statement_settings={
+                'bulk_insert': {
+                    'max_insert_threads': None,
+                    'max_insert_block_size': '4194304',
+                    'min_insert_block_size_rows': '4194304',
+                },
+                'metadata': {'max_threads': '2'},
+            },
+        )
+    )
+    client.command(
+        'insert into db.t select * from db.s',
+        settings={'parallel_distributed_insert_select': '2'},
+    )
+    assert _last_settings(mock_ch_client, 'command') == {
+        'parallel_distributed_insert_select': '2',
+        'min_insert_block_size_rows': '4194304',
+    }
+    client.query('show tables')
+    assert _last_settings(mock_ch_client, 'query') == {'max_threads': '2'}
+
+
+def test_query_settings_of_the_statement_win(mock_ch_client):
+    mock_ch_client.return_value.server_settings = {
+        'max_threads': SimpleNamespace(value='8', readonly=0)
+    }
+    client = ChHttpClient(
+        _credentials(statement_settings={'bulk_insert': {'max_insert_block_size': '4194304'}})
+    )
+    client.command(
+        'insert into db.t select * from db.s\n'
+        '-- settings_section\n'
+        'SETTINGS max_insert_threads=2, max_insert_block_size=65536'
+    )
+    assert _last_settings(mock_ch_client, 'command') == {}
+
+
+def test_statement_settings_leave_the_callers_settings_unchanged(mock_ch_client):
+    mock_ch_client.return_value.server_settings = {
+        'max_threads': SimpleNamespace(value='8', readonly=0)
+    }
+    client = ChHttpClient(_credentials())
+    settings = {'max_memory_usage': '1000000'}
+    client.command('insert into db.t select * from db.s', settings=settings)
+    assert settings == {'max_memory_usage': '1000000'}
+    assert _last_settings(mock_ch_client, 'command') == {
+        'max_memory_usage': '1000000',
+        'max_insert_threads': '8',
+    }
+
+
+def test_unknown_statement_settings_kind(mock_ch_client):
+    with pytest.raises(DbtConfigError, match='Unknown statement_settings kinds ddl'):
+        ChHttpClient(_credentials(statement_settings={'ddl': {'max_threads': 1}}))
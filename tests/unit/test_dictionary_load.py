@@ -0,0 +1,191 @@
+import hashlib
+from unittest.mock import MagicMock, patch
+
+import pytest
+from dbt.adapters.clickhouse.credentials import ClickHouseCredentials
+from dbt.adapters.clickhouse.dictionary import (
+    DictionaryLoadResponse,
+    SourceProfile,
+    advise_layout,
+    dictionary_keys,
+    wait_for_dictionary,
+)
+from dbt.adapters.clickhouse.impl import ClickHouseAdapter
+from dbt.adapters.clickhouse.relation import ClickHouseRelation
+from dbt_common.exceptions import DbtRuntimeError
+
+from tests.unit.macro_harness import SandboxSafeMock, config_mock
+
+DICTIONARY = ClickHouseRelation.create(schema='analytics', identifier='zones')
+
+
+def _handle(*rows):
+    handle = MagicMock()
+    handle.query.side_effect = [MagicMock(result_set=[row]) for row in rows]
+    return handle
+
+
+def test_wait_for_dictionary_polls_until_loaded():
+    handle = _handle(
+        ('LOADING', 0, 0, 0.0, ''),
+        ('LOADED_AND_RELOADING', 10, 1024, 0.1, ''),
+        ('LOADED', 265, 2097152, 0.25, ''),
+    )
+    sleeps = []
+
+    stats = wait_for_dictionary(handle, DICTIONARY, sleep=sleeps.append)
+
+    assert sleeps == [0.5, 1.0]
+    assert str(stats) == 'LOADED 265 elements, 2.0 MiB in 0.25s'
+    response = DictionaryLoadResponse.from_stats(stats).to_dict()
+    assert response['rows_affected'] == 265
+    assert response['bytes_allocated'] == 2097152
+
+
+def test_failed_dictionary_load_raises():
+    handle = _handle(('FAILED', 0, 0, 0.0, 'Table analytics.src does not exist'))
+
+    with pytest.raises(DbtRuntimeError, match='FAILED: Table analytics.src does not exist'):
+        wait_for_dictionary(handle, DICTIONARY)
+
+
+def test_dictionary_status_reads_system_dictionaries():
+    adapter = ClickHouseAdapter.__new__(ClickHouseAdapter)
+    conn = MagicMock()
+    conn.handle = _handle(('NOT_LOADED', 0, 0, 0.0, ''))
+    adapter.connections = MagicMock()
+    adapter.connections.get_if_exists.return_value = conn
+
+    assert adapter.dictionary_status(DICTIONARY) == 'NOT_LOADED'
+    assert "WHERE database = 'analytics' AND name = 'zones'" in conn.handle.query.call_args.args[0]
+
+
+def test_fingerprint_ignores_formatting(macros):
+    fingerprint = macros.call(
+        'clickhouse__dictionary_fingerprint',
+        'CREATE OR REPLACE DICTIONARY d\n  (id UInt64)',
+        context={'local_md5': lambda value: hashlib.md5(value.encode()).hexdigest()},
+    )
+
+    expected = hashlib.md5(b'CREATE OR REPLACE DICTIONARY d (id UInt64)').hexdigest()
+    assert fingerprint == expected
+
+
+def _profile(rows, max_key=None, value_bytes=8.0, key_bytes=8.0):
+    return SourceProfile(
+        rows, rows, 0 if max_key is not None else None, max_key, key_bytes, value_bytes
+    )
+
+
+@pytest.mark.parametrize(
+    'simple_key,attributes,profile,layout',
+    [
+        (True, 1, _profile(1000, max_key=1200), 'FLAT()'),
+        (True, 1, _profile(900_000, max_key=1_000_000), 'FLAT(MAX_ARRAY_SIZE 1000001)'),
+        (True, 1, _profile(1000, max_key=10**12), 'HASHED()'),
+        (True, 3, _profile(1000, max_key=10**12), 'HASHED_ARRAY()'),
+        (False, 1, _profile(50_000_000), 'COMPLEX_KEY_SPARSE_HASHED(SHARDS 16)'),
+        (False, 2, _profile(50_000_000), 'COMPLEX_KEY_HASHED_ARRAY()'),
+    ],
+)
+def test_advise_layout(simple_key, attributes, profile, layout):
+    assert advise_layout(simple_key, attributes, profile).layout == layout
+
+
+@pytest.mark.parametrize(
+    'simple_key,layout', [(True, 'RANGE_HASHED()'), (False, 'COMPLEX_KEY_RANGE_HASHED()')]
+)
+def test_advise_layout_for_range_dictionaries(simple_key, layout):
+    profile = _profile(1000, max_key=1200 if simple_key else None)
+    assert advise_layout(simple_key, 3, profile, ranged=True).layout == layout
+
+
+def test_simple_keys_are_single_uint64_columns():
+    fields = [
+        ('id', 'UInt64'),
+        ('zone', 'String DEFAULT \'\''),
+        ('code', 'Int32'),
+        ('small_id', 'UInt32'),
+    ]
+
+    assert dictionary_keys(fields, 'id') == (['id'], True)
+    assert dictionary_keys(fields, 'code') == (['code'], False)
+    assert dictionary_keys(fields, 'small_id') == (['small_id'], False)
+    assert dictionary_keys(fields, 'id, zone') == (['id', 'zone'], False)
+
+
+def test_advise_dictionary_layout_profiles_the_source_once():
+    adapter = ClickHouseAdapter.__new__(ClickHouseAdapter)
+    conn = MagicMock()
+    conn.handle.query.return_value.result_set = [(265, 265, 1, 265, 2.0, 24.5)]
+    adapter.connections = MagicMock()
+    adapter.connections.get_if_exists.return_value = conn
+
+    layout = adapter.advise_dictionary_layout(
+        'select * from zones', [('id', 'UInt64'), ('zone', 'String')], 'id'
+    )
+
+    assert layout == 'FLAT()'
+    assert conn.handle.query.call_args.args[0] == (
+        'SELECT count(), uniq(`id`), min(`id`), max(`id`), avg(byteSize(`id`)), '
+        'avg(byteSize(`zone`)) FROM ( \nselect * from zones \n)'
+    )
+
+
+def test_advise_dictionary_layout_reads_the_source_with_the_connection_overrides():
+    adapter = ClickHouseAdapter.__new__(ClickHouseAdapter)
+    conn = MagicMock()
+    conn.credentials = ClickHouseCredentials(
+        host='localhost', user='dbt', password='secret', database='analytics', schema='analytics'
+    )
+    adapter.connections = MagicMock()
+    adapter.connections.get_if_exists.return_value = conn
+    client = MagicMock()
+    client.query.return_value.result_set = [(265, 265, 1, 265, 2.0, 24.5)]
+
+    with patch('dbt.adapters.clickhouse.impl.get_db_client', return_value=client) as get_client:
+        adapter.advise_dictionary_layout(
+            'select * from zones',
+            [('id', 'UInt64'), ('zone', 'String')],
+            'id',
+            {'user': 'reader', 'password': '', 'database': 'raw'},
+        )
+
+    credentials = get_client.call_args.args[0]
+    assert (credentials.user, credentials.password, credentials.schema) == (
+        'reader',
+        'secret',
+        'raw',
+    )
+    client.close.assert_called_once()
+    conn.handle.query.assert_not_called()
+
+
+def test_advise_dictionary_layout_uses_complex_keys_for_narrow_unsigned_keys():
+    adapter = ClickHouseAdapter.__new__(ClickHouseAdapter)
+    conn = MagicMock()
+    conn.handle.query.return_value.result_set = [(265, 265, None, None, 4.0, 24.5)]
+    adapter.connections = MagicMock()
+    adapter.connections.get_if_exists.return_value = conn
+
+    layout = adapter.advise_dictionary_layout(
+        'select * from zones', [('id', 'UInt32'), ('zone', 'String')], 'id'
+    )
+
+    assert layout == 'COMPLEX_KEY_HASHED()'
+    assert 'NULL, NULL' in conn.handle.query.call_args.args[0]
+
+
+@pytest.mark.parametrize('range_config,ranged', [(None, False), ('MIN start MAX end', True)])
+def test_auto_layout_of_range_dictionaries(macros, range_config, ranged):
+    config = config_mock(fields=[('id', 'UInt64')], primary_key='id', range=range_config)
+    adapter = SandboxSafeMock()
+    adapter.advise_dictionary_layout.return_value = 'RANGE_HASHED()'
+
+    macros.call(
+        'clickhouse__advise_dictionary_layout',
+        'select * from zones',
+        context={'config': config, 'adapter': adapter},
+    )
+
+    assert adapter.advise_dictionary_layout.call_args.args[-1] is ranged
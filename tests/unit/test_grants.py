@@ -0,0 +1,99 @@
+from unittest.mock import MagicMock
+
+from dbt.adapters.clickhouse.grants import GrantsCache, diff_grants, grant_changes
+from dbt.adapters.clickhouse.relation import ClickHouseRelation
+
+from tests.unit.macro_harness import SandboxSafeMock
+
+EVENTS = ClickHouseRelation.create(schema='analytics', identifier='events')
+EVENTS_LOCAL = ClickHouseRelation.create(schema='analytics', identifier='events_local')
+ON_CLUSTER = 'ON CLUSTER "prod"'
+
+
+def _handle(rows):
+    handle = MagicMock()
+    handle.query.return_value.result_set = rows
+    return handle
+
+
+def test_diff_ignores_privilege_case():
+    assert diff_grants({'select': ['alice', 'bob']}, {'SELECT': ['alice']}) == {'select': ['bob']}
+    assert diff_grants({'SELECT': ['alice']}, {'select': ['alice']}) == {}
+
+
+def test_relations_of_a_model_are_granted_in_one_statement():
+    handle = _handle([])
+    statements = grant_changes(
+        GrantsCache(),
+        handle,
+        [(EVENTS, ON_CLUSTER), (EVENTS_LOCAL, ON_CLUSTER)],
+        {'select': ['alice', 'bob'], 'insert': ['loader']},
+    )
+
+    assert statements == [
+        'grant ON CLUSTER "prod" insert on `analytics`.`events`, '
+        'insert on `analytics`.`events_local` to loader',
+        'grant ON CLUSTER "prod" select on `analytics`.`events`, '
+        'select on `analytics`.`events_local` to alice, bob',
+    ]
+    assert handle.query.call_count == 1
+
+
+def test_grants_are_fetched_once_per_schema_and_kept_up_to_date():
+    handle = _handle(
+        [
+            ('analytics', 'events', 'SELECT', 'alice'),
+            ('analytics', 'events', 'SELECT', 'carol'),
+            ('analytics', 'sessions', 'SELECT', 'alice'),
+        ]
+    )
+    cache = GrantsCache()
+
+    first = grant_changes(cache, handle, [(EVENTS, '')], {'select': ['alice', 'bob']})
+    again = grant_changes(cache, handle, [(EVENTS, '')], {'select': ['alice', 'bob']})
+    sessions = grant_changes(
+        cache, handle, [(EVENTS.incorporate(path={'identifier': 'sessions'}), '')], {}
+    )
+
+    assert first == [
+        'revoke select on `analytics`.`events` from carol',
+        'grant select on `analytics`.`events` to bob',
+    ]
+    assert again == []
+    assert sessions == ['revoke select on `analytics`.`sessions` from alice']
+    assert handle.query.call_count == 1
+    assert "database IN ('analytics')" in handle.query.call_args.args[0]
+
+
+def test_nothing_is_revoked_without_should_revoke():
+    handle = _handle([('analytics', 'events', 'SELECT', 'carol')])
+
+    statements = grant_changes(
+        GrantsCache(), handle, [(EVENTS, '')], {'select': ['alice']}, should_revoke=False
+    )
+
+    assert statements == ['grant select on `analytics`.`events` to alice']
+
+
+def test_apply_grants_issues_the_combined_statements(macros):
+    adapter = SandboxSafeMock()
+    adapter.get_grant_statements.return_value = ['grant select on `analytics`.`events` to bob']
+    calls = []
+
+    macros.call(
+        'clickhouse__apply_grants',
+        EVENTS,
+        {'select': ['bob']},
+        context={
+            'adapter': adapter,
+            'on_cluster_clause': lambda relation: ' ON CLUSTER "prod" ',
+            'call_dcl_statements': calls.append,
+        },
+    )
+
+    assert adapter.get_grant_statements.call_args.args == (
+        [(EVENTS, 'ON CLUSTER "prod"')],
+        {'select': ['bob']},
+        True,
+    )
+    assert calls == [['grant select on `analytics`.`events` to bob']]
@@ -0,0 +1,143 @@
+from unittest.mock import MagicMock
+
+import pytest
+from dbt.adapters.clickhouse import state
+from dbt.adapters.clickhouse.relation import ClickHouseRelation
+from dbt.adapters.clickhouse.state import (
+    ModelStateStore,
+    fingerprint,
+    schema_dropped,
+    upstream_state,
+)
+
+from tests.unit.macro_harness import SandboxSafeMock
+
+ORDERS = ClickHouseRelation.create(schema='raw', identifier='orders')
+USERS = ClickHouseRelation.create(schema='raw', identifier='users')
+
+
+def _handle(rows):
+    handle = MagicMock()
+    handle.query.return_value.result_set = rows
+    return handle
+
+
+def test_upstream_state_of_merge_tree_tables():
+    handle = _handle(
+        [
+            ('raw', 'orders', 'ReplicatedMergeTree', 3, 1000, '2024-01-01 10:00:00'),
+            ('raw', 'users', 'MergeTree', 1, 10, '2024-01-01 09:00:00'),
+        ]
+    )
+
+    state = upstream_state(handle, [ORDERS, USERS], cluster='prod')
+
+    assert state == 'raw.orders:3:1000:2024-01-01 10:00:00;raw.users:1:10:2024-01-01 09:00:00'
+    query = handle.query.call_args.args[0]
+    assert "FROM clusterAllReplicas('prod', system.parts) WHERE active" in query
+    assert "IN (('raw', 'orders'), ('raw', 'users'))" in query
+
+
+def test_upstream_state_is_unknown_for_views_and_missing_relations():
+    view = _handle([('raw', 'orders', 'View', 0, 0, '1970-01-01 00:00:00')])
+    missing = _handle([('raw', 'orders', 'MergeTree', 3, 1000, '2024-01-01 10:00:00')])
+
+    assert upstream_state(view, [ORDERS]) is None
+    assert upstream_state(missing, [ORDERS, USERS]) is None
+
+
+def test_upstream_state_is_unknown_without_upstream_relations():
+    handle = _handle([])
+
+    assert upstream_state(handle, []) is None
+    handle.query.assert_not_called()
+
+
+def test_fingerprint_ignores_whitespace_but_not_config_or_upstream():
+    base = fingerprint('select 1', {'order_by': 'id'}, 'raw.orders:3')
+
+    assert fingerprint('select\n  1 ', {'order_by': 'id'}, 'raw.orders:3') == base
+    assert fingerprint('select 1', {'order_by': 'ts'}, 'raw.orders:3') != base
+    assert fingerprint('select 1', {'order_by': 'id'}, 'raw.orders:4') != base
+
+
+@pytest.fixture
+def created_tables(monkeypatch):
+    monkeypatch.setattr(state, '_created_tables', set())
+
+
+def test_model_state_store(created_tables):
+    handle = _handle([('abc',)])
+    store = ModelStateStore(handle, 'analytics')
+
+    assert store.get('dim_users', 'fingerprint') == 'abc'
+    store.put('dim_users', 'fingerprint', 'def')
+    ModelStateStore(handle, 'analytics').get('dim_orders', 'fingerprint')
+
+    assert handle.command.call_count == 2
+    assert (
+        handle.command.call_args_list[0]
+        .args[0]
+        .startswith('CREATE TABLE IF NOT EXISTS `analytics`.`__dbt_model_state` (model String')
+    )
+    assert (
+        "WHERE model = 'dim_users' AND key = 'fingerprint'"
+        in (handle.query.call_args_list[0].args[0])
+    )
+    assert handle.command.call_args.args[0].endswith("VALUES ('dim_users', 'fingerprint', 'def')")
+
+
+def test_model_state_table_is_replicated_on_a_cluster(created_tables):
+    handle = _handle([])
+
+    ModelStateStore(handle, 'analytics', cluster='main').get('dim_users', 'fingerprint')
+
+    create = handle.command.call_args.args[0]
+    assert 'ON CLUSTER "main"' in create
+    assert 'ENGINE = ReplicatedReplacingMergeTree(updated_at)' in create
+
+
+def test_model_state_table_is_created_again_after_its_schema_is_dropped(created_tables):
+    handle = _handle([])
+    ModelStateStore(handle, 'analytics').get('dim_users', 'fingerprint')
+    ModelStateStore(handle, 'staging').get('dim_users', 'fingerprint')
+
+    schema_dropped('analytics')
+    ModelStateStore(handle, 'analytics').get('dim_users', 'fingerprint')
+    ModelStateStore(handle, 'staging').get('dim_users', 'fingerprint')
+
+    creates = [call.args[0] for call in handle.command.call_args_list]
+    assert len(creates) == 3
+    assert '`analytics`.`__dbt_model_state`' in creates[2]
+
+
+def test_upstream_relations(macros):
+    model = SandboxSafeMock()
+    model.depends_on.nodes = ['model.p.stg_orders', 'source.p.raw.users', 'macro.p.unknown']
+    graph = {
+        'nodes': {
+            'model.p.stg_orders': {
+                'resource_type': 'model',
+                'schema': 'staging',
+                'alias': 'orders',
+            }
+        },
+        'sources': {
+            'source.p.raw.users': {
+                'resource_type': 'source',
+                'schema': 'raw',
+                'identifier': 'users_v2',
+            }
+        },
+    }
+    api = SandboxSafeMock()
+    api.Relation.create.side_effect = ClickHouseRelation.create
+
+    relations = macros.call(
+        'clickhouse__upstream_relations', context={'model': model, 'graph': graph, 'api': api}
+    )
+
+    assert [str(relation) for relation in relations] == [
+        '`staging`.`orders`',
+        '`raw`.`users_v2`',
+    ]
@@ -0,0 +1,191 @@
+import datetime
+from unittest.mock import MagicMock
+
+import pytest
+from dbt.adapters.clickhouse.catchup import CatchupConfig, MvCatchup, chunk_literal
+from dbt.adapters.clickhouse.column import ClickHouseColumn
+from dbt.adapters.clickhouse.relation import ClickHouseRelation
+from dbt_common.exceptions import DbtRuntimeError
+
+VIEWS = {
+    'orders': 'select day, amount from orders',
+    'refunds': 'select day, -amount as amount from refunds',
+}
+PROGRESS = '`analytics`.`sales__dbt_catchup`'
+
+
+class FakeClient:
+    def __init__(self, chunks=None, progress=None):
+        self.chunks = chunks or {}
+        self.progress = progress
+        self.commands = []
+        self.closed = False
+
+    def command(self, sql, **kwargs):
+        self.commands.append((sql, kwargs.get('settings')))
+        if sql.startswith('EXISTS TABLE'):
+            return int(self.progress is not None)
+
+    def query(self, sql, **kwargs):
+        if sql.startswith('SELECT view, chunk'):
+            return MagicMock(result_set=self.progress)
+        view_sql = next(view_sql for view_sql in VIEWS.values() if view_sql in sql)
+        return MagicMock(result_set=[(chunk,) for chunk in self.chunks[view_sql]])
+
+    def columns_in_query(self, sql, **kwargs):
+        return [ClickHouseColumn('day', 'Date'), ClickHouseColumn('amount', 'Int64')]
+
+    def close(self):
+        self.closed = True
+
+    def sql(self, prefix):
+        return [sql for sql, _ in self.commands if sql.startswith(prefix)]
+
+
+def _catchup(handle, factory=None, cluster='', **config):
+    target = ClickHouseRelation.create(schema='analytics', identifier='sales')
+    return MvCatchup(
+        handle,
+        factory or (lambda: handle),
+        target,
+        VIEWS,
+        CatchupConfig.from_config(config),
+        {'join_use_nulls': 1},
+        cluster,
+    )
+
+
+def test_catchup_inserts_every_view_chunk_with_bounded_memory():
+    handle = FakeClient(
+        chunks={
+            VIEWS['orders']: [datetime.date(2024, 1, 1), datetime.date(2024, 2, 1)],
+            VIEWS['refunds']: [datetime.date(2024, 2, 1)],
+        }
+    )
+
+    inserted = _catchup(
+        handle, chunk_by='toStartOfMonth(day)', max_memory_usage=1000, threads=1
+    ).run()
+
+    assert inserted == 3
+    inserts = [
+        (sql, settings)
+        for sql, settings in handle.commands
+        if sql.startswith('INSERT INTO `analytics`.`sales`')
+    ]
+    assert [sql.split('WHERE ')[-1] for sql, _ in inserts] == [
+        "(toStartOfMonth(day)) = '2024-01-01'",
+        "(toStartOfMonth(day)) = '2024-02-01'",
+        "(toStartOfMonth(day)) = '2024-02-01'",
+    ]
+    assert inserts[0][0].startswith(
+        'INSERT INTO `analytics`.`sales` (`day`, `amount`) SELECT `day`, `amount`'
+    )
+    assert all(
+        settings == {'join_use_nulls': 1, 'max_memory_usage': 1000} for _, settings in inserts
+    )
+    assert handle.sql(f'INSERT INTO {PROGRESS}')[-1] == (
+        f"INSERT INTO {PROGRESS} VALUES ('refunds', '\\'2024-02-01\\'', 1)"
+    )
+    assert handle.commands[-1][0] == f'DROP TABLE IF EXISTS {PROGRESS}'
+
+
+def test_catchup_runs_views_on_separate_connections():
+    handle = FakeClient(chunks={VIEWS['orders']: [1], VIEWS['refunds']: [1]})
+    workers = []
+
+    def factory():
+        workers.append(FakeClient())
+        return workers[-1]
+
+    _catchup(handle, factory, chunk_by='toYYYYMM(day)').run()
+
+    assert 1 <= len(workers) <= 2
+    assert all(worker.closed for worker in workers)
+    assert sum(len(worker.sql('INSERT INTO `analytics`.`sales`')) for worker in workers) == 2
+    assert not handle.sql('INSERT INTO `analytics`.`sales`')
+
+
+def test_progress_table_is_replicated_on_a_cluster():
+    handle = FakeClient()
+
+    _catchup(handle, cluster='main', threads=1).run()
+
+    assert handle.sql(f'CREATE TABLE {PROGRESS}') == [
+        f'CREATE TABLE {PROGRESS} ON CLUSTER "main" (view String, chunk String, finished UInt8) '
+        'ENGINE = ReplicatedMergeTree ORDER BY (view, chunk)'
+    ]
+    assert handle.sql('DROP TABLE') == [
+        f'DROP TABLE IF EXISTS {PROGRESS} ON CLUSTER "main" SYNC',
+        f'DROP TABLE IF EXISTS {PROGRESS} ON CLUSTER "main" SYNC',
+    ]
+
+
+def test_resume_skips_finished_chunks_and_redoes_half_written_ones():
+    handle = FakeClient(
+        chunks={VIEWS['orders']: [202401, 202402], VIEWS['refunds']: [202401, 202402]},
+        progress=[
+            ('orders', '202401', 1),
+            ('refunds', '202401', 1),
+            ('orders', '202402', 1),
+            ('refunds', '202402', 0),
+        ],
+    )
+
+    inserted = _catchup(handle, chunk_by='toYYYYMM(day)', threads=1).run(resume=True)
+
+    assert inserted == 2
+    assert handle.sql('ALTER TABLE') == [
+        'ALTER TABLE `analytics`.`sales` DELETE WHERE (toYYYYMM(day)) = 202402'
+    ]
+    assert not handle.sql('CREATE TABLE')
+    assert all(sql.endswith('= 202402') for sql in handle.sql('INSERT INTO `analytics`.`sales`'))
+
+
+def test_resume_without_interrupted_catchup_does_nothing():
+    handle = FakeClient()
+
+    assert _catchup(handle).run(resume=True) == 0
+    assert [sql for sql, _ in handle.commands] == [f'EXISTS TABLE {PROGRESS}']
+
+
+def test_unchunked_catchup_inserts_each_view_once():
+    handle = FakeClient()
+
+    _catchup(handle, threads=1).run()
+
+    inserts = handle.sql('INSERT INTO `analytics`.`sales`')
+    assert len(inserts) == 2
+    assert not any('WHERE' in sql for sql in inserts)
+
+
+@pytest.mark.parametrize(
+    'value,literal',
+    [
+        (None, 'NULL'),
+        (202401, '202401'),
+        ('it\'s', "'it\\'s'"),
+        (datetime.date(2024, 1, 1), "'2024-01-01'"),
+        (datetime.datetime(2024, 1, 1, 10, 30), "'2024-01-01 10:30:00'"),
+        (
+            datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc),
+            "toDateTime('2024-01-01 00:00:00', 'UTC')",
+        ),
+        (
+            datetime.datetime(2024, 1, 1, 2, tzinfo=datetime.timezone(datetime.timedelta(hours=2))),
+            "toDateTime('2024-01-01 00:00:00', 'UTC')",
+        ),
+        (
+            datetime.datetime(2024, 1, 1, 0, 0, 0, 250000, tzinfo=datetime.timezone.utc),
+            "toDateTime64('2024-01-01 00:00:00.250000', 6, 'UTC')",
+        ),
+    ],
+)
+def test_chunk_literal(value, literal):
+    assert chunk_literal(value) == literal
+
+
+@pytest.mark.parametrize('config', [{'chunk': 'day'}, {'threads': 0}])
+def test_invalid_catchup_config(config):
+    with pytest.raises(DbtRuntimeError):
+        CatchupConfig.from_config(config)
@@ -0,0 +1,165 @@
+from unittest.mock import MagicMock
+
+import pytest
+from dbt.adapters.clickhouse.impl import ClickHouseAdapter
+
+from tests.unit.macro_harness import SandboxSafeMock, config_mock
+
+VIEWS = {'mv': 'select id, inserted_at from events'}
+
+
+class _Statements:
+    def __init__(self):
+        self.sql = []
+
+    def __call__(self, name, fetch_result=False, auto_begin=True, caller=None):
+        self.sql.append((name, ' '.join(caller().split())))
+        return ''
+
+
+def _relation(identifier):
+    relation = SandboxSafeMock(schema='analytics', identifier=identifier)
+    relation.name = identifier
+    relation.__str__.return_value = f'`analytics`.`{identifier}`'
+    relation.derivative.side_effect = lambda suffix, *args: _relation(identifier + suffix)
+    return relation
+
+
+def _run_query(points_ahead):
+    points = iter(range(1700000005, 1700000100, 5))
+    ahead = iter(points_ahead)
+
+    def run_query(sql):
+        value = next(ahead) if sql.startswith('select now() <') else next(points)
+        result = SandboxSafeMock()
+        result.columns[0].values.return_value = [value]
+        return result
+
+    return run_query
+
+
+def _handoff(macros, catchup=True, points_ahead=(True, True)):
+    statements = _Statements()
+    calls = []
+    context = {
+        'statement': statements,
+        'config': config_mock(handoff_watermark='inserted_at', handoff_lag_seconds=5),
+        'adapter': SandboxSafeMock(),
+        'run_query': _run_query(points_ahead),
+        'on_cluster_clause': lambda *args, **kwargs: '',
+        'clickhouse__create_empty_table': lambda *args, **kwargs: calls.append('create') or '',
+        'clickhouse__insert_into': lambda relation, sql, *args, **kwargs: (
+            f'insert into {relation} {sql}'
+        ),
+        'exchange_tables_atomic': lambda *args: calls.append('exchange') or '',
+    }
+    macros.call(
+        'clickhouse__full_refresh_mvs_with_handoff',
+        _relation('events_agg'),
+        _relation('events_agg__dbt_backup'),
+        'select id, inserted_at from events',
+        VIEWS,
+        catchup,
+        context=context,
+    )
+    return statements.sql, calls, context['adapter']
+
+
+def test_handoff_hands_rows_over_through_the_handoff_table(macros):
+    sql, calls, adapter = _handoff(macros)
+
+    assert [name for name, _ in sql] == [
+        'create handoff table',
+        'create existing mv: events_agg_mv__dbt_handoff',
+        'handoff backfill: mv',
+        'drop existing mv: events_agg_mv',
+        'create existing mv: events_agg_mv',
+        'drop existing mv: events_agg_mv__dbt_handoff',
+        'move handoff rows',
+        'drop handoff table',
+        'modify existing mv: events_agg_mv',
+    ]
+    statements = dict(sql)
+    assert statements['create handoff table'] == (
+        'create table if not exists `analytics`.`events_agg__dbt_handoff` '
+        'as `analytics`.`events_agg__dbt_backup`'
+    )
+    assert statements['create existing mv: events_agg_mv__dbt_handoff'].endswith(
+        'to `analytics`.`events_agg__dbt_handoff` as select * from '
+        '( select id, inserted_at from events ) where (inserted_at) >= toDateTime(1700000005)'
+    )
+    assert statements['handoff backfill: mv'].endswith(
+        'where (inserted_at) < toDateTime(1700000005)'
+    )
+    assert statements['create existing mv: events_agg_mv'].endswith(
+        'to `analytics`.`events_agg` as select * from '
+        '( select id, inserted_at from events ) where (inserted_at) >= toDateTime(1700000010)'
+    )
+    assert statements['move handoff rows'] == (
+        'insert into `analytics`.`events_agg` select * from `analytics`.`events_agg__dbt_handoff` '
+        'where (inserted_at) < toDateTime(1700000010)'
+    )
+    assert statements['modify existing mv: events_agg_mv'] == (
+        'alter table `analytics`.`events_agg_mv` modify query select id, inserted_at from events'
+    )
+    assert calls == ['create', 'exchange']
+    assert [call.args for call in adapter.wait_for_server_time.call_args_list] == [
+        (1700000010,),
+        (1700000015,),
+    ]
+
+
+def test_handoff_without_catchup_skips_the_backfill(macros):
+    sql, _, _ = _handoff(macros, catchup=False)
+
+    assert 'handoff backfill: mv' not in dict(sql)
+
+
+def test_chunked_catchup_backfills_the_filtered_views(macros):
+    _, _, adapter = _handoff(macros, catchup={'chunk_by': 'toYYYYMM(inserted_at)'})
+
+    backfill_views = adapter.run_mv_catchup.call_args.args[1]
+    assert backfill_views['mv'].endswith('where (inserted_at) < toDateTime(1700000005)')
+
+
+def test_slow_handoff_drops_the_handoff_relations(macros):
+    with pytest.raises(Exception, match='handoff_lag_seconds'):
+        _handoff(macros, points_ahead=(False,))
+
+
+def test_late_views_are_created_again(macros):
+    sql, _, _ = _handoff(macros, points_ahead=(True, False, True))
+
+    statements = [statement for _, statement in sql]
+    assert (
+        'alter table `analytics`.`events_agg` delete where (inserted_at) >= '
+        'toDateTime(1700000010) settings mutations_sync = 2'
+    ) in statements
+    assert dict(sql)['move handoff rows'].endswith('< toDateTime(1700000015)')
+
+
+def test_handoff_filter_survives_a_trailing_comment(macros):
+    filtered = macros.call(
+        'clickhouse__handoff_filter',
+        'select id, inserted_at from events -- all events',
+        'inserted_at',
+        '>=',
+        1700000005,
+    )
+
+    assert filtered == (
+        'select * from (\nselect id, inserted_at from events -- all events\n) '
+        'where (inserted_at) >= toDateTime(1700000005)'
+    )
+
+
+def test_wait_for_server_time_polls_the_server_clock():
+    adapter = ClickHouseAdapter.__new__(ClickHouseAdapter)
+    handle = MagicMock()
+    handle.query.return_value.result_set = [[1]]
+    adapter.connections = MagicMock()
+    adapter.connections.get_if_exists.return_value.handle = handle
+
+    adapter.wait_for_server_time(1700000010)
+
+    handle.query.assert_called_once_with('SELECT now() >= toDateTime(1700000010)')
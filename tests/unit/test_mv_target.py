@@ -0,0 +1,57 @@
+from tests.unit.macro_harness import SandboxSafeMock
+
+
+def _mv_relation():
+    return SandboxSafeMock(schema='analytics', identifier='events_mv')
+
+
+def test_mv_target_is_served_from_the_cache(macros):
+    adapter = SandboxSafeMock()
+    adapter.get_cached_mv_target.return_value = 'analytics.events'
+    run_query = SandboxSafeMock()
+
+    target = macros.call(
+        'clickhouse__get_mv_current_target',
+        _mv_relation(),
+        context={'adapter': adapter, 'run_query': run_query},
+    )
+
+    assert target == 'analytics.events'
+    run_query.assert_not_called()
+
+
+def test_mv_target_falls_back_to_system_tables(macros):
+    adapter = SandboxSafeMock()
+    adapter.get_cached_mv_target.return_value = None
+    run_query = SandboxSafeMock()
+    run_query.return_value.columns[0].values.return_value = ['other.events']
+
+    target = macros.call(
+        'clickhouse__get_mv_current_target',
+        _mv_relation(),
+        context={'adapter': adapter, 'run_query': run_query},
+    )
+
+    assert target == 'other.events'
+    assert "name = 'events_mv'" in run_query.call_args.args[0]
+
+
+def test_relation_listing_only_parses_mvs_writing_to_the_schema(macros):
+    statements = []
+
+    def statement(name, fetch_result=False, auto_begin=True, caller=None):
+        statements.append(' '.join(caller().split()))
+        return ''
+
+    adapter = SandboxSafeMock()
+    adapter.get_clickhouse_cluster_name.return_value = None
+    macros.call(
+        'clickhouse__list_relations_without_caching',
+        SandboxSafeMock(schema='analytics'),
+        context={'statement': statement, 'adapter': adapter, 'load_result': SandboxSafeMock()},
+    )
+
+    assert (
+        "multiSearchAny(create_table_query, [' TO analytics.', ' TO `analytics`.'])"
+        in statements[0]
+    )
@@ -0,0 +1,114 @@
+from unittest.mock import MagicMock
+
+import pytest
+from dbt.adapters.clickhouse.distributed import (
+    DistributedEngine,
+    parallel_insert_source,
+    parse_distributed_engine,
+)
+from dbt.adapters.clickhouse.impl import ClickHouseAdapter
+from dbt.adapters.clickhouse.relation import ClickHouseRelation
+
+from tests.unit.macro_harness import SandboxSafeMock, config_mock
+
+EVENTS = ClickHouseRelation.create(schema='analytics', identifier='events')
+USERS = ClickHouseRelation.create(schema='analytics', identifier='users')
+
+
+def _handle(engine_full=None):
+    handle = MagicMock()
+    handle.query.return_value.result_set = [(engine_full,)] if engine_full else []
+    return handle
+
+
+def test_parse_distributed_engine():
+    engine = parse_distributed_engine(
+        "Distributed('prod', 'analytics', 'events_local', cityHash64(user_id, 'a,b')) "
+        "SETTINGS fsync_after_insert = 0"
+    )
+    assert engine == DistributedEngine(
+        'prod', 'analytics', 'events_local', "cityHash64(user_id, 'a,b')"
+    )
+    assert parse_distributed_engine("Distributed('prod', 'db', 't')").sharding_key is None
+    assert parse_distributed_engine('MergeTree ORDER BY id') is None
+
+
+@pytest.mark.parametrize(
+    'engine_full,sharding_key,parallel',
+    [
+        (
+            "Distributed('prod', 'analytics', 'events_local', cityHash64(user_id))",
+            'cityHash64(user_id)',
+            True,
+        ),
+        (
+            "Distributed('prod', 'analytics', 'events_local', cityHash64(`user_id`))",
+            ' cityHash64( user_id ) ',
+            True,
+        ),
+        (
+            "Distributed('prod', 'analytics', 'events_local', cityHash64(user_id))",
+            'cityHash64(id)',
+            False,
+        ),
+        ("Distributed('prod', 'analytics', 'events_local', cityHash64(user_id))", 'rand()', True),
+        ("Distributed('prod', 'analytics', 'events_local', cityHash64(user_id))", None, True),
+        ("Distributed('prod', 'analytics', 'events_local')", 'cityHash64(user_id)', False),
+        ("Distributed('staging', 'analytics', 'events_local', rand())", 'rand()', False),
+        ('MergeTree ORDER BY user_id', 'rand()', False),
+        (None, 'rand()', False),
+    ],
+)
+def test_parallel_insert_source(engine_full, sharding_key, parallel):
+    handle = _handle(engine_full)
+    source = parallel_insert_source(handle, [EVENTS], 'prod', sharding_key)
+    assert (source is not None) == parallel
+    if engine_full:
+        assert "WHERE database = 'analytics' AND name = 'events'" in handle.query.call_args.args[0]
+
+
+def test_parallel_insert_needs_a_single_source_and_a_cluster():
+    handle = _handle("Distributed('prod', 'analytics', 'events_local', rand())")
+    assert parallel_insert_source(handle, [EVENTS, USERS], 'prod', 'rand()') is None
+    assert parallel_insert_source(handle, [], 'prod', 'rand()') is None
+    assert parallel_insert_source(handle, [EVENTS], '', 'rand()') is None
+    handle.query.assert_not_called()
+
+
+def test_model_query_settings_override_defaults():
+    adapter = ClickHouseAdapter.__new__(ClickHouseAdapter)
+    model = {'config': {'query_settings': {'max_threads': 4}}}
+
+    clause = adapter.get_model_query_settings(
+        model, {'parallel_distributed_insert_select': 2, 'max_threads': 1}
+    )
+
+    assert 'SETTINGS parallel_distributed_insert_select=2, max_threads=4' in clause
+    assert adapter.get_model_query_settings({'config': {}}) == ''
+
+
+def _parallel_insert(macros, **config_values):
+    config = config_mock(**config_values)
+    adapter = SandboxSafeMock()
+    adapter.can_parallel_distributed_insert.return_value = True
+    parallel = macros.call(
+        'clickhouse__parallel_distributed_insert',
+        context={
+            'config': config,
+            'adapter': adapter,
+            'clickhouse__upstream_relations': lambda: [EVENTS],
+        },
+    )
+    return parallel, adapter
+
+
+def test_parallel_insert_is_opt_in(macros):
+    parallel, adapter = _parallel_insert(macros, sharding_key='rand()')
+    assert parallel is False
+    adapter.can_parallel_distributed_insert.assert_not_called()
+
+    parallel, adapter = _parallel_insert(
+        macros, sharding_key='rand()', parallel_distributed_insert=True
+    )
+    assert parallel is True
+    adapter.can_parallel_distributed_insert.assert_called_once_with([EVENTS], 'rand()')
@@ -0,0 +1,200 @@
+from unittest.mock import MagicMock
+
+import pytest
+from dbt.adapters.clickhouse.partitions import PartitionCarryOver, engine_arguments
+from dbt.adapters.clickhouse.relation import ClickHouseRelation
+from dbt_common.exceptions import DbtDatabaseError, DbtRuntimeError
+
+from tests.unit.macro_harness import SandboxSafeMock, config_mock
+
+EXISTING = ClickHouseRelation.create(schema='analytics', identifier='facts')
+NEW = ClickHouseRelation.create(schema='analytics', identifier='facts__dbt_backup')
+DEFINITION: tuple = (
+    'MergeTree',
+    'toYYYYMM(day)',
+    'id',
+    'id',
+    'default',
+    [('id', 'UInt64'), ('day', 'Date')],
+    [],
+    [],
+    'MergeTree PARTITION BY toYYYYMM(day) ORDER BY id SETTINGS index_granularity = 8192',
+)
+REPLICATED = (
+    ('ReplicatedReplacingMergeTree',)
+    + DEFINITION[1:-1]
+    + (
+        "ReplicatedReplacingMergeTree('/clickhouse/tables/{uuid}/{shard}', '{replica}', ver) "
+        'PARTITION BY toYYYYMM(day) ORDER BY id',
+    )
+)
+
+
+def _replace(definition, position, value):
+    return definition[:position] + (value,) + definition[position + 1 :]
+
+
+def _carry_over(*results):
+    handle = MagicMock()
+    handle.query.return_value.result_set = []
+    handle.query.side_effect = [MagicMock(result_set=list(rows)) for rows in results]
+    return PartitionCarryOver(handle, EXISTING, NEW), handle
+
+
+@pytest.mark.parametrize(
+    'existing,new,on_cluster,compatible',
+    [
+        (DEFINITION, DEFINITION, False, True),
+        (DEFINITION, _replace(DEFINITION, 2, 'day, id'), False, False),
+        (
+            DEFINITION,
+            _replace(DEFINITION, 5, [('id', 'UInt64'), ('day', 'DateTime')]),
+            False,
+            False,
+        ),
+        (DEFINITION, _replace(DEFINITION, 6, [('idx', 'minmax', 'day', 1)]), False, False),
+        (DEFINITION, _replace(DEFINITION, 7, [('by_day', 'SELECT * ORDER BY day')]), False, False),
+        (_replace(DEFINITION, 1, ''), _replace(DEFINITION, 1, ''), False, False),
+        (DEFINITION, DEFINITION, True, False),
+        (
+            REPLICATED,
+            _replace(REPLICATED, 8, REPLICATED[8].replace('{uuid}/{shard}', '{shard}/facts_new')),
+            True,
+            True,
+        ),
+        (
+            REPLICATED,
+            _replace(REPLICATED, 8, REPLICATED[8].replace(', ver)', ', updated_at)')),
+            True,
+            False,
+        ),
+        (
+            ('Memory', '', '', '', '', [], [], [], 'Memory'),
+            ('Memory', '', '', '', '', [], [], [], 'Memory'),
+            False,
+            False,
+        ),
+    ],
+)
+def test_compatible(existing, new, on_cluster, compatible):
+    carry_over, handle = _carry_over([existing], [new])
+
+    assert carry_over.compatible(on_cluster) == compatible
+    assert (
+        "FROM system.tables WHERE database = 'analytics' AND name = 'facts'"
+        in (handle.query.call_args_list[0].args[0])
+    )
+
+
+def test_unknown_definition_is_not_compatible():
+    carry_over, handle = _carry_over()
+    handle.query.side_effect = DbtDatabaseError('UNKNOWN_TABLE system.projections')
+
+    assert not carry_over.compatible()
+
+
+def test_engine_arguments():
+    assert engine_arguments(REPLICATED[8]) == ['ver']
+    assert engine_arguments("ReplacingMergeTree(ver, is_deleted) ORDER BY id") == [
+        'ver',
+        'is_deleted',
+    ]
+    assert engine_arguments(DEFINITION[8]) == []
+
+
+def test_plan_lists_partitions_without_matching_rows():
+    carry_over, handle = _carry_over([], [('202401',), ('202402',)])
+
+    assert carry_over.plan("day >= '2024-03-01'") == ['202401', '202402']
+    partial_query, plan_query = [call.args[0] for call in handle.query.call_args_list]
+    assert "HAVING countIf(day >= '2024-03-01') < count()" in partial_query
+    assert (
+        "AND partition_id NOT IN (SELECT DISTINCT _partition_id FROM `analytics`.`facts` "
+        "WHERE day >= '2024-03-01')"
+    ) in plan_query
+
+
+def test_plan_rejects_predicates_selecting_part_of_a_partition():
+    carry_over, _ = _carry_over([('202403',)])
+
+    with pytest.raises(DbtRuntimeError, match='must select whole partitions'):
+        carry_over.plan("day >= '2024-03-15'")
+
+
+def test_attach():
+    carry_over, handle = _carry_over([])
+
+    carry_over.attach(['202401', '202402'])
+
+    assert [call.args[0] for call in handle.command.call_args_list] == [
+        "ALTER TABLE `analytics`.`facts__dbt_backup` ATTACH PARTITION ID '202401' "
+        'FROM `analytics`.`facts`',
+        "ALTER TABLE `analytics`.`facts__dbt_backup` ATTACH PARTITION ID '202402' "
+        'FROM `analytics`.`facts`',
+    ]
+
+
+def test_attach_rejects_partitions_already_rebuilt():
+    carry_over, handle = _carry_over([('202402',)])
+
+    with pytest.raises(DbtRuntimeError, match='202402'):
+        carry_over.attach(['202401', '202402'])
+    handle.command.assert_not_called()
+
+
+def _rebuild(macros, predicate, planned):
+    statements = []
+
+    def statement(name=None, fetch_result=False, auto_begin=True, caller=None):
+        statements.append((name, ' '.join(caller().split())))
+        return ''
+
+    config = config_mock(rebuild_predicate=predicate)
+    adapter = SandboxSafeMock()
+    adapter.plan_partition_carry_over.return_value = planned
+    existing = SandboxSafeMock(is_table=True)
+    existing.name = 'facts'
+    macros.call(
+        'clickhouse__rebuild_table',
+        'new_facts',
+        existing,
+        'select * from src',
+        context={
+            'config': config,
+            'adapter': adapter,
+            'statement': statement,
+            'get_create_table_as_sql': lambda temporary, relation, sql: (
+                f'create {relation} as {sql}'
+            ),
+            'clickhouse__create_empty_table': lambda *args: statements.append(('empty', args[1])),
+            'clickhouse__insert_into': lambda relation, sql, has_contract: (
+                f'insert {relation} {sql}'
+            ),
+        },
+    )
+    return statements, adapter
+
+
+def test_rebuild_carries_partitions_over(macros):
+    statements, adapter = _rebuild(macros, "day >= '2024-03-01'", ['202401'])
+
+    assert statements == [
+        ('empty', 'new_facts'),
+        ('main', "insert new_facts select * from (select * from src ) where day >= '2024-03-01'"),
+    ]
+    adapter.carry_over_partitions.assert_called_once()
+    assert adapter.carry_over_partitions.call_args.args[2] == ['202401']
+
+
+def test_rebuild_inserts_everything_when_partitions_can_not_be_attached(macros):
+    statements, adapter = _rebuild(macros, "day >= '2024-03-01'", None)
+
+    assert statements == [('empty', 'new_facts'), ('main', 'insert new_facts select * from src')]
+    adapter.carry_over_partitions.assert_not_called()
+
+
+def test_rebuild_without_predicate(macros):
+    statements, adapter = _rebuild(macros, None, None)
+
+    assert statements == [('main', 'create new_facts as select * from src')]
+    adapter.plan_partition_carry_over.assert_not_called()
@@ -0,0 +1,126 @@
+from unittest.mock import MagicMock
+
+import pytest
+from dbt.adapters.clickhouse.impl import ClickHouseAdapter
+from dbt.adapters.clickhouse.refresh import ViewRefresher
+from dbt.adapters.clickhouse.relation import ClickHouseRelation
+from dbt_common.exceptions import DbtRuntimeError
+
+VIEW = ClickHouseRelation.create(schema='analytics', identifier='daily_mv')
+
+
+def _handle(*states):
+    handle = MagicMock()
+    handle.query.side_effect = [MagicMock(result_set=[state]) for state in states]
+    return handle
+
+
+def test_server_side_wait():
+    handle = _handle(
+        ('Scheduled', '2024-01-01 00:00:00', '2024-01-01 00:00:00', '', 0),
+        ('Scheduled', '2024-01-01 01:00:00', '2024-01-01 01:00:00', '', 42),
+    )
+
+    result = ViewRefresher(handle, server_wait=True).refresh(VIEW)
+
+    assert [call.args[0] for call in handle.command.call_args_list] == [
+        'SYSTEM REFRESH VIEW `analytics`.`daily_mv`',
+        'SYSTEM WAIT VIEW `analytics`.`daily_mv`',
+    ]
+    assert result.written_rows == 42
+
+
+def test_wait_with_a_timeout_polls():
+    handle = _handle(
+        ('Scheduled', '2024-01-01 00:00:00', '2024-01-01 00:00:00', '', 0),
+        ('Running', '2024-01-01 00:00:00', '2024-01-01 00:00:00', '', 10),
+        ('Scheduled', '2024-01-01 01:00:00', '2024-01-01 01:00:00', '', 42),
+    )
+    sleeps = []
+
+    result = ViewRefresher(handle, server_wait=True, timeout=60, sleep=sleeps.append).refresh(VIEW)
+
+    assert [call.args[0] for call in handle.command.call_args_list] == [
+        'SYSTEM REFRESH VIEW `analytics`.`daily_mv`'
+    ]
+    assert sleeps == [0.5]
+    assert result.written_rows == 42
+
+
+def test_polling_backs_off_until_a_new_refresh_finished():
+    handle = _handle(
+        ('Scheduled', '2024-01-01 00:00:00', '2024-01-01 00:00:00', '', 0),
+        ('Scheduled', '2024-01-01 00:00:00', '2024-01-01 00:00:00', '', 0),
+        ('Running', '2024-01-01 00:00:00', '2024-01-01 00:00:00', '', 10),
+        ('Scheduled', '2024-01-01 01:00:00', '2024-01-01 01:00:00', '', 20),
+    )
+    sleeps = []
+
+    result = ViewRefresher(handle, server_wait=False, sleep=sleeps.append).refresh(VIEW)
+
+    assert sleeps == [0.5, 1.0]
+    assert (result.status, result.written_rows) == ('Scheduled', 20)
+    assert 'SYSTEM WAIT VIEW' not in str(handle.command.call_args_list)
+
+
+def test_failed_refresh_raises():
+    handle = _handle(
+        ('Scheduled', '2024-01-01 00:00:00', '2024-01-01 00:00:00', '', 0),
+        ('Scheduled', '2024-01-01 01:00:00', '2024-01-01 00:00:00', 'Memory limit exceeded', 0),
+    )
+
+    with pytest.raises(DbtRuntimeError, match='Memory limit exceeded'):
+        ViewRefresher(handle, server_wait=False, sleep=lambda _: None).refresh(VIEW)
+
+
+def test_failed_refresh_without_a_new_refresh_time_raises():
+    times = ('2024-01-01 00:00:00', '2024-01-01 00:00:00')
+    handle = _handle(
+        ('Scheduled', *times, '', 0),
+        ('Scheduled', *times, '', 0),
+        ('Scheduled', *times, 'Table raw.src does not exist', 0),
+    )
+    sleeps = []
+
+    with pytest.raises(DbtRuntimeError, match='failed: Table raw.src does not exist'):
+        ViewRefresher(handle, server_wait=False, sleep=sleeps.append).refresh(VIEW)
+    assert sleeps == [0.5]
+
+
+def test_repeated_failure_finishes_once_the_refresh_ran():
+    previous = ('Scheduled', '2024-01-01 00:00:00', '2023-12-31 00:00:00', 'Timeout', 0)
+    handle = _handle(
+        previous,
+        previous,
+        ('Running', '2024-01-01 00:00:00', '2023-12-31 00:00:00', '', 0),
+        previous,
+    )
+
+    with pytest.raises(DbtRuntimeError, match='failed: Timeout'):
+        ViewRefresher(handle, server_wait=False, timeout=60, sleep=lambda _: None).refresh(VIEW)
+    assert handle.query.call_count == 4
+
+
+def test_polling_times_out():
+    state = ('Running', '2024-01-01 00:00:00', '2024-01-01 00:00:00', '', 0)
+    handle = _handle(*[state] * 3)
+
+    with pytest.raises(DbtRuntimeError, match='Timed out'):
+        ViewRefresher(handle, server_wait=False, timeout=0.1, sleep=lambda _: None).refresh(VIEW)
+
+
+def test_refresh_mvs_reports_rows_in_the_adapter_response():
+    adapter = ClickHouseAdapter.__new__(ClickHouseAdapter)
+    conn = MagicMock()
+    conn.handle = _handle(
+        ('Scheduled', None, None, '', 0),
+        ('Scheduled', '2024-01-01 01:00:00', '2024-01-01 01:00:00', '', 7),
+    )
+    conn.handle.server_version = '25.3.1'
+    adapter.connections = MagicMock()
+    adapter.connections.get_if_exists.return_value = conn
+
+    response = adapter.refresh_mvs([VIEW])
+
+    assert response.rows_affected == 7
+    assert response._message.startswith('REFRESH `analytics`.`daily_mv` Scheduled in ')
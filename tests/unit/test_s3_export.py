@@ -0,0 +1,91 @@
+from multiprocessing.context import SpawnContext
+from unittest.mock import MagicMock, Mock
+
+import pytest
+from dbt.adapters.clickhouse.impl import ClickHouseAdapter
+from dbt.adapters.clickhouse.s3 import export_settings
+from dbt_common.exceptions import DbtRuntimeError
+
+from tests.unit.macro_harness import config_mock
+
+# A local MinIO bucket standing in for S3
+MINIO_S3 = {
+    'bucket': 'http://minio:9000/dbt-test',
+    'fmt': 'Parquet',
+    'aws_access_key_id': 'minioadmin',
+    'aws_secret_access_key': 'minioadmin',
+}
+
+
+def _adapter(cluster='analytics'):
+    config = MagicMock()
+    config.vars.vars = {'export_s3': MINIO_S3}
+    adapter = ClickHouseAdapter(config, Mock(spec=SpawnContext))
+    adapter.config = config
+    adapter.connections = MagicMock()
+    adapter.connections.get_if_exists.return_value.credentials.cluster = cluster
+    return adapter
+
+
+def _export_sql(macros, **config):
+    rendered = macros.call(
+        'clickhouse__s3_export_sql',
+        'select * from events',
+        context={'adapter': _adapter(), 'config': config_mock(s3_config='export_s3', **config)},
+    )
+    return ' '.join(rendered.split())
+
+
+def test_partitioned_parquet_export(macros):
+    sql = _export_sql(
+        macros,
+        export_s3={'path': '/events/{_partition_id}.parquet'},
+        partition_by=['toYYYYMM(day)', 'kind'],
+        row_group_size=100000,
+        parallel_export=True,
+        query_settings={'max_threads': 8},
+    )
+
+    assert sql == (
+        "insert into function s3('http://minio:9000/dbt-test/events/{_partition_id}.parquet', "
+        "'minioadmin', 'minioadmin', 'Parquet') partition by (toYYYYMM(day), kind) "
+        "SETTINGS s3_truncate_on_insert=1, output_format_parquet_row_group_size=100000, "
+        "parallel_distributed_insert_select=2, max_threads=8 select * from events"
+    )
+
+
+def test_new_file_export(macros):
+    sql = _export_sql(
+        macros, export_s3={'path': '/events.orc', 'fmt': 'ORC'}, export_mode='new_file'
+    )
+
+    assert sql == (
+        "insert into function s3('http://minio:9000/dbt-test/events.orc', "
+        "'minioadmin', 'minioadmin', 'ORC') "
+        "SETTINGS s3_create_new_file_on_insert=1 select * from events"
+    )
+
+
+def test_export_ignores_the_schema_cache(macros):
+    adapter = _adapter()
+    rendered = macros.call(
+        'clickhouse__s3_export_sql',
+        'select * from events',
+        context={
+            'adapter': adapter,
+            'config': config_mock(
+                s3_config='export_s3', export_s3={'path': '/events.parquet', 'schema_cache': True}
+            ),
+        },
+    )
+
+    assert "'minioadmin', 'Parquet') SETTINGS" in ' '.join(rendered.split())
+    adapter.connections.get_if_exists.return_value.handle.query.assert_not_called()
+
+
+def test_invalid_export_settings():
+    with pytest.raises(DbtRuntimeError, match='Invalid export_mode'):
+        export_settings('Parquet', mode='append')
+    with pytest.raises(DbtRuntimeError, match='not supported for the ORC format'):
+        export_settings('ORC', row_group_size=1000)
+    assert export_settings('Parquet', mode='fail') == {}
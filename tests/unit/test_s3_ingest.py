@@ -0,0 +1,130 @@
+from multiprocessing.context import SpawnContext
+from unittest.mock import MagicMock, Mock
+
+import pytest
+from dbt.adapters.clickhouse.impl import ClickHouseAdapter
+from dbt.adapters.clickhouse.relation import ClickHouseRelation
+from dbt.adapters.clickhouse.s3 import S3FileTracker
+
+from tests.unit.macro_harness import config_mock
+
+TARGET = ClickHouseRelation.create(schema='raw', identifier='events')
+FILES = [
+    ('bucket/events/a.parquet', 10, 1704067200),
+    ('bucket/events/b.parquet', 20, 1704153600),
+    ('bucket/events/c.parquet', 30, 1704240000),
+]
+
+
+def _tracker(rows=()):
+    handle = MagicMock()
+    handle.query.return_value.result_set = list(rows)
+    return S3FileTracker(handle, TARGET), handle
+
+
+def _listed(changed=()):
+    return [(*file, file[0] in changed) for file in FILES]
+
+
+def test_pending_files_exclude_ingested_ones_and_are_chunked():
+    tracker, handle = _tracker(_listed())
+
+    chunks = tracker.pending("s3('https://bucket/events/*.parquet', 'One')", files_per_chunk=2)
+
+    assert chunks == [FILES[:2], FILES[2:]]
+    query = handle.query.call_args.args[0]
+    assert "FROM s3('https://bucket/events/*.parquet', 'One')" in query
+    assert 'toUnixTimestamp(ifNull(_time, toDateTime(0))) AS modified' in query
+    assert (
+        'WHERE (_path, size, modified) NOT IN '
+        '(SELECT path, size, toUnixTimestamp(modified) FROM `raw`.`events__dbt_s3_files`)'
+    ) in query
+
+
+def test_changed_files_are_skipped_without_a_path_column():
+    tracker, handle = _tracker(_listed(changed={FILES[1][0]}))
+
+    chunks = tracker.pending("s3('https://bucket/events/*', 'One')")
+
+    assert chunks == [[FILES[0], FILES[2]]]
+    handle.command.assert_not_called()
+
+
+def test_changed_files_replace_their_rows_with_a_path_column():
+    tracker, handle = _tracker(_listed(changed={FILES[1][0]}))
+
+    chunks = tracker.pending("s3('https://bucket/events/*', 'One')", path_column='source_file')
+
+    assert chunks == [FILES]
+    handle.command.assert_called_once_with(
+        "ALTER TABLE `raw`.`events` DELETE WHERE source_file IN ('bucket/events/b.parquet') "
+        'SETTINGS mutations_sync = 2'
+    )
+
+
+def test_full_refresh_lists_every_file():
+    tracker, handle = _tracker(_listed())
+
+    assert tracker.pending("s3('https://bucket/events/*', 'One')", all_files=True) == [FILES]
+    assert 'NOT IN' not in handle.query.call_args.args[0]
+
+
+def test_record_files():
+    tracker, handle = _tracker()
+
+    tracker.ensure(reset=True)
+    tracker.record(FILES[:1], replace=True)
+
+    assert [call.args[0].split(' (')[0] for call in handle.command.call_args_list] == [
+        'DROP TABLE IF EXISTS `raw`.`events__dbt_s3_files`',
+        'CREATE TABLE IF NOT EXISTS `raw`.`events__dbt_s3_files`',
+        'TRUNCATE TABLE `raw`.`events__dbt_s3_files`',
+        'INSERT INTO `raw`.`events__dbt_s3_files`',
+    ]
+    assert handle.command.call_args.args[0].endswith(
+        "VALUES ('bucket/events/a.parquet', 10, 1704067200)"
+    )
+
+
+def test_tracker_is_replicated_on_a_cluster():
+    handle = MagicMock()
+    tracker = S3FileTracker(handle, TARGET, cluster='main')
+
+    tracker.ensure(reset=True)
+
+    drop, create = [call.args[0] for call in handle.command.call_args_list]
+    assert drop == 'DROP TABLE IF EXISTS `raw`.`events__dbt_s3_files` ON CLUSTER "main" SYNC'
+    assert create.startswith('CREATE TABLE IF NOT EXISTS `raw`.`events__dbt_s3_files` ON CLUSTER')
+    assert create.endswith('ENGINE = ReplicatedMergeTree ORDER BY path')
+
+
+def test_listing_reads_one_row_per_file(macros):
+    config = MagicMock()
+    config.vars.vars = {
+        'events_s3': {'bucket': 'https://bucket/events', 'fmt': 'Parquet', 'structure': 'id UInt64'}
+    }
+    adapter = ClickHouseAdapter(config, Mock(spec=SpawnContext))
+    adapter.config = config
+    adapter.connections = MagicMock()
+
+    listing = macros.call(
+        'clickhouse__s3_ingest_listing',
+        context={
+            'adapter': adapter,
+            'config': config_mock(s3_config='events_s3', events_s3={'path': '/2024/*.parquet'}),
+        },
+    )
+
+    assert listing == "s3('https://bucket/events/2024/*.parquet', 'One')"
+
+
+def test_new_files_filter_requires_s3_ingest(macros):
+    rendered = macros.call(
+        'clickhouse_s3_new_files', context={'config': config_mock(materialized='s3_ingest')}
+    )
+    assert rendered.strip() == '/* dbt_s3_new_files */ true'
+
+    with pytest.raises(Exception, match='only supported by s3_ingest models'):
+        macros.call(
+            'clickhouse_s3_new_files', context={'config': config_mock(materialized='table')}
+        )
@@ -8,6 +8,14 @@ from dbt_common.exceptions import DbtRuntimeError
 ROLE_ARN = 'arn:aws:iam::111111111111:role/ClickHouseAccessRole-001'
 
 
+def _adapter(mock_config, cluster=''):
+    adapter = ClickHouseAdapter(mock_config, Mock(spec=SpawnContext))
+    adapter.config = mock_config
+    adapter.connections = MagicMock()
+    adapter.connections.get_if_exists.return_value.credentials.cluster = cluster
+    return adapter
+
+
 def test_aws_credentials_from_config():
     mock_config = MagicMock()
     mock_vars = MagicMock()
@@ -22,8 +30,7 @@ def test_aws_credentials_from_config():
     }
     mock_config.vars = mock_vars
 
-    adapter = ClickHouseAdapter(mock_config, Mock(spec=SpawnContext))
-    adapter.config = mock_config
+    adapter = _adapter(mock_config)
 
     result = adapter.s3source_clause(
         config_name='test_s3',
@@ -57,8 +64,7 @@ def test_model_config_does_not_mutate_global_config():
     mock_vars.vars = {'test_s3': s3_config}
     mock_config.vars = mock_vars
 
-    adapter = ClickHouseAdapter(mock_config, Mock(spec=SpawnContext))
-    adapter.config = mock_config
+    adapter = _adapter(mock_config)
 
     model_result = adapter.s3source_clause(
         config_name='test_s3',
@@ -96,8 +102,7 @@ def test_compression_argument_without_structure():
     mock_vars.vars = {}
     mock_config.vars = mock_vars
 
-    adapter = ClickHouseAdapter(mock_config, Mock(spec=SpawnContext))
-    adapter.config = mock_config
+    adapter = _adapter(mock_config)
 
     result = adapter.s3source_clause(
         config_name='',
@@ -121,8 +126,7 @@ def test_compression_argument_with_structure():
     mock_vars.vars = {}
     mock_config.vars = mock_vars
 
-    adapter = ClickHouseAdapter(mock_config, Mock(spec=SpawnContext))
-    adapter.config = mock_config
+    adapter = _adapter(mock_config)
 
     result = adapter.s3source_clause(
         config_name='',
@@ -157,8 +161,7 @@ def role_based_clause(s3_vars: dict, **kwargs) -> str:
     }
     mock_config.vars = mock_vars
 
-    adapter = ClickHouseAdapter(mock_config, Mock(spec=SpawnContext))
-    adapter.config = mock_config
+    adapter = _adapter(mock_config)
 
     kwargs.setdefault('role_arn', '')
     return adapter.s3source_clause(
@@ -205,3 +208,86 @@ def test_role_arn_and_external_id_from_config():
 def test_external_id_without_role_arn_raises():
     with pytest.raises(DbtRuntimeError, match='external_id specified without role_arn'):
         role_based_clause({}, external_id='my-external-id')
+
+
+def _bucket_clause(adapter, **kwargs):
+    return adapter.s3source_clause(
+        config_name='',
+        s3_model_config=kwargs.pop('s3_model_config', {}),
+        bucket='test-bucket.s3.amazonaws.com',
+        path='/data/*.parquet',
+        fmt='Parquet',
+        structure='',
+        aws_access_key_id='',
+        aws_secret_access_key='',
+        role_arn='',
+        **kwargs,
+    )
+
+
+def _vars_config(tmp_path=None):
+    mock_config = MagicMock()
+    mock_config.vars.vars = {}
+    if tmp_path:
+        mock_config.project_root = str(tmp_path)
+        mock_config.target_path = 'target'
+    return mock_config
+
+
+def test_reads_with_s3_without_a_cluster_setting():
+    adapter = _adapter(_vars_config(), cluster='analytics')
+
+    assert _bucket_clause(adapter) == (
+        "s3('https://test-bucket.s3.amazonaws.com/data/*.parquet', 'Parquet')"
+    )
+
+
+def test_configured_cluster_reads_with_s3_cluster():
+    adapter = _adapter(_vars_config(), cluster='analytics')
+
+    assert _bucket_clause(adapter, s3_model_config={'cluster': True}) == (
+        "s3Cluster('analytics', 'https://test-bucket.s3.amazonaws.com/data/*.parquet', 'Parquet')"
+    )
+    assert _bucket_clause(adapter, cluster=True).startswith("s3Cluster('analytics', ")
+    assert _bucket_clause(adapter, cluster=False).startswith("s3('")
+    assert _bucket_clause(adapter, cluster='other').startswith("s3Cluster('other', ")
+
+
+def test_inferred_schema_is_cached_in_the_target_directory(tmp_path):
+    adapter = _adapter(_vars_config(tmp_path))
+    handle = adapter.connections.get_if_exists.return_value.handle
+    handle.query.return_value.result_set = [('id', 'UInt64'), ('kind', "Enum8('a' = 1)")]
+
+    first = _bucket_clause(adapter, schema_cache=True)
+    second = _bucket_clause(adapter, schema_cache=True)
+
+    assert handle.query.call_count == 1
+    assert handle.query.call_args.args[0] == (
+        "DESCRIBE TABLE s3('https://test-bucket.s3.amazonaws.com/data/*.parquet', "
+        "'Parquet', 'auto')"
+    )
+    assert (
+        first
+        == second
+        == (
+            "s3('https://test-bucket.s3.amazonaws.com/data/*.parquet', 'Parquet', "
+            "'\\`id\\` UInt64, \\`kind\\` Enum8(\\'a\\' = 1)')"
+        )
+    )
+    assert (tmp_path / 'target' / 'clickhouse_s3_schemas.json').exists()
+
+
+def test_path_filter():
+    adapter = _adapter(_vars_config())
+
+    assert adapter.s3_path_filter() == 'true'
+    assert adapter.s3_path_filter(files=['a.parquet', "b'.parquet"]) == (
+        "_file IN ('a.parquet', 'b\\'.parquet')"
+    )
+    assert adapter.s3_path_filter(
+        partitions={'date': ['2024-01-01', '2024-01-02'], 'region': 'eu'}, like='%.parquet'
+    ) == (
+        "(_path LIKE '%/date=2024-01-01/%' OR _path LIKE '%/date=2024-01-02/%') "
+        "AND _path LIKE '%/region=eu/%' AND _path LIKE '%.parquet'"
+    )
+    assert adapter.s3_path_filter(paths=[]) == 'false'
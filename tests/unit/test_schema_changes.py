@@ -0,0 +1,79 @@
+from dbt.adapters.clickhouse.column import ClickHouseColumn, ClickHouseColumnChanges
+
+from tests.unit.macro_harness import SandboxSafeMock
+
+
+class _Statements:
+    def __init__(self):
+        self.sql = []
+
+    def __call__(self, name, fetch_result=False, auto_begin=True, caller=None):
+        self.sql.append(' '.join(caller().split()))
+        return ''
+
+
+def _apply(macros, changes, is_distributed=False):
+    statements = _Statements()
+    adapter = SandboxSafeMock()
+    adapter.get_clickhouse_local_suffix.return_value = '_local'
+    adapter.get_clickhouse_local_db_prefix.return_value = ''
+    relation = SandboxSafeMock()
+    relation.__str__.return_value = '`db`.`events`'
+    relation.incorporate.return_value = '`db`.`events_local`'
+    macros.call(
+        'clickhouse__apply_column_changes',
+        changes,
+        relation,
+        is_distributed,
+        context={
+            'statement': statements,
+            'adapter': adapter,
+            'this': SandboxSafeMock(identifier='events', schema='db'),
+            'model': {'columns': {'added': {'codec': 'ZSTD(3)'}}},
+            'on_cluster_clause': lambda *args, **kwargs: '',
+        },
+    )
+    return statements.sql
+
+
+def test_sync_all_columns_runs_one_alter(macros):
+    changes = ClickHouseColumnChanges(
+        on_schema_change='sync_all_columns',
+        columns_to_add=[ClickHouseColumn('added', 'String')],
+        columns_to_drop=[ClickHouseColumn('legacy', 'UInt8')],
+        columns_to_modify=[ClickHouseColumn('id', 'UInt64')],
+    )
+
+    assert _apply(macros, changes) == [
+        'alter table `db`.`events` drop column if exists `legacy`, '
+        'add column if not exists `added` String CODEC(ZSTD(3)), '
+        'modify column if exists `id` UInt64'
+    ]
+
+
+def test_append_new_columns_only_adds_columns(macros):
+    changes = ClickHouseColumnChanges(
+        on_schema_change='append_new_columns',
+        columns_to_add=[ClickHouseColumn('other', 'Date'), ClickHouseColumn('added', 'String')],
+    )
+
+    assert _apply(macros, changes, is_distributed=True) == [
+        'alter table `db`.`events_local` add column if not exists `other` Date, '
+        'add column if not exists `added` String CODEC(ZSTD(3))',
+        'alter table `db`.`events` add column if not exists `other` Date, '
+        'add column if not exists `added` String CODEC(ZSTD(3))',
+    ]
+
+
+def test_append_new_columns_adds_and_widens_in_one_alter(macros):
+    changes = ClickHouseColumnChanges(
+        on_schema_change='append_new_columns',
+        columns_to_add=[ClickHouseColumn('added', 'String')],
+        columns_to_modify=[ClickHouseColumn('id', 'Int64')],
+        columns_to_widen=[ClickHouseColumn('id', 'Int64')],
+    )
+
+    assert _apply(macros, changes) == [
+        'alter table `db`.`events` add column if not exists `added` String CODEC(ZSTD(3)), '
+        'modify column if exists `id` Int64'
+    ]
@@ -0,0 +1,172 @@
+from unittest.mock import MagicMock
+
+import pytest
+from dbt.adapters.clickhouse.column import ClickHouseColumn
+from dbt.adapters.clickhouse.dbclient import ChClientWrapper
+from dbt.adapters.clickhouse.impl import ClickHouseAdapter
+from dbt.adapters.clickhouse.schema_diff import TypeChange, diff_columns, type_change
+from dbt_common.exceptions import DbtDatabaseError, DbtRuntimeError
+
+
+def _columns(*name_types):
+    return [ClickHouseColumn(name, dtype) for name, dtype in name_types]
+
+
+@pytest.mark.parametrize(
+    'source,target,expected',
+    [
+        ('Int32', 'Int32', TypeChange.NONE),
+        ('LowCardinality(String)', 'String', TypeChange.NONE),
+        ('Decimal64(4)', 'Decimal(18, 4)', TypeChange.NONE),
+        ('Nullable(UInt64)', 'UInt64', TypeChange.NONE),
+        ('Int32', 'Int64', TypeChange.WIDENING),
+        ('UInt8', 'UInt16', TypeChange.WIDENING),
+        ('Float32', 'Float64', TypeChange.WIDENING),
+        ('Decimal(10, 2)', 'Decimal(12, 2)', TypeChange.WIDENING),
+        ('Decimal32(2)', 'Decimal64(2)', TypeChange.WIDENING),
+        ('String', 'Nullable(String)', TypeChange.NULLABLE),
+        ('Array(Int32)', 'Array(Nullable(Int32))', TypeChange.WIDENING),
+        ('Map(String, UInt8)', 'Map(LowCardinality(String), UInt16)', TypeChange.WIDENING),
+        ('Tuple(a Int32)', 'Tuple(a Int64)', TypeChange.WIDENING),
+        ('Map(LowCardinality(String), UInt8)', 'Map(String, UInt8)', TypeChange.NONE),
+        ('Int64', 'Int32', TypeChange.CHANGED),
+        ('UInt32', 'Int64', TypeChange.CHANGED),
+        ('Float64', 'Float32', TypeChange.CHANGED),
+        ('Decimal(10, 2)', 'Decimal(12, 4)', TypeChange.CHANGED),
+        ("DateTime('UTC')", "DateTime64(3, 'UTC')", TypeChange.CHANGED),
+        ('Nullable(Int32)', 'Int64', TypeChange.CHANGED),
+        ('Tuple(a Int32)', 'Tuple(b Int32)', TypeChange.CHANGED),
+    ],
+)
+def test_type_change(source, target, expected):
+    assert type_change(ClickHouseColumn('c', source), ClickHouseColumn('c', target)) == expected
+
+
+def test_diff_columns():
+    source = _columns(('id', 'UInt32'), ('amount', 'Decimal(10, 2)'), ('legacy', 'String'))
+    target = _columns(('id', 'UInt64'), ('amount', 'Float64'), ('added', 'Date'))
+
+    changes = diff_columns(source, target, 'sync_all_columns')
+
+    assert [column.name for column in changes.columns_to_add] == ['added']
+    assert [column.name for column in changes.columns_to_drop] == ['legacy']
+    assert [column.name for column in changes.columns_to_modify] == ['id', 'amount']
+    assert [column.name for column in changes.columns_to_widen] == ['id']
+
+
+def test_append_new_columns_widens_in_place():
+    source = _columns(('id', 'Int32'), ('name', 'String'))
+
+    changes = diff_columns(
+        source, _columns(('id', 'Int64'), ('name', 'Nullable(String)')), 'append_new_columns'
+    )
+
+    assert [column.name for column in changes.columns_to_widen] == ['id', 'name']
+    assert not changes.has_conflicting_changes
+
+
+@pytest.mark.parametrize('on_schema_change', ['fail', 'append_new_columns'])
+def test_narrowing_changes_fail(on_schema_change):
+    source = _columns(('id', 'Int64'), ('name', 'String'))
+
+    changes = diff_columns(source, _columns(('id', 'Int32'), ('name', 'String')), on_schema_change)
+
+    assert not changes.columns_to_widen
+    assert changes.has_conflicting_changes
+
+
+def test_fail_rejects_widening_and_new_columns():
+    source = _columns(('id', 'UInt32'), ('name', 'String'))
+
+    widened = diff_columns(source, _columns(('id', 'UInt64'), ('name', 'String')), 'fail')
+    appended = diff_columns(
+        source, _columns(('id', 'UInt32'), ('name', 'String'), ('added', 'Date')), 'fail'
+    )
+
+    assert widened.has_conflicting_changes
+    assert appended.has_conflicting_changes
+
+
+def test_nullable_only_change_is_not_a_schema_change_under_fail():
+    source = _columns(('id', 'UInt32'), ('name', 'String'))
+    target = _columns(('id', 'UInt32'), ('name', 'Nullable(String)'))
+
+    changes = diff_columns(source, target, 'fail')
+
+    assert not changes
+    assert not changes.has_conflicting_changes
+
+
+def test_sync_all_columns_adds_nullable():
+    source = _columns(('id', 'UInt32'), ('name', 'String'))
+    target = _columns(('id', 'UInt32'), ('name', 'Nullable(String)'))
+
+    changes = diff_columns(source, target, 'sync_all_columns')
+
+    assert [column.data_type for column in changes.columns_to_modify] == ['Nullable(String)']
+
+
+def _adapter_with_handle(handle):
+    adapter = ClickHouseAdapter.__new__(ClickHouseAdapter)
+    conn = MagicMock()
+    conn.handle = handle
+    adapter.connections = MagicMock()
+    adapter.connections.get_if_exists.return_value = conn
+    return adapter
+
+
+def test_schema_changes_read_both_schemas_in_one_query():
+    handle = MagicMock(spec=ChClientWrapper)
+    handle._column_types.return_value = [
+        ('id', 'UInt32'),
+        ('name', 'String'),
+        ('__dbt_schema_split', 'UInt8'),
+        ('__dbt_target.id', 'UInt32'),
+        ('name', 'String'),
+        ('added', 'Nullable(Date)'),
+    ]
+    handle.columns_in_query_and_relation = lambda *args, **kwargs: (
+        ChClientWrapper.columns_in_query_and_relation(handle, *args, **kwargs)
+    )
+    adapter = _adapter_with_handle(handle)
+
+    changes = adapter.check_incremental_schema_changes(
+        'append_new_columns', '`db`.`events`', 'select 1', query_settings={'join_use_nulls': 1}
+    )
+
+    handle._column_types.assert_called_once()
+    sql = handle._column_types.call_args.args[0]
+    assert 'FROM (SELECT * FROM `db`.`events` LIMIT 0) AS __dbt_source' in sql
+    assert handle._column_types.call_args.kwargs == {'settings': {'join_use_nulls': 1}}
+    assert [column.data_type for column in changes.columns_to_add] == ['Nullable(Date)']
+    assert not changes.columns_to_modify
+
+
+def test_schema_changes_fail_on_incompatible_change():
+    handle = MagicMock()
+    handle.columns_in_query_and_relation.return_value = (
+        _columns(('id', 'UInt64')),
+        _columns(('id', 'String')),
+    )
+    adapter = _adapter_with_handle(handle)
+
+    with pytest.raises(DbtRuntimeError):
+        adapter.check_incremental_schema_changes('append_new_columns', '`db`.`events`', 'select 1')
+
+
+def test_schema_changes_fallback_expands_existing_columns_like_the_combined_query():
+    handle = MagicMock()
+    handle.columns_in_query_and_relation.side_effect = DbtDatabaseError('unsupported')
+    adapter = _adapter_with_handle(handle)
+    queries = []
+
+    def column_schema(sql, query_settings=None):
+        queries.append(sql)
+        return _columns(('id', 'UInt64'))
+
+    adapter.get_column_schema_from_query = column_schema
+
+    changes = adapter.check_incremental_schema_changes('fail', '`db`.`events`', 'select 1')
+
+    assert queries == ['SELECT * FROM `db`.`events`', 'select 1']
+    assert not changes
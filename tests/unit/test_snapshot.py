@@ -0,0 +1,249 @@
+import hashlib
+
+import pytest
+
+from tests.unit.macro_harness import SandboxSafeMock, config_mock
+
+
+class _Statements:
+    def __init__(self):
+        self.sql = {}
+
+    def __call__(self, name, fetch_result=False, auto_begin=True, caller=None):
+        self.sql[name] = ' '.join(caller().split())
+        return ''
+
+
+def _relation(identifier):
+    relation = SandboxSafeMock(schema='snapshots', identifier=identifier)
+    relation.__str__.return_value = f'`snapshots`.`{identifier}`'
+    return relation
+
+
+def _merge(macros, merge_strategy, partitions=(), **config_values):
+    statements = _Statements()
+    target = _relation('customers_snapshot')
+    target.derivative.return_value = _relation('customers_snapshot__snapshot_upsert')
+    config = config_mock(snapshot_merge_strategy=merge_strategy, **config_values)
+    adapter = SandboxSafeMock()
+    adapter.quote.side_effect = lambda name: f'"{name}"'
+    adapter.is_at_or_after_version.return_value = True
+    run_query = SandboxSafeMock()
+    run_query.return_value.rows = [{'partition_id': partition} for partition in partitions]
+    result = macros.call(
+        'clickhouse__snapshot_merge_sql',
+        target,
+        _relation('customers_snapshot__dbt_tmp'),
+        ['id', '"dbt_valid_to"', 'dbt_scd_id'],
+        context={
+            'statement': statements,
+            'config': config,
+            'adapter': adapter,
+            'run_query': run_query,
+            'execute': True,
+            'on_cluster_clause': lambda *args, **kwargs: '',
+        },
+    )
+    return result, statements.sql
+
+
+def test_replace_partitions_only_rewrites_changed_partitions(macros):
+    result, sql = _merge(macros, 'replace_partitions', partitions=['202401', '202402'])
+
+    assert result == 'select 1'
+    assert "where target._partition_id in ('202401', '202402')" in sql['insert_unchanged_data']
+    assert sql['replace_partitions'] == (
+        'alter table `snapshots`.`customers_snapshot` '
+        "replace partition id '202401' from `snapshots`.`customers_snapshot__snapshot_upsert`, "
+        "replace partition id '202402' from `snapshots`.`customers_snapshot__snapshot_upsert` "
+        'settings allow_replace_partition_from_empty_source = 1'
+    )
+    assert 'exchange_tables' not in sql
+
+
+def test_replace_partitions_without_changes_leaves_target_untouched(macros):
+    _, sql = _merge(macros, 'replace_partitions')
+
+    assert 'insert_unchanged_data' not in sql
+    assert 'replace_partitions' not in sql
+
+
+def test_invalid_snapshot_merge_strategy(macros):
+    with pytest.raises(Exception, match='snapshot_merge_strategy'):
+        _merge(macros, 'upsert')
+
+
+def test_rebuild_merge_uses_configured_joins(macros):
+    _, sql = _merge(
+        macros, 'rebuild', snapshot_join_strictness='any', snapshot_join_algorithm='grace_hash'
+    )
+
+    assert (
+        'left anti join ( select dbt_scd_id from `snapshots`.`customers_snapshot__dbt_tmp` )'
+        in (sql['insert_unchanged_data'])
+    )
+    assert 'inner any join updates_and_deletes' in sql['insert_updated_and_deleted']
+    assert sql['insert_updated_and_deleted'].endswith("settings join_algorithm = 'grace_hash'")
+
+
+def test_snapshot_hash_arguments_hashes_without_casting(macros):
+    hashed = macros.call('clickhouse__snapshot_hash_arguments', ['id', 'updated_at'])
+
+    assert ' '.join(hashed.split()) == (
+        'cityHash64(isNull(id), assumeNotNull(id), isNull(updated_at), assumeNotNull(updated_at))'
+    )
+
+
+def test_invalid_snapshot_join_strictness(macros):
+    with pytest.raises(Exception, match='snapshot_join_strictness'):
+        macros.call(
+            'clickhouse__snapshot_join',
+            'left',
+            context={'config': config_mock(snapshot_join_strictness='semi')},
+        )
+
+
+def _column(name, data_type, comment=''):
+    return {'name': name, 'type': data_type, 'comment': comment}
+
+
+def _check_hash_context(statements, column_rows):
+    run_query = SandboxSafeMock()
+    run_query.return_value.rows = column_rows
+    return {
+        'statement': statements,
+        'config': config_mock(snapshot_check_hash=True, strategy='check', check_cols=['name']),
+        'model': {},
+        'snapshot_check_all_get_existing_columns': lambda *args: (False, ['`name`']),
+        'local_md5': lambda value: hashlib.md5(value.encode()).hexdigest(),
+        'run_query': run_query,
+        'execute': True,
+        'on_cluster_clause': lambda *args, **kwargs: '',
+    }
+
+
+def test_check_hash_column_is_added_to_the_target(macros):
+    statements = _Statements()
+
+    macros.call(
+        'clickhouse__ensure_snapshot_check_hash',
+        _relation('customers_snapshot'),
+        context=_check_hash_context(statements, [_column('name', 'String')]),
+    )
+
+    assert statements.sql['add_check_hash_column'].startswith(
+        'alter table `snapshots`.`customers_snapshot` add column if not exists dbt_check_hash '
+        "UInt64 materialized cityHash64(isNull(`name`), CAST(assumeNotNull(`name`), 'String')) "
+        "comment 'dbt check hash "
+    )
+
+
+def test_check_strategy_compares_stored_hash(macros):
+    context = _check_hash_context(_Statements(), [])
+    strategy = {
+        'unique_key': 'id',
+        'updated_at': 'now()',
+        'row_changed': 'COLUMNS_DIFFER',
+        'check_hash_cols': [('`name`', 'String')],
+    }
+
+    sql = macros.call(
+        'clickhouse__snapshot_staging_table_check_strategy',
+        strategy,
+        'select 1 as id',
+        _relation('customers_snapshot'),
+        context=context,
+    )
+
+    assert 'dbt_check_hash,' in sql
+    assert (
+        'snapshotted_data.dbt_check_hash != cityHash64(isNull(source_data.`name`), '
+        "CAST(assumeNotNull(source_data.`name`), 'String'))"
+    ) in ' '.join(sql.split())
+    assert 'COLUMNS_DIFFER' not in sql
+
+
+def test_source_and_target_hashes_use_the_target_types(macros):
+    statements = _Statements()
+    context = _check_hash_context(
+        statements, [_column('name', 'LowCardinality(Nullable(String))'), _column('id', 'UInt64')]
+    )
+
+    typed_cols = macros.call(
+        'clickhouse__ensure_snapshot_check_hash', _relation('customers_snapshot'), context=context
+    )
+    row_changed = macros.call(
+        'clickhouse__snapshot_row_changed',
+        {'row_changed': 'COLUMNS_DIFFER', 'check_hash_cols': typed_cols},
+        context=context,
+    )
+
+    target_hash = (
+        "cityHash64(isNull(`name`), CAST(assumeNotNull(`name`), 'LowCardinality(String)'))"
+    )
+    assert f'materialized {target_hash} comment' in statements.sql['add_check_hash_column']
+    # A String or non Nullable source column is cast to the same type as the target column
+    assert row_changed == 'snapshotted_data.dbt_check_hash != ' + target_hash.replace(
+        '`name`', 'source_data.`name`'
+    )
+
+
+def test_check_strategy_compares_columns_without_the_hash(macros):
+    context = _check_hash_context(_Statements(), [])
+    strategy = {'unique_key': 'id', 'updated_at': 'now()', 'row_changed': 'COLUMNS_DIFFER'}
+
+    sql = macros.call(
+        'clickhouse__snapshot_staging_table_check_strategy',
+        strategy,
+        'select 1 as id',
+        _relation('customers_snapshot'),
+        context=context,
+    )
+
+    assert 'dbt_check_hash' not in sql
+    assert 'COLUMNS_DIFFER' in sql
+    context['run_query'].assert_not_called()
+
+
+def test_staging_table_reads_check_hash_state_once(macros):
+    statements = _Statements()
+    context = _check_hash_context(
+        statements,
+        [_column('name', 'String'), _column('dbt_check_hash', 'UInt64', 'dbt check hash stale')],
+    )
+    existing_columns = []
+
+    def get_existing_columns(*args):
+        existing_columns.append(args)
+        return False, ['`name`']
+
+    strategies = []
+
+    def staging_table(strategy, sql, target_relation):
+        strategies.append(strategy)
+        return 'select 1'
+
+    context.update(
+        {
+            'snapshot_check_all_get_existing_columns': get_existing_columns,
+            'snapshot_staging_table': staging_table,
+            'make_temp_relation': lambda relation: _relation('customers_snapshot__dbt_tmp'),
+            'drop_relation_if_exists': lambda relation: '',
+            'create_table_as': lambda temporary, relation, sql: sql,
+        }
+    )
+    strategy = {'unique_key': 'id', 'updated_at': 'now()', 'row_changed': 'COLUMNS_DIFFER'}
+
+    macros.call(
+        'build_snapshot_staging_table',
+        strategy,
+        'select 1 as id',
+        _relation('customers_snapshot'),
+        context=context,
+    )
+
+    assert len(existing_columns) == 1
+    context['run_query'].assert_called_once()
+    assert 'modify_check_hash_column' in statements.sql
+    assert strategies[0]['check_hash_cols'] == [('`name`', 'String')]
+    assert strategies[0]['row_changed'] == 'COLUMNS_DIFFER'